@@ -1,23 +1,45 @@
 import os
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .config import config
 import redis
-from .extension import db, migrate, jwt, redis_client
+import click
+from .extension import db, migrate, jwt, redis_client, token_blocklist, note_cache, project_cache, user_cache, job_queue, note_file_writer, query_stats, metrics, hash_executor, login_limiter, content_codec
 from .controllers import api_blueprint
+from .utils import InstrumentedQueuePool, internal_only
 
 def register_JWT_hooks(jwt):
     # 注册JWT钩子函数，用于检查token是否在黑名单中
     @jwt.token_in_blocklist_loader
     def check_if_token_in_blocklist(jwt_header, jwt_payload):
         jti = jwt_payload['jti']
-        token_in_redis = redis_client.get(jti)
-        return token_in_redis is not None
+        return token_blocklist.is_revoked(jti)
+
+
+def register_commands(app):
+    # 按压缩配置重写已有笔记内容，例如：flask compress-notes --codec zlib --dry-run
+    @app.cli.command('compress-notes')
+    @click.option('--codec', type=click.Choice(['zlib', 'zstd', 'plain']), default=None, help='压缩方式，默认使用 NOTE_CONTENT_CODEC，plain 表示全部解压')
+    @click.option('--batch-size', default=500, help='每批处理的笔记数')
+    @click.option('--dry-run', is_flag=True, help='只统计压缩效果，不写回数据库')
+    def compress_notes(codec, batch_size, dry_run):
+        from .models import NoteContent
+        stats = NoteContent.rewriteContents(codec, batch_size, dry_run)
+        click.echo('笔记 {rows} 条，重写 {rewritten} 条，内容 {bytes_before} 字节 -> {bytes_after} 字节'.format(**stats))
+        if stats['rows']:
+            click.echo('平均解压 {:.3f} ms，平均压缩 {:.3f} ms'.format(
+                stats['decode_seconds'] * 1000 / stats['rows'], stats['encode_seconds'] * 1000 / stats['rows']))
 
 
 def create_app(config_name):
     app = Flask("lifocus")
     app.config.from_object(config[config_name])
+    # 反向代理后面按配置的代理层数解析真实客户端地址（内部接口鉴权、登录限流使用）
+    if app.config['PROXY_FIX_X_FOR']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    # 使用带统计的连接池，复制一份配置，避免修改配置类上的字典
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(app.config['SQLALCHEMY_ENGINE_OPTIONS'], poolclass=InstrumentedQueuePool)
     db.init_app(app) # 数据库初始化
     migrate.init_app(app, db) # 数据库迁移初始化
     jwt.init_app(app) # jwt初始化
@@ -30,8 +52,29 @@ def create_app(config_name):
         db=app.config['REDIS_DB'],
         password=app.config['REDIS_PASSWORD']
     )
+    token_blocklist.init_app(app)
+    # 初始化实体缓存
+    note_cache.init_app(app)
+    project_cache.init_app(app)
+    user_cache.init_app(app)
+    # 初始化后台任务队列
+    job_queue.init_app(app)
+    # 初始化笔记文件异步写回
+    note_file_writer.init_app(app)
+    # 初始化数据库查询统计
+    query_stats.init_app(app)
+    # 初始化笔记内容压缩
+    content_codec.init_app(app)
+    # 初始化密码哈希线程池与登录限流
+    hash_executor.init_app(app)
+    login_limiter.init_app(app)
+    # 初始化监控指标，/metrics 仅限内部访问
+    metrics.init_app(app, redis_client)
+    if metrics.enabled:
+        app.add_url_rule('/metrics', 'metrics', internal_only(metrics.export))
 
     app.register_blueprint(api_blueprint) # 注册API蓝图
+    register_commands(app) # 注册命令行命令
 
     CORS(app)
     return app
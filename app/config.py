@@ -12,6 +12,24 @@ DATABASE = os.getenv('MYSQL_DATABASE')
 DIALECT = 'mysql'
 DRIVER = 'pymysql'
 
+# 数据库引擎及连接池配置，环境变量优先，否则使用各环境的默认值
+def build_engine_options(pool_size, max_overflow):
+    statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)), # 常驻连接数
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', max_overflow)), # 高峰期允许额外创建的连接数
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)), # 获取连接的最长等待时间（秒）
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)), # 连接最长存活时间（秒），需小于 MySQL wait_timeout，避免 gone away
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True') == 'True', # 取出连接前检测是否可用
+        'connect_args': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+            'read_timeout': int(os.getenv('DB_READ_TIMEOUT', 60)),
+            'write_timeout': int(os.getenv('DB_WRITE_TIMEOUT', 60)),
+            # 单条查询语句的最长执行时间（毫秒）
+            'init_command': 'SET SESSION max_execution_time={}'.format(statement_timeout_ms)
+        }
+    }
+
 class Config(object):
 
     DEBUG = os.getenv('FLASK_DEBUG')
@@ -23,27 +41,105 @@ class Config(object):
 
     # 配置数据库连接字符串
     SQLALCHEMY_DATABASE_URI = '{}+{}://{}:{}@{}:{}/{}?charset=utf8mb4'.format(DIALECT, DRIVER, USERNAME, PASSWORD, HOSTNAEME, PORT, DATABASE)
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(pool_size=5, max_overflow=10)
 
     #JWT配置
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1) # 1小时
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=1) # 1天
     # JWT_BLOCKLIST_TOKEN_CHECKS = ['access', 'refresh'] # 检查类型
+    JWT_BLOCKLIST_LOCAL = os.getenv('JWT_BLOCKLIST_LOCAL', 'True') == 'True' # 是否启用进程内黑名单缓存
+    JWT_BLOCKLIST_SYNC_INTERVAL = int(os.getenv('JWT_BLOCKLIST_SYNC_INTERVAL', 5)) # 黑名单增量同步间隔（秒）
 
     # Redis配置
     REDIS_HOST = os.getenv('REDIS_HOST')
     REDIS_PORT = os.getenv('REDIS_PORT')
     REDIS_DB = os.getenv('REDIS_DB')
     REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
+
+    # 实体缓存配置
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'True') == 'True'
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300)) # 缓存过期时间（秒）
+
+    # 笔记导入配置
+    NOTE_IMPORT_CHUNK_SIZE = int(os.getenv('NOTE_IMPORT_CHUNK_SIZE', 500)) # 批量写入的批次大小
+    NOTE_IMPORT_MAX_MEMBER_SIZE = int(os.getenv('NOTE_IMPORT_MAX_MEMBER_SIZE', 20 * 1024 * 1024)) # 压缩包内单个文件解压后的最大字节数
+    NOTE_IMPORT_MAX_TOTAL_SIZE = int(os.getenv('NOTE_IMPORT_MAX_TOTAL_SIZE', 500 * 1024 * 1024)) # 压缩包解压后的最大总字节数
+
+    # 后台任务配置（大文件导入、导出）
+    JOB_BACKEND = os.getenv('JOB_BACKEND', 'redis') # 任务状态存储：redis / memory（只能在测试中使用）
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2)) # 每个进程的任务线程数
+    JOB_TTL = int(os.getenv('JOB_TTL', 24 * 60 * 60)) # 任务状态及产物保留时长（秒）
+    # 任务产物目录，同一台服务器上的所有进程共用；多台服务器部署时需配置为共享目录（如 NFS），否则只能从生成产物的服务器下载
+    JOB_ARTIFACT_DIR = os.getenv('JOB_ARTIFACT_DIR', os.path.join(os.path.expanduser('~'), 'lifocus_data', 'jobs'))
+
+    # 笔记文件镜像配置
+    NOTE_MIRROR_COALESCE_WINDOW = float(os.getenv('NOTE_MIRROR_COALESCE_WINDOW', 0.5)) # 同一文件多次写入的合并窗口（秒）
+    NOTE_MIRROR_WORKERS = int(os.getenv('NOTE_MIRROR_WORKERS', 2)) # 写文件的线程数
+
+    # 增量同步配置
+    NOTE_SYNC_LAG_SECONDS = int(os.getenv('NOTE_SYNC_LAG_SECONDS', 2)) # 同步上界落后当前时间的秒数，避免遗漏同一秒内稍后提交的变更
+    NOTE_SYNC_MAX_LIMIT = int(os.getenv('NOTE_SYNC_MAX_LIMIT', 1000)) # 每类数据单次返回的最大条数
+
+    # 增量更新笔记内容：单次请求最多的补丁操作数
+    NOTE_PATCH_MAX_OPS = int(os.getenv('NOTE_PATCH_MAX_OPS', 1000))
+
+    # 列表接口使用 orjson 编码响应（需安装 orjson，输出不转义非 ASCII 字符）
+    JSON_USE_ORJSON = os.getenv('JSON_USE_ORJSON', 'False') == 'True'
+
+    # 数据库查询统计配置
+    QUERY_STATS_ENABLED = os.getenv('QUERY_STATS_ENABLED', 'True') == 'True'
+    SLOW_QUERY_THRESHOLD_MS = int(os.getenv('SLOW_QUERY_THRESHOLD_MS', 200)) # 慢查询阈值（毫秒）
+
+    # Prometheus 监控指标，多进程部署时需设置 PROMETHEUS_MULTIPROC_DIR
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+
+    # 笔记内容压缩：为空时不压缩，可选 zlib、zstd（需安装 zstandard）；已有数据可用 flask compress-notes 重写
+    # 压缩后的字节存 BLOB 列，原文另存到单独建全文索引的 note_search_text 表，按内容搜索不受影响；
+    # 读取笔记只读压缩列（行更小），但检索原文仍要占用存储，开启压缩不会减少总存储量
+    NOTE_CONTENT_CODEC = os.getenv('NOTE_CONTENT_CODEC', '')
+    NOTE_CONTENT_COMPRESS_LEVEL = int(os.getenv('NOTE_CONTENT_COMPRESS_LEVEL', 6))
+    NOTE_CONTENT_COMPRESS_MIN_SIZE = int(os.getenv('NOTE_CONTENT_COMPRESS_MIN_SIZE', 1024)) # 短于该长度（字符）的内容不压缩
+    # 拆分内容表的过渡期（迁移 b7e3f1a9c2d4 之后、c5a8d2e6f013 之前）开启：笔记内容同时写回 note.content，
+    # 仍在运行或回滚后的旧版本服务读到的是最新内容；执行 c5a8d2e6f013 前必须关闭，开启时不能同时开启压缩
+    NOTE_CONTENT_DUAL_WRITE = os.getenv('NOTE_CONTENT_DUAL_WRITE', 'False') == 'True'
+
+    # 密码哈希线程池配置
+    HASH_WORKERS = int(os.getenv('HASH_WORKERS', 2)) # 同时进行密码哈希计算的线程数
+    HASH_QUEUE_SIZE = int(os.getenv('HASH_QUEUE_SIZE', 16)) # 排队上限，超出时返回 503
+    HASH_TIMEOUT = int(os.getenv('HASH_TIMEOUT', 10)) # 等待哈希结果的超时时间（秒）
+
+    # 登录限流配置（固定窗口）
+    LOGIN_RATE_LIMIT_ENABLED = os.getenv('LOGIN_RATE_LIMIT_ENABLED', 'True') == 'True'
+    LOGIN_RATE_LIMIT_WINDOW = int(os.getenv('LOGIN_RATE_LIMIT_WINDOW', 60)) # 窗口长度（秒）
+    LOGIN_RATE_LIMIT_PER_USER = int(os.getenv('LOGIN_RATE_LIMIT_PER_USER', 10)) # 每个用户名窗口内最多尝试次数
+    LOGIN_RATE_LIMIT_PER_IP = int(os.getenv('LOGIN_RATE_LIMIT_PER_IP', 30)) # 每个 IP 窗口内最多尝试次数
+
+    # 内部接口（监控指标等）允许访问的 IP
+    INTERNAL_ALLOWED_IPS = os.getenv('INTERNAL_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+    # 内部接口访问令牌，非调试模式下必须配置，否则内部接口一律拒绝
+    INTERNAL_ACCESS_TOKEN = os.getenv('INTERNAL_ACCESS_TOKEN', '')
+    # 服务前面的反向代理层数：大于 0 时按 X-Forwarded-For 解析真实客户端地址（只信任这么多层代理追加的地址）
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
 class DevelopmentConfig(Config):
     DEBUG = True
 
 class ProuctionConfig(Config):
     DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(pool_size=10, max_overflow=20)
     # SQLALCHEMY_DATABASE_URI = ''
 
+# 测试环境：使用 SQLite 数据库，Redis 由测试替换为 fakeredis，见 tests/conftest.py
+class TestingConfig(Config):
+    TESTING = True
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite:///lifocus_test.db')
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    JOB_BACKEND = 'memory'
+
 config = {
     'development': DevelopmentConfig,
     'production': ProuctionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
@@ -25,6 +25,7 @@ auth_ns = Namespace('auth', description='Authentication', path='/auth')
 user_ns = Namespace('user', description='User', path='/user')
 project_ns = Namespace('project', description='Project', path='/project')
 note_ns = Namespace('note', description='Note', path='/note')
+system_ns = Namespace('system', description='System', path='/system')
 
 from app.controllers.auth import Register
 from app.controllers.auth import Login
@@ -40,14 +41,24 @@ from app.controllers.project import SingleProjectManager, UserProjectManager
 project_ns.add_resource(SingleProjectManager, '/singleProject', '/singleProject/<int:project_id>')
 project_ns.add_resource(UserProjectManager, '/userProject')
 
-from app.controllers.note import SingleNoteManager, ProjectNoteManager, AllNoteManager, NoteExportManager, NoteImportManager
+from app.controllers.note import SingleNoteManager, ProjectNoteManager, AllNoteManager, NoteExportManager, NoteImportManager, NoteJobManager, NoteJobArtifactManager, NoteSearchManager, NoteChangesManager
 note_ns.add_resource(SingleNoteManager, '/singleNote', '/singleNote/<int:note_id>')
 note_ns.add_resource(ProjectNoteManager, '/projectNote')
 note_ns.add_resource(AllNoteManager, '/allNote')
 note_ns.add_resource(NoteExportManager, '/export')
 note_ns.add_resource(NoteImportManager, '/import')
+note_ns.add_resource(NoteJobManager, '/jobs/<string:job_id>')
+note_ns.add_resource(NoteJobArtifactManager, '/jobs/<string:job_id>/artifact')
+note_ns.add_resource(NoteSearchManager, '/search')
+note_ns.add_resource(NoteChangesManager, '/changes')
+
+from app.controllers.system import PoolStatsManager, CacheStatsManager, QueryStatsManager
+system_ns.add_resource(PoolStatsManager, '/pool')
+system_ns.add_resource(CacheStatsManager, '/cache')
+system_ns.add_resource(QueryStatsManager, '/queries')
 
 api.add_namespace(auth_ns)
 api.add_namespace(user_ns)
 api.add_namespace(project_ns)
-api.add_namespace(note_ns)
\ No newline at end of file
+api.add_namespace(note_ns)
+api.add_namespace(system_ns)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from app.controllers import auth_ns
 from flask_restx import fields
+from app.utils import RequestSchema
 
 # 注册 需要的参数
 register_request_model = auth_ns.model('RegisterRequestModel', {
@@ -47,4 +48,8 @@ login_response_model = auth_ns.model('LoginResponseModel', {
 logout_response_model = auth_ns.model('LogoutResponseModel', {
     'code': fields.Integer(required=True, description='自定义状态码'),
     'message': fields.String(required=True, description='返回信息'),
-})
\ No newline at end of file
+})
+
+# 请求参数校验（模块加载时生成，各接口复用）
+register_request_schema = RequestSchema(register_request_model, username=dict(help='用户名不能为空'), password=dict(help='密码不能为空'))
+login_request_schema = RequestSchema(login_request_model, username=dict(help='用户名不能为空'), password=dict(help='密码不能为空'))
@@ -1,9 +1,21 @@
-from flask_restx import Resource, reqparse
+from flask import request, current_app
+from flask_restx import Resource
 from app.controllers import auth_ns
 from app.models import User
 from werkzeug.security import check_password_hash
 from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, get_jwt, get_jwt_identity, jwt_required
-from .auth_api_model import login_request_model, login_response_model
+from .auth_api_model import login_request_model, login_response_model, login_request_schema
+from app.extension import hash_executor, login_limiter
+from app.utils import HashBusyError
+
+# 按 IP 限流使用的客户端地址：配置了 PROXY_FIX_X_FOR 时 remote_addr 已由 ProxyFix 解析为真实客户端地址；
+# 请求经过代理（带 X-Forwarded-For）但没有配置代理层数时，remote_addr 是代理地址，所有用户共用，
+# 按它限流会变成全局限流（一个人就能让所有人无法登录），此时不按 IP 限流，只按用户名限流
+def client_ip():
+    if request.headers.get('X-Forwarded-For') and not current_app.config['PROXY_FIX_X_FOR']:
+        current_app.logger.warning('请求经过反向代理但未配置 PROXY_FIX_X_FOR，登录不按 IP 限流')
+        return None
+    return request.remote_addr
 
 def generate_token(user_id):
     access_token = create_access_token(identity=str(user_id))
@@ -18,19 +30,20 @@ class Login(Resource):
     @auth_ns.doc(description='用户登录')
     @auth_ns.marshal_with(login_response_model)
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('username', type=str, required=True, help='用户名不能为空')
-        parser.add_argument('password', type=str, required=True, help='密码不能为空')
         try:
-            data = parser.parse_args()
+            data = login_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
+        # 限流检查放在密码哈希之前，避免暴力尝试消耗 CPU
+        retry_after = login_limiter.hit(data['username'], client_ip())
+        if retry_after:
+            return {'code': 429, 'message': '登录尝试过于频繁，请{}秒后重试'.format(retry_after)}, 429, {'Retry-After': str(retry_after)}
         try:
             user = User.getUser(data['username'])
             if user:
                 true_password = user.password
                 salt = user.salt
-                valid = check_password_hash(true_password, salt + data['password'])
+                valid = hash_executor.run(check_password_hash, true_password, salt + data['password'])
                 if valid:
                     token_data = generate_token(user.id)
                     decoded_token = decode_token(token_data['access_token']) # 解析过期时间 返回给前端
@@ -44,6 +57,8 @@ class Login(Resource):
                     }, 200
                 else:
                     return {'code': 400, 'message': '密码错误'}, 400
+        except HashBusyError as e:
+            return {'code': 503, 'message': str(e)}, 503, {'Retry-After': '1'}
         except Exception as e:
             return {'code': 500, 'message': '登录失败'}, 500
         else:
@@ -1,22 +1,19 @@
 import uuid
-from flask_restx import Resource, reqparse
+from flask_restx import Resource
 from werkzeug.security import generate_password_hash
 from app.controllers import auth_ns
-from .auth_api_model import register_request_model, register_response_model
+from .auth_api_model import register_request_model, register_response_model, register_request_schema
 from app.models import User
-from app.utils import checkEmailFormat
+from app.utils import checkEmailFormat, HashBusyError
+from app.extension import hash_executor
 
 class Register(Resource):
     @auth_ns.expect(register_request_model)
     @auth_ns.doc(description='用户注册')
     @auth_ns.marshal_with(register_response_model)
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('username', type=str, required=True, help='用户名不能为空')
-        parser.add_argument('email', type=str, required=False)
-        parser.add_argument('password', type=str, required=True, help='密码不能为空')
         try:
-            data = parser.parse_args()
+            data = register_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         if data['email']:
@@ -27,9 +24,11 @@ class Register(Resource):
             return {'code': 400, 'message': '邮箱<{}>已存在'.format(data['email'])}, 400
         try:
             data['salt'] = uuid.uuid4().hex
-            data['password'] = generate_password_hash(data['salt'] + data['password'])
+            data['password'] = hash_executor.run(generate_password_hash, data['salt'] + data['password'])
             user = User(**data)
             user.addUser()
             return {'code': 201, 'data':user.dict()}, 201
+        except HashBusyError as e:
+            return {'code': 503, 'message': str(e)}, 503, {'Retry-After': '1'}
         except Exception as e:
             return {'code': 500, 'message': '注册失败，' + str(e)}, 500
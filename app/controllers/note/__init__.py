@@ -1,3 +1,6 @@
 from .note_manager import SingleNoteManager, ProjectNoteManager, AllNoteManager
 from .note_export_manager import NoteExportManager
-from .note_import_manager import NoteImportManager
\ No newline at end of file
+from .note_import_manager import NoteImportManager
+from .note_job_manager import NoteJobManager, NoteJobArtifactManager
+from .note_search_manager import NoteSearchManager
+from .note_changes_manager import NoteChangesManager
\ No newline at end of file
@@ -1,5 +1,7 @@
 from app.controllers import note_ns
 from flask_restx import fields
+from app.utils import RequestSchema
+from app.controllers.project.project_api_model import project_model
 
 note_model = note_ns.model('Note', {
     'id': fields.Integer(required=True, description='笔记id'),
@@ -13,6 +15,7 @@ note_model = note_ns.model('Note', {
     'is_recycle': fields.Boolean(required=True, description='是否回收'),
     'is_share': fields.Boolean(required=True, description='是否共享'),
     'share_password': fields.String(required=True, description='共享密码'),
+    'content_hash': fields.String(description='笔记内容哈希，增量更新时作为基准版本'),
     'created_at': fields.String(required=True, description='创建时间'),
     'updated_at': fields.String(required=True, description='更新时间'),
 })
@@ -64,6 +67,29 @@ note_update_request_model = note_ns.model('NoteUpdateRequestModel', {
     'share_password': fields.String(required=False, description='共享密码'),
 })
 
+# 增量更新笔记内容需要的参数
+note_patch_op_model = note_ns.model('NotePatchOpModel', {
+    'offset': fields.Integer(required=True, description='修改位置（按 Unicode 字符计算，相对于基准版本的内容）'),
+    'delete': fields.Integer(required=False, description='删除的字符数'),
+    'insert': fields.String(required=False, description='插入的文本'),
+})
+note_patch_request_model = note_ns.model('NotePatchRequestModel', {
+    # 只按内容哈希判断版本：更新时间只精确到秒，同一秒内的两次修改无法区分
+    'base_hash': fields.String(required=True, description='基准版本的内容哈希（获取笔记时返回的 content_hash）'),
+    'ops': fields.List(fields.Nested(note_patch_op_model), required=True, description='补丁操作，按位置升序排列、互不重叠'),
+})
+# 增量更新返回：只返回新版本信息，不返回内容
+note_version_model = note_ns.model('NoteVersionModel', {
+    'id': fields.Integer(required=True, description='笔记id'),
+    'content_hash': fields.String(required=True, description='笔记内容哈希'),
+    'updated_at': fields.String(required=True, description='更新时间'),
+})
+note_patch_response_model = note_ns.model('NotePatchResponseModel', {
+    'code': fields.Integer(required=True, description='状态码'),
+    'message': fields.String(required=True, description='返回信息'),
+    'data': fields.Nested(note_version_model, allow_null=True),
+})
+
 # 删除笔记返回
 note_delete_response_model = note_ns.model('NoteDeleteResponseModel', {
     'code': fields.Integer(required=True, description='自定义状态码'),
@@ -81,12 +107,17 @@ note_page_model = note_ns.model('NotePageModel', {
     'pages': fields.Integer(required=True, description='总页数'),
     'page_no': fields.Integer(required=True, description='当前页码'),
     'page_size': fields.Integer(required=True, description='每页数量'),
+    'next_cursor': fields.String(required=False, description='下一页游标（游标分页模式）'),
+    'has_more': fields.Boolean(required=False, description='是否还有下一页（游标分页模式）'),
     'data': fields.List(fields.Nested(note_model_no_content), allow_null=True)
 })
 note_page_request_model = note_ns.model('NotePageRequestModel', {
     'query': fields.Nested(note_model, required=False, allow_null=True, description='查询条件'),
     'page_no': fields.Integer(required=False, description='页码'),
-    'page_size': fields.Integer(required=False, description='每页数量')
+    'page_size': fields.Integer(required=False, description='每页数量'),
+    'cursor': fields.String(required=False, description='游标，传入即启用游标分页（首页传空字符串）'),
+    'with_total': fields.Boolean(required=False, description='游标分页模式下是否统计总数'),
+    'sort_by': fields.String(required=False, description='排序条件，如 "updated_at desc"，可选 updated_at / created_at / title，默认按更新时间倒序（游标分页模式固定按更新时间倒序）')
 })
 note_page_response_model = note_ns.model('NotePageResponseModel', {
     'code': fields.Integer(required=True, description='自定义状态码'),
@@ -94,3 +125,78 @@ note_page_response_model = note_ns.model('NotePageResponseModel', {
     'page_data': fields.Nested(note_page_model, allow_null=True, description='分页数据')
 })
 
+# 增量同步
+note_tombstone_model = note_ns.model('NoteTombstoneModel', {
+    'type': fields.String(required=True, description='被删除数据的类型：note / project'),
+    'id': fields.Integer(required=True, description='被删除数据的ID'),
+    'deleted_at': fields.String(required=True, description='删除时间'),
+})
+note_changes_model = note_ns.model('NoteChangesModel', {
+    'notes': fields.List(fields.Nested(note_model_no_content), description='新增、更新或移入回收站的笔记（不含内容）'),
+    'projects': fields.List(fields.Nested(project_model), description='新增或更新的项目'),
+    'deleted': fields.List(fields.Nested(note_tombstone_model), description='已删除的项目（笔记删除时移入回收站，随 notes 下发）'),
+    'next_since': fields.String(required=True, description='下次请求使用的同步令牌'),
+    'has_more': fields.Boolean(required=True, description='是否还有未返回的变更（为真时应立即用 next_since 继续请求）'),
+})
+note_changes_response_model = note_ns.model('NoteChangesResponseModel', {
+    'code': fields.Integer(required=True, description='自定义状态码'),
+    'message': fields.String(required=True, description='返回信息'),
+    'data': fields.Nested(note_changes_model, allow_null=True),
+})
+
+# 请求参数校验（模块加载时生成，各接口复用）
+note_add_request_schema = RequestSchema(note_add_request_model)
+note_update_request_schema = RequestSchema(note_update_request_model)
+note_patch_request_schema = RequestSchema(note_patch_request_model)
+note_page_request_schema = RequestSchema(note_page_request_model, with_total=dict(default=False))
+note_all_page_request_schema = RequestSchema(note_page_request_model, exclude=('query',),
+                                             is_recent=dict(type=bool, default=False),
+                                             page_no=dict(default=1), page_size=dict(default=20),
+                                             with_total=dict(default=False))
+note_list_query_schema = RequestSchema(location='args', title=dict(type=str),
+                                       isRecent=dict(type=bool), projectId=dict(type=str))
+note_all_list_query_schema = RequestSchema(isRecent=dict(type=str))
+note_export_request_schema = RequestSchema(note_ids=dict(type=str, required=True, help='笔记 ID 列表'))
+note_changes_query_schema = RequestSchema(location='args', since=dict(type=str), limit=dict(type=int, default=200))
+note_search_query_schema = RequestSchema(location='args', q=dict(type=str, required=True, help='搜索关键字不能为空'),
+                                         projectId=dict(type=int), page_no=dict(type=int, default=1),
+                                         page_size=dict(type=int, default=20))
+
+# 后台任务信息
+note_job_model = note_ns.model('NoteJobModel', {
+    'id': fields.String(required=True, description='任务ID'),
+    'kind': fields.String(required=True, description='任务类型：import / export'),
+    'status': fields.String(required=True, description='任务状态：pending / running / succeeded / failed'),
+    'progress': fields.Integer(required=True, description='已处理数量'),
+    'total': fields.Integer(required=True, description='总数量'),
+    'result': fields.Raw(required=False, description='任务结果'),
+    'error': fields.String(required=False, description='错误信息'),
+    'artifact': fields.String(required=False, description='任务产物文件名（导出任务）'),
+    'created_at': fields.String(required=True, description='创建时间'),
+    'updated_at': fields.String(required=True, description='更新时间'),
+})
+
+note_job_response_model = note_ns.model('NoteJobResponseModel', {
+    'code': fields.Integer(required=True, description='自定义状态码'),
+    'message': fields.String(required=True, description='返回信息'),
+    'data': fields.Nested(note_job_model, allow_null=True),
+})
+
+# 全文检索结果
+note_search_item_model = note_ns.clone('NoteSearchItemModel', note_model_no_content, {
+    'score': fields.Float(required=False, description='相关度得分'),
+    'title_highlight': fields.String(required=True, description='高亮后的标题（HTML）'),
+    'snippet': fields.String(required=True, description='内容中命中关键字的高亮片段（HTML）'),
+})
+note_search_page_model = note_ns.model('NoteSearchPageModel', {
+    'total': fields.Integer(required=True, description='总条数'),
+    'pages': fields.Integer(required=True, description='总页数'),
+    'page_no': fields.Integer(required=True, description='当前页码'),
+    'page_size': fields.Integer(required=True, description='每页数量'),
+    'data': fields.List(fields.Nested(note_search_item_model), allow_null=True)
+})
+note_search_response_model = note_ns.model('NoteSearchResponseModel', {
+    'code': fields.Integer(required=True, description='自定义状态码'),
+    'message': fields.String(required=True, description='返回信息'),
+    'page_data': fields.Nested(note_search_page_model, allow_null=True, description='分页数据')
+})
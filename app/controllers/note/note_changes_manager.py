@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_restx import Resource
+from app.controllers import note_ns
+from app.models import Note, Project, SyncTombstone
+from app.utils import fast_marshal_with, encode_sync_token, decode_sync_token
+from .note_api_model import note_changes_response_model, note_changes_query_schema
+
+class NoteChangesManager(Resource):
+    """
+    增量同步：返回同步令牌之后新增、更新、移入回收站的笔记和项目，以及已删除项目的记录（笔记只会移入回收站，随 notes 下发）。
+    每轮同步固定一个时间上界 until（落后当前时间几秒，且不晚于仍未提交的最早事务的开始时间，保证上界之前的变更都已提交），
+    笔记、项目、删除记录各自按 (时间, id) 正序分批返回，has_more 为真时用 next_since 继续请求；
+    本轮取完后 next_since 从 until 开始，下次只返回之后的变更。不传 since 时返回全部数据
+    """
+    @jwt_required()
+    @note_ns.doc(description='增量同步：获取同步令牌之后变更的笔记和项目')
+    @fast_marshal_with(note_ns, note_changes_response_model)
+    def get(self):
+        try:
+            data = note_changes_query_schema.parse()
+        except Exception as e:
+            return {'code': 400, 'message': '参数错误'}, 400
+        limit = min(max(data['limit'] or 200, 1), current_app.config['NOTE_SYNC_MAX_LIMIT'])
+        try:
+            state = decode_sync_token(data['since']) if data['since'] else {}
+        except ValueError as e:
+            return {'code': 400, 'message': str(e)}, 400
+        try:
+            current_user_id = get_jwt_identity()
+            until = state.get('until')
+            if until is None:
+                until = self._upper_bound()
+            notes = Note.getChangedNotesByUserIdSince(current_user_id, state.get('notes'), until, limit)
+            projects = Project.getChangedProjectsByAccountIdSince(current_user_id, state.get('projects'), until, limit)
+            deleted = SyncTombstone.getTombstonesByAccountIdSince(current_user_id, state.get('deleted'), until, limit)
+            has_more = len(notes) > limit or len(projects) > limit or len(deleted) > limit
+            notes, projects, deleted = notes[:limit], projects[:limit], deleted[:limit]
+            if has_more:
+                # 本轮未取完：保持上界不变，记录各类数据已返回到的位置
+                next_state = {
+                    'until': until,
+                    'notes': (notes[-1].updated_at, notes[-1].id) if notes else state.get('notes'),
+                    'projects': (projects[-1].updated_at, projects[-1].id) if projects else state.get('projects'),
+                    'deleted': (deleted[-1].deleted_at, deleted[-1].id) if deleted else state.get('deleted'),
+                }
+            else:
+                # 本轮已取完：下一轮从上界开始（上界受未提交事务限制可能早于上一轮，已返回到的位置不回退）
+                next_state = {key: max(filter(None, (state.get(key), (until, 0))))
+                              for key in ('notes', 'projects', 'deleted')}
+                next_state['until'] = None
+            return {'code': 200, 'message': '查询成功', 'data': {
+                'notes': notes,
+                'projects': projects,
+                'deleted': [tombstone.dict() for tombstone in deleted],
+                'next_since': encode_sync_token(next_state),
+                'has_more': has_more,
+            }}, 200
+        except Exception as e:
+            return {'code': 500, 'message': str(e)}, 500
+
+    @staticmethod
+    def _upper_bound():
+        until = datetime.now().replace(microsecond=0) - timedelta(seconds=current_app.config['NOTE_SYNC_LAG_SECONDS'])
+        oldest = SyncTombstone.getOldestOpenTransactionStart()
+        # trx_started 只精确到秒，再减一秒，保证该事务写入的 updated_at 都不早于上界
+        if oldest is not None and oldest - timedelta(seconds=1) < until:
+            until = oldest - timedelta(seconds=1)
+        return until
@@ -1,46 +1,60 @@
 
-import os
+import io
 import zipfile
 import re
-import tempfile
-from flask import send_file
+from flask import request, send_file, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_restx import Resource, reqparse
+from flask_restx import Resource
 from app.controllers import note_ns
-from app.models import Note, Project
+from app.models import Note
+from app.extension import job_queue
+from .note_api_model import note_export_request_schema
 from datetime import datetime
 
+class _ZipStreamBuffer(object):
+    """只写缓冲区：ZipFile 写入其中，生成器每写完一个文件就取走已产生的字节"""
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
 class NoteExportManager(Resource):
     @jwt_required()
     @note_ns.doc('根据笔记 ID 列表导出笔记内容为 MarkDown 格式')
     def post(self):
         try:
             current_user_id = get_jwt_identity()
-            parser = reqparse.RequestParser()
-            parser.add_argument('note_ids', type=str, required=True, help='笔记 ID 列表')
-            data = parser.parse_args()
+            data = note_export_request_schema.parse()
 
-            note_ids = data['note_ids'].split(',')
-            if not note_ids or not isinstance(note_ids, list):
+            note_ids = [note_id.strip() for note_id in data['note_ids'].split(',') if note_id.strip()]
+            if not note_ids:
                 return {'code': 400, 'message': '笔记 ID 列表不能为空'}, 400
+            if not all(note_id.isdigit() for note_id in note_ids):
+                return {'code': 400, 'message': '笔记 ID 格式错误'}, 400
+            note_ids = list(dict.fromkeys(int(note_id) for note_id in note_ids))
 
-            # 验证用户权限并获取笔记
-            notes = []
+            # 验证用户权限：一次查询获取所有笔记的归属
+            owners = dict(Note.getNoteOwnersByIds(note_ids))
             for note_id in note_ids:
-                note = Note.getNoteById(note_id)
-                if not note:
+                if note_id not in owners:
                     return {'code': 404, 'message': f'笔记 {note_id} 不存在'}, 404
-
                 # 验证笔记属于当前用户
-                project = Project.getProjectById(note.project_id)
-                if not project or str(project.account_id) != current_user_id:
+                if str(owners[note_id]) != current_user_id:
                     return {'code': 403, 'message': f'无权限访问笔记 {note_id}'}, 403
 
-                notes.append(note)
-
             # 如果只有一个笔记，直接导出为 Markdown 文件
-            if len(notes) == 1:
-                note = notes[0]
+            if len(note_ids) == 1:
+                note = Note.getNoteById(note_ids[0])
 
                 # 创建Markdown格式的内容
                 md_content = self._convert_to_markdown(note)
@@ -52,57 +66,59 @@ class NoteExportManager(Resource):
                     safe_title = f"note_{note.id}"
                 md_filename = f"{safe_title}.md"
 
-                # 创建临时文件
-                temp_dir = tempfile.mkdtemp()
-                md_path = os.path.join(temp_dir, md_filename)
-
-                with open(md_path, 'w', encoding='utf-8') as f:
-                    f.write(md_content)
-
-                # 返回 Markdown 文件下载
+                # 返回 Markdown 文件下载（内存中生成，不落盘）
                 return send_file(
-                    md_path,
+                    io.BytesIO(md_content.encode('utf-8')),
                     as_attachment=True,
                     download_name=md_filename,
                     mimetype='text/markdown'
                 )
             else:
-                # 多个笔记则打包为 ZIP 文件
-                # 创建临时文件
+                # 多个笔记则打包为 ZIP 文件，边查询边压缩边输出
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                temp_dir = tempfile.mkdtemp()
                 zip_filename = f"notes_export_{timestamp}.zip"
-                zip_path = os.path.join(temp_dir, zip_filename)
-
-                # 创建ZIP文件
-                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for i, note in enumerate(notes):
-                        # 创建Markdown格式的内容
-                        md_content = self._convert_to_markdown(note)
-
-                        # 使用笔记标题作为文件名，支持空格和中文，移除特殊字符
-                        safe_title = self._sanitize_filename(note.title)
-                        safe_title = note.title
-                        if not safe_title:
-                            safe_title = f"note_{note.id}"
-                        # 防止文件名重复
-                        file_name = f"{safe_title}.md"
-                        if file_name in zipf.namelist():
-                            file_name = f"{safe_title}_{i}.md"
-
-                        # 将内容写入ZIP
-                        zipf.writestr(file_name, md_content)
+
+                # async=true 时作为后台任务执行，完成后通过任务接口下载产物
+                if request.args.get('async', '').lower() in ('1', 'true'):
+                    job_id = job_queue.submit('export', current_user_id, run_export_job, note_ids, zip_filename)
+                    return {'code': 202, 'message': '导出任务已提交', 'data': {'job_id': job_id}}, 202
 
                 # 返回 ZIP 文件下载
-                return send_file(
-                    zip_path,
-                    as_attachment=True,
-                    download_name=zip_filename,
-                    mimetype='application/zip'
+                return Response(
+                    stream_with_context(self._generate_zip(note_ids)),
+                    mimetype='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename={zip_filename}'}
                 )
         except Exception as e:
             return {'code': 500, 'message': f'导出失败：{str(e)}'}, 500
 
+    def _generate_zip(self, note_ids, progress=None):
+        """流式生成 ZIP：每写入一个笔记就把压缩后的数据交给响应，内存占用与笔记数量无关"""
+        buffer = _ZipStreamBuffer()
+        file_names = set()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for i, note in enumerate(Note.iterNotesByIds(note_ids)):
+                if progress:
+                    progress(i, len(note_ids))
+                # 创建Markdown格式的内容
+                md_content = self._convert_to_markdown(note)
+
+                # 使用笔记标题作为文件名，支持空格和中文
+                safe_title = note.title
+                if not safe_title:
+                    safe_title = f"note_{note.id}"
+                # 防止文件名重复
+                file_name = f"{safe_title}.md"
+                if file_name in file_names:
+                    file_name = f"{safe_title}_{i}.md"
+                file_names.add(file_name)
+
+                # 将内容写入ZIP
+                zipf.writestr(file_name, md_content)
+                yield buffer.drain()
+        # 写入 ZIP 中央目录
+        yield buffer.drain()
+
     def _sanitize_filename(self, title):
         """清理文件名，保留字母、数字、空格、中文字符和基本标点"""
         # 使用正则表达式保留字母、数字、空格、中文字符和基本标点
@@ -139,4 +155,12 @@ class NoteExportManager(Resource):
         # 添加笔记内容
         md_content += note.content
 
-        return md_content
\ No newline at end of file
+        return md_content
+
+
+def run_export_job(job, note_ids, zip_filename):
+    """后台导出任务：将 ZIP 写入任务产物目录"""
+    with open(job.artifact_path(zip_filename), 'wb') as f:
+        for chunk in NoteExportManager()._generate_zip(note_ids, job.progress):
+            f.write(chunk)
+    return {'count': len(note_ids), 'filename': zip_filename}
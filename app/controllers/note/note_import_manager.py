@@ -1,23 +1,41 @@
-from flask import request
-from flask_jwt_extended import jwt_required
+from flask import request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_restx import Resource, reqparse
 from app.controllers import note_ns
 from app.models import Note, Project
+from app.extension import job_queue
+from app.utils import JobError
+from .note_manager import save_note_to_file_system
 from datetime import datetime
 import os
+import posixpath
+import tempfile
 import zipfile
 from werkzeug.utils import secure_filename
 
 
+class ZipImportLimitError(Exception):
+    """压缩包解压大小超过限制"""
+    pass
+
+
+# 导入模式：skip 跳过标题和内容都相同的笔记，overwrite 覆盖同名笔记的内容，duplicate 总是新增
+IMPORT_MODES = ('skip', 'overwrite', 'duplicate')
+
+
 class NoteImportManager(Resource):
     @jwt_required()
-    @note_ns.doc(description='导入笔记 - 支持单个MD文件或ZIP压缩包')
+    @note_ns.doc(description='导入笔记 - 支持单个MD文件或ZIP压缩包，mode 指定已存在笔记的处理方式：skip（默认）/ overwrite / duplicate')
     def post(self):
         project_id = request.headers.get('X-Project-Id')
         if not project_id:
             return {'code': 400, 'message': '项目ID不能为空'}, 400
 
-        project = Project.getProjectById(project_id)
+        mode = request.args.get('mode', 'skip')
+        if mode not in IMPORT_MODES:
+            return {'code': 400, 'message': f'导入模式只支持 {" / ".join(IMPORT_MODES)}'}, 400
+
+        project = Project.getProjectDictById(project_id)
         if not project:
             return {'code': 404, 'message': '项目不存在'}, 404
 
@@ -38,10 +56,12 @@ class NoteImportManager(Resource):
             # 根据文件扩展名判断处理方式
             if filename.lower().endswith('.md'):
                 # 单个MD文件处理
-                result = self._import_single_md(file, project_id)
+                result = self._import_single_md(file, project_id, mode)
             elif filename.lower().endswith('.zip'):
-                # ZIP压缩包处理
-                result = self._import_zip_file(file, project_id)
+                # ZIP压缩包处理，async=true 时作为后台任务执行
+                if request.args.get('async', '').lower() in ('1', 'true'):
+                    return self._submit_import_job(file, project_id, mode)
+                result = self._import_zip_file(file.stream, project_id, mode)
             else:
                 return {'code': 400, 'message': '只支持 .md 或 .zip 文件'}, 400
 
@@ -49,7 +69,7 @@ class NoteImportManager(Resource):
         except Exception as e:
             return {'code': 500, 'message': f'导入失败：{str(e)}'}, 500
 
-    def _import_single_md(self, file, project_id):
+    def _import_single_md(self, file, project_id, mode='skip'):
         """导入单个MD文件"""
         try:
             content = file.read().decode('utf-8')
@@ -71,116 +91,145 @@ class NoteImportManager(Resource):
                 'is_share': False
             }
 
-            note = Note(**note_data)
-            note.addNote()
+            result = Note.importNotes(project_id, [note_data], mode, on_updated=self._mirror_saver(project_id))
+            if result['skipped']:
+                return {
+                    'code': 200,
+                    'message': '笔记已存在，已跳过',
+                    'data': result['skipped'][0]
+                }
 
             return {
                 'code': 200,
                 'message': '单个笔记导入成功',
-                'data': {'id': note.id, 'title': note.title}
+                'data': result['imported'][0]
             }
         except UnicodeDecodeError:
             return {'code': 500, 'message': '文件编码错误，请确保文件为UTF-8编码'}, 500
 
-    def _import_zip_file(self, file, project_id):
-        """导入ZIP压缩包中的MD文件（递归处理子文件夹）"""
-        import tempfile
-        import os
-        import chardet
+    def _submit_import_job(self, file, project_id, mode='skip'):
+        """保存上传文件后提交后台导入任务，立即返回任务ID"""
+        os.makedirs(current_app.config['JOB_ARTIFACT_DIR'], exist_ok=True)
+        fd, upload_path = tempfile.mkstemp(suffix='.zip', dir=current_app.config['JOB_ARTIFACT_DIR'])
+        with os.fdopen(fd, 'wb') as upload_file:
+            file.save(upload_file)
+        job_id = job_queue.submit('import', get_jwt_identity(), run_import_job, upload_path, project_id, mode)
+        return {'code': 202, 'message': '导入任务已提交', 'data': {'job_id': job_id}}, 202
+
+    def _import_zip_file(self, stream, project_id, mode='skip', progress=None):
+        """导入ZIP压缩包中的MD文件（递归处理子文件夹），直接从压缩包中流式读取，不解压到磁盘"""
+        max_member_size = current_app.config['NOTE_IMPORT_MAX_MEMBER_SIZE']
+        max_total_size = current_app.config['NOTE_IMPORT_MAX_TOTAL_SIZE']
 
         try:
-            # 创建临时目录
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # 保存上传的ZIP文件
-                zip_path = os.path.join(temp_dir, 'upload.zip')
-                file.save(zip_path)
-
-                # 解压文件
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    # 修复文件名编码问题
-                    for info in zip_ref.infolist():
-                        # 获取原始文件名
-                        original_filename = info.filename
-
-                        # 尝试修复中文文件名编码问题
-                        try:
-                            # 检查文件名是否包含非ASCII字符
-                            original_filename.encode('ascii')
-                            safe_filename = original_filename
-                        except UnicodeEncodeError:
-                            # 尝试使用 GBK 解码（常见于 Windows 创建的 ZIP）
-                            try:
-                                safe_filename = original_filename.encode('cp437').decode('gbk')
-                            except (UnicodeDecodeError, UnicodeEncodeError):
-                                # 如果 GBK 也不行，尝试 UTF-8
-                                try:
-                                    safe_filename = original_filename.encode('cp437').decode('utf-8')
-                                except (UnicodeDecodeError, UnicodeEncodeError):
-                                    # 最后尝试忽略错误
-                                    safe_filename = original_filename.encode('utf-8', errors='ignore').decode('utf-8')
-
-                        # 确保路径安全
-                        safe_filename = os.path.normpath(safe_filename)
-
-                        # 防止路径遍历攻击
-                        if '..' in safe_filename or safe_filename.startswith('/'):
-                            continue
-
-                        # 提取文件
-                        zip_ref.extract(info, temp_dir)
-
-                        # 重命名文件（如果需要）
-                        original_extracted_path = os.path.join(temp_dir, info.filename)
-                        safe_extracted_path = os.path.join(temp_dir, safe_filename)
-
-                        if os.path.exists(original_extracted_path) and original_extracted_path != safe_extracted_path:
-                            try:
-                                os.renames(original_extracted_path, safe_extracted_path)
-                            except OSError:
-                                # 如果重命名失败，继续使用原始路径
-                                pass
-
-                # 递归遍历目录，查找所有MD文件
-                imported_notes = []
-
-                # 遍历临时目录中的所有文件和子目录
-                for root, dirs, files in os.walk(temp_dir):
-                    for filename in files:
-                        if filename.lower().endswith('.md'):
-                            file_path = os.path.join(root, filename)
-
-                            # 读取MD文件内容
-                            with open(file_path, 'r', encoding='utf-8') as md_file:
-                                content = md_file.read()
-
-                            # 生成标题（使用文件名，去除扩展名）
-                            title = os.path.splitext(filename)[0]
-                            # 创建笔记
-                            note_data = {
-                                'project_id': project_id,
-                                'type': 'note',
-                                'title': title,
-                                'content': content,
-                                'folder': 'imported',
-                                'status': 'active',
-                                'is_archived': False,
-                                'is_recycle': False,
-                                'is_share': False
-                            }
-
-                            note = Note(**note_data)
-                            note.addNote()
-                            imported_notes.append({'id': note.id, 'title': note.title})
+            with zipfile.ZipFile(stream, 'r') as zip_ref:
+                # 先根据中央目录筛选MD文件并检查声明的大小，超限时不做任何解压
+                md_members = []
+                declared_total_size = 0
+                for info in zip_ref.infolist():
+                    if info.is_dir():
+                        continue
+                    filename = self._repair_zip_filename(info)
+                    # 跳过 macOS 打包产生的资源文件
+                    if filename.startswith('__MACOSX/') or not filename.lower().endswith('.md'):
+                        continue
+                    if info.file_size > max_member_size:
+                        return {'code': 413, 'message': f'文件 {filename} 超过大小限制'}, 413
+                    declared_total_size += info.file_size
+                    if declared_total_size > max_total_size:
+                        return {'code': 413, 'message': '压缩包解压后总大小超过限制'}, 413
+                    md_members.append((info, filename))
+
+                def iter_notes_data():
+                    total_size = 0
+                    for i, (info, filename) in enumerate(md_members):
+                        if progress:
+                            progress(i, len(md_members))
+                        # 读取时再次限制大小，防止伪造的文件头
+                        with zip_ref.open(info) as md_file:
+                            raw = md_file.read(max_member_size + 1)
+                        total_size += len(raw)
+                        if len(raw) > max_member_size or total_size > max_total_size:
+                            raise ZipImportLimitError(f'文件 {filename} 超过大小限制')
+                        content = raw.decode('utf-8')
+
+                        # 生成标题（使用文件名，去除扩展名）
+                        title = posixpath.splitext(posixpath.basename(filename))[0]
+                        # 创建笔记
+                        yield {
+                            'project_id': project_id,
+                            'type': 'note',
+                            'title': title,
+                            'content': content,
+                            'folder': 'imported',
+                            'status': 'active',
+                            'is_archived': False,
+                            'is_recycle': False,
+                            'is_share': False
+                        }
+
+                # 批量写入，整个压缩包在一个事务内导入
+                result = Note.importNotes(project_id, iter_notes_data(), mode, current_app.config['NOTE_IMPORT_CHUNK_SIZE'],
+                                          on_updated=self._mirror_saver(project_id))
+                message = f'成功导入 {len(result["imported"])} 个笔记'
+                if result['skipped']:
+                    message += f'，跳过 {len(result["skipped"])} 个已存在的笔记'
 
                 return {
                     'code': 200,
-                    'message': f'成功导入 {len(imported_notes)} 个笔记',
-                    'data': imported_notes
+                    'message': message,
+                    'data': result['imported'],
+                    'skipped': result['skipped']
                 }
         except zipfile.BadZipFile:
             return {'code': 500, 'message': 'ZIP文件格式错误'}, 500
+        except ZipImportLimitError as e:
+            return {'code': 413, 'message': str(e)}, 413
         except UnicodeDecodeError:
             return {'code': 500, 'message': 'MD文件编码错误，请确保文件为UTF-8编码'}, 500
         except Exception as e:
             return {'code': 500, 'message': f'ZIP处理失败：{str(e)}'}, 500
 
+    def _mirror_saver(self, project_id):
+        """被覆盖的笔记在提交后写回文件系统（异步写回，与编辑保存一致）"""
+        project = Project.getProjectById(project_id)
+        def save(note):
+            if project:
+                save_note_to_file_system(note, project)
+        return save
+
+    def _repair_zip_filename(self, info):
+        """修复中文文件名编码问题（在内存中处理，不涉及文件重命名）"""
+        original_filename = info.filename
+        # 设置了 UTF-8 标志位的文件名已被正确解码
+        if info.flag_bits & 0x800:
+            return original_filename
+        try:
+            # 检查文件名是否包含非ASCII字符
+            original_filename.encode('ascii')
+            return original_filename
+        except UnicodeEncodeError:
+            pass
+        # 尝试使用 GBK 解码（常见于 Windows 创建的 ZIP）
+        try:
+            return original_filename.encode('cp437').decode('gbk')
+        except (UnicodeDecodeError, UnicodeEncodeError):
+            pass
+        # 如果 GBK 也不行，尝试 UTF-8
+        try:
+            return original_filename.encode('cp437').decode('utf-8')
+        except (UnicodeDecodeError, UnicodeEncodeError):
+            # 最后尝试忽略错误
+            return original_filename.encode('utf-8', errors='ignore').decode('utf-8')
+
+
+def run_import_job(job, upload_path, project_id, mode='skip'):
+    """后台导入任务：从保存的上传文件中导入笔记，完成后删除上传文件"""
+    try:
+        with open(upload_path, 'rb') as stream:
+            result = NoteImportManager()._import_zip_file(stream, project_id, mode, job.progress)
+    finally:
+        os.remove(upload_path)
+    if isinstance(result, tuple):
+        raise JobError(result[0]['message'])
+    return result
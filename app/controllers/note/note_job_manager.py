@@ -0,0 +1,52 @@
+import os
+from flask import send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_restx import Resource
+from app.controllers import note_ns
+from app.extension import job_queue
+from .note_api_model import note_job_response_model
+
+def get_current_user_job(job_id):
+    """获取当前用户的任务，不存在或不属于当前用户时返回 None"""
+    job = job_queue.get(job_id)
+    if not job or job['owner_id'] != str(get_jwt_identity()):
+        return None
+    return job
+
+class NoteJobManager(Resource):
+    @jwt_required()
+    @note_ns.doc(description='查询导入/导出任务的进度和结果')
+    @note_ns.marshal_with(note_job_response_model)
+    def get(self, job_id):
+        try:
+            job = get_current_user_job(job_id)
+            if not job:
+                return {'code': 404, 'message': '任务不存在'}, 404
+            return {'code': 200, 'message': '查询成功', 'data': job}, 200
+        except Exception as e:
+            return {'code': 500, 'message': str(e)}, 500
+
+class NoteJobArtifactManager(Resource):
+    @jwt_required()
+    @note_ns.doc(description='下载导出任务生成的文件')
+    def get(self, job_id):
+        try:
+            job = get_current_user_job(job_id)
+            if not job:
+                return {'code': 404, 'message': '任务不存在'}, 404
+            if job['status'] != 'succeeded' or not job['artifact']:
+                return {'code': 400, 'message': '任务尚未完成或没有可下载的文件'}, 400
+            artifact_path = job_queue.artifact_path(job_id, job['artifact'])
+            if not os.path.exists(artifact_path):
+                # 产物在其他服务器上生成，且 JOB_ARTIFACT_DIR 不是共享目录
+                if not job_queue.is_local(job):
+                    return {'code': 409, 'message': '文件在其他服务器上生成，当前服务器无法下载'}, 409
+                return {'code': 404, 'message': '文件已过期'}, 404
+            return send_file(
+                artifact_path,
+                as_attachment=True,
+                download_name=job['artifact'],
+                mimetype='application/zip'
+            )
+        except Exception as e:
+            return {'code': 500, 'message': str(e)}, 500
@@ -1,11 +1,15 @@
-from flask import request
+from flask import request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_restx import Resource, reqparse
+from flask_restx import Resource
 from app.controllers import note_ns
 from app.models import Note, Project, User
-from .note_api_model import note_response_model, note_add_request_model, note_update_request_model, note_response_list_model, note_page_request_model, note_page_response_model
-from datetime import datetime, timedelta
-from app.utils import hash_password
+from app.extension import note_file_writer, hash_executor
+from .note_api_model import note_response_model, note_add_request_model, note_update_request_model, note_response_list_model, note_page_request_model, note_page_response_model, \
+    note_patch_request_model, note_patch_response_model, note_patch_request_schema, \
+    note_add_request_schema, note_update_request_schema, note_page_request_schema, note_all_page_request_schema, note_list_query_schema, note_all_list_query_schema
+from datetime import datetime
+from app.utils import hash_password, HashBusyError, fast_marshal_with, make_etag, check_not_modified, parse_string_to_datetime, \
+    format_datetime_to_string, hash_content, apply_text_ops
 import os
 import re
 import copy
@@ -18,27 +22,35 @@ def sanitize_filename(filename):
     sanitized = re.sub(r'[<>:"/\\|?*]', '_', filename)
     return sanitized
 
+def get_note_file_path(note, project):
+    """
+    获取笔记在服务器文件系统中的存储路径
+    """
+    # 获取用户主目录
+    home_dir = os.path.expanduser("~")
+    # 按项目所有者确定目录（后台导入任务中没有当前登录用户）
+    user = User.getUserDictById(project.account_id)
+    if not user:
+        print(f"无法获取用户信息，用户ID: {project.account_id}")
+        return None
+    # 构建笔记存储路径
+    notes_dir = os.path.join(home_dir, "lifocus_data", "notes", sanitize_filename(user['username']), sanitize_filename(project.name))
+    # 为笔记文件生成安全的文件名
+    note_filename = sanitize_filename(note.title) + ".md"
+    return os.path.join(notes_dir, note_filename)
+
 def delete_note_from_file_system(note, project):
     """
-    删除笔记内容从服务器文件系统中
+    删除笔记内容从服务器文件系统中（异步执行）
     """
     try:
-        # 获取用户主目录
-        home_dir = os.path.expanduser("~")
-        project = Project.getProjectById(project.id)
         if not project:
             print(f"无法获取项目信息")
             return False
-        user = User.getUserById(get_jwt_identity())
-        if not user:
-            print(f"无法获取用户信息")
+        note_path = get_note_file_path(note, project)
+        if not note_path:
             return False
-        notes_dir = os.path.join(home_dir, "lifocus_data", "notes", sanitize_filename(user.username), sanitize_filename(project.name))
-        note_file_name = sanitize_filename(note.title) + ".md"
-        note_path = os.path.join(notes_dir, note_file_name)
-        if os.path.exists(note_path):
-            os.remove(note_path)
-        print(f"已删除笔记文件: {note_path}")
+        note_file_writer.delete(note_path)
         return True
     except Exception as e:
         print(f"删除笔记文件时发生错误: {str(e)}")
@@ -46,32 +58,13 @@ def delete_note_from_file_system(note, project):
 
 def save_note_to_file_system(note, project):
     """
-    将笔记内容保存到服务器文件系统中
+    将笔记内容保存到服务器文件系统中（异步写回，同一文件短时间内的多次写入会合并）
     """
     try:
-        # 获取用户主目录
-        home_dir = os.path.expanduser("~")
-
-        current_user_id = get_jwt_identity()
-        user = User.getUserById(current_user_id)  # 假设 User 模型有此方法
-        if not user:
-            print(f"无法获取用户信息，用户ID: {current_user_id}")
+        note_path = get_note_file_path(note, project)
+        if not note_path:
             return False
-        # 构建笔记存储路径
-        notes_dir = os.path.join(home_dir, "lifocus_data", "notes", sanitize_filename(user.username), sanitize_filename(project.name))
-        
-        # 创建目录（如果不存在）
-        os.makedirs(notes_dir, exist_ok=True)
-        
-        # 为笔记文件生成安全的文件名
-        note_filename = sanitize_filename(note.title) + ".md"
-        note_path = os.path.join(notes_dir, note_filename)
-        
-        # 写入文件
-        with open(note_path, 'w', encoding='utf-8') as f:
-            f.write(note.content)
-        
-        print(f"笔记已保存到: {note_path}")
+        note_file_writer.write(note_path, note.content)
         return True
     except Exception as e:
         print(f"保存笔记文件时发生错误: {str(e)}")
@@ -84,10 +77,14 @@ class SingleNoteManager(Resource):
     @note_ns.marshal_with(note_response_model)
     def get(self, note_id):
         try:
-            note = Note.getNoteById(note_id)
+            note = Note.getNoteDictById(note_id)
             if not note:
                 return {'code': 404, 'message': '笔记不存在'}, 404
-            return {'code': 200, 'message': '查询成功', 'data': note}, 200
+            # 条件请求：ETag 取缓存中的笔记内容摘要（同一秒内多次修改也能区分）
+            not_modified, headers = check_not_modified(make_etag(note), parse_string_to_datetime(note['updated_at']))
+            if not_modified:
+                return {}, 304, headers
+            return {'code': 200, 'message': '查询成功', 'data': note}, 200, headers
         except Exception as e:
             return {'code': 500, 'message': str(e)}, 500
 
@@ -103,23 +100,13 @@ class SingleNoteManager(Resource):
             project = Project.getProjectById(project_id)
             if not project:
                 return {'code': 404, 'message': '项目不存在'}, 404
-        parser = reqparse.RequestParser()
-        parser.add_argument('type', type=str, required=True)
-        parser.add_argument('title', type=str, required=True)
-        parser.add_argument('content', type=str, required=True)
-        parser.add_argument('folder', type=str, required=False)
-        parser.add_argument('status', type=str, required=False)
-        parser.add_argument('is_archived', type=bool, required=False)
-        parser.add_argument('is_recycle', type=bool, required=False)
-        parser.add_argument('is_share', type=bool, required=False)
-        parser.add_argument('share_password', type=str, required=False)
         try:
-            data = parser.parse_args()
+            data = note_add_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         try:
             data.project_id = project_id
-            if data.share_password: data.share_password = hash_password(data['share_password'])
+            if data.share_password: data.share_password = hash_executor.run(hash_password, data['share_password'])
             note = Note(**data)
             note.addNote()
             
@@ -127,6 +114,8 @@ class SingleNoteManager(Resource):
             save_note_to_file_system(note, project)
             
             return {'code': 201, 'message': '新增成功', 'data': note}, 201
+        except HashBusyError as e:
+            return {'code': 503, 'message': str(e)}, 503, {'Retry-After': '1'}
         except Exception as e:
             return {'code': 500, 'message': '新增失败，' + str(e)}, 500
 
@@ -135,22 +124,14 @@ class SingleNoteManager(Resource):
     @note_ns.expect(note_update_request_model)
     @note_ns.marshal_with(note_response_model)
     def put(self, note_id):
-        parser = reqparse.RequestParser()
-        parser.add_argument('type', type=str, required=False)
-        parser.add_argument('title', type=str, required=False)
-        parser.add_argument('content', type=str, required=False)
-        parser.add_argument('folder', type=str, required=False)
-        parser.add_argument('status', type=str, required=False)
-        parser.add_argument('is_archived', type=bool, required=False)
-        parser.add_argument('is_recycle', type=bool, required=False)
-        parser.add_argument('is_share', type=bool, required=False)
-        parser.add_argument('share_password', type=str, required=False)
         try:
-            data = parser.parse_args()
+            data = note_update_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         data['update_time'] = datetime.now()
         try:
+            # 先计算分享密码哈希，线程池繁忙时直接返回，不会留下改了一半的笔记
+            if data['share_password']: data['share_password'] = hash_executor.run(hash_password, data['share_password'])
             note = Note.getNoteById(note_id)
             origin_note = copy.deepcopy(note)
             if not note:
@@ -158,27 +139,73 @@ class SingleNoteManager(Resource):
             else:
                 if data['type']: note.type = data['type']
                 if data['title']: note.title = data['title']
-                if data['content']: note.content = data['content']
+                content_changed = note.setContent(data['content']) if data['content'] else False
                 if data['folder']: note.folder = data['folder']
                 if data['status']: note.status = data['status']
                 if data['is_archived'] is not None: note.is_archived = data['is_archived']
                 if data['is_recycle'] is not None: note.is_recycle = data['is_recycle']
                 if data['is_share'] is not None: note.is_share = data['is_share']
-                if data['share_password']: note.share_password = hash_password(data['share_password'])
+                if data['share_password']: note.share_password = data['share_password']
+                # 没有任何实际修改（例如重复提交相同内容）时不写数据库和文件
+                if not note.hasChanges():
+                    return {'code': 200, 'message': '笔记未修改', 'data': note}, 200
+                title_changed = note.title != origin_note.title
                 note.updateNote()
                 # 获取项目信息用于保存到文件系统
                 project = Project.getProjectById(note.project_id)
                 if project:
                     # 如果标题修改了，则删除旧笔记文件
-                    if data['title']:
+                    if title_changed:
                         delete_note_from_file_system(origin_note, project)
-                    # 如果内容修改了，则保存新笔记文件
-                    if data['content']:
+                    # 如果标题或内容修改了，则保存新笔记文件
+                    if title_changed or content_changed:
                         save_note_to_file_system(note, project)
                 return {'code': 200, 'message': '更新成功', 'data': note}, 200
+        except HashBusyError as e:
+            return {'code': 503, 'message': str(e)}, 503, {'Retry-After': '1'}
+        except Exception as e:
+            return {'code': 500, 'message': str(e)}, 500
+
+    @jwt_required()
+    @note_ns.doc(description='增量更新笔记内容：ops 基于 base_hash 对应的版本，与当前版本不一致时返回 409')
+    @note_ns.expect(note_patch_request_model)
+    @note_ns.marshal_with(note_patch_response_model)
+    def patch(self, note_id):
+        try:
+            data = note_patch_request_schema.parse()
+        except Exception as e:
+            return {'code': 400, 'message': '参数错误'}, 400
+        if not data['base_hash']:
+            return {'code': 400, 'message': '基准版本不能为空'}, 400
+        if len(data['ops']) > current_app.config['NOTE_PATCH_MAX_OPS']:
+            return {'code': 400, 'message': '补丁操作过多，请直接提交完整内容'}, 400
+        try:
+            note = Note.getNoteByIdForUpdate(note_id)
+            if not note:
+                return {'code': 404, 'message': '笔记不存在'}, 404
+            if data['base_hash'] != (note.content_hash or hash_content(note.content)):
+                return {'code': 409, 'message': '笔记已被修改，请获取最新内容后重试', 'data': self._version(note)}, 409
+            try:
+                content = apply_text_ops(note.content, data['ops'])
+            except ValueError as e:
+                return {'code': 400, 'message': str(e)}, 400
+            if note.setContent(content):
+                note.updateNote()
+                project = Project.getProjectById(note.project_id)
+                if project:
+                    save_note_to_file_system(note, project)
+            return {'code': 200, 'message': '更新成功', 'data': self._version(note)}, 200
         except Exception as e:
             return {'code': 500, 'message': str(e)}, 500
 
+    @staticmethod
+    def _version(note):
+        return {
+            'id': note.id,
+            'content_hash': note.content_hash or hash_content(note.content),
+            'updated_at': format_datetime_to_string(note.updated_at)
+        }
+
     @jwt_required()
     @note_ns.doc(description='删除笔记')
     @note_ns.marshal_with(note_response_model)
@@ -200,103 +227,116 @@ class SingleNoteManager(Resource):
 class ProjectNoteManager(Resource):
     @jwt_required()
     @note_ns.doc(description='获取项目下的笔记列表')
-    @note_ns.marshal_with(note_response_list_model)
+    @fast_marshal_with(note_ns, note_response_list_model)
     def get(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('title', type=str, required=False, location='args')  # query 参数
-        parser.add_argument('isRecent', type=bool, required=False, location='args')
-        parser.add_argument('projectId', type=str, required=False, location='args')
         try:
-            data = parser.parse_args()
+            data = note_list_query_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         project_id = data['projectId'] if data['projectId'] else request.headers.get('X-Project-Id')
         if not project_id:
             return {'code': 400, 'message': '项目ID不能为空'}, 400
         else:
-            project = Project.getProjectById(project_id)
+            project = Project.getProjectDictById(project_id)
             if not project:
                 return {'code': 404, 'message': '项目不存在'}, 404
 
         try:
+            # 条件请求：先用聚合查询（条数 + 最大更新时间）判断列表是否变化（只用 ETag：移出列表的数据不影响剩余数据的最大更新时间，不能按 If-Modified-Since 判断），未变化时不加载笔记
+            count, last_modified = Note.getNotesStampByProjectIdExcludeRecycled(project_id, data['title'], data['isRecent'])
+            etag = make_etag('notes', project_id, data['title'], data['isRecent'], count, last_modified)
+            not_modified, headers = check_not_modified(etag)
+            if not_modified:
+                return {}, 304, headers
             # notes = Note.getNotesByProjectId(project_id)
             # 添加过滤回收站笔记的条件
             notes = Note.getNotesByProjectIdExcludeRecycled(project_id, data['title'], data['isRecent'])
-            return {'code': 200, 'message': '查询成功', 'data': notes}, 200
+            return {'code': 200, 'message': '查询成功', 'data': notes}, 200, headers
         except Exception as e:
             return {'code': 500, 'message': str(e)}, 500
 
     @jwt_required()
     @note_ns.doc(description='获取项目下的笔记列表（分页）')
     @note_ns.expect(note_page_request_model)
-    @note_ns.marshal_with(note_page_response_model)
+    @fast_marshal_with(note_ns, note_page_response_model)
     def post(self):
         project_id = request.headers.get('X-Project-Id')
         if not project_id:
             return {'code': 400, 'message': '项目ID不能为空'}, 400
         else:
-            project = Project.getProjectById(project_id)
+            project = Project.getProjectDictById(project_id)
             if not project:
                 return {'code': 404, 'message': '项目不存在'}, 404
-        parser = reqparse.RequestParser()
-        parser.add_argument('query', type=dict, required=False)
-        parser.add_argument('page_no', type=int, required=False)
-        parser.add_argument('page_size', type=int, required=False)
         try:
-            data = parser.parse_args()
+            data = note_page_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         try:
-            pageData = Note.getNotesByProjectIdWithPagination(project_id, data['query'], data['page_no'], data['page_size'])
+            if data['cursor'] is not None:
+                # 游标分页模式
+                page_size = 20 if data['page_size'] is None else data['page_size']
+                pageData = Note.getNotesByProjectIdWithCursor(project_id, data['query'], data['cursor'], page_size, data['with_total'])
+                pageData['page_size'] = page_size
+                return {'code': 200, 'message': '查询成功', 'page_data': pageData}, 200
+            pageData = Note.getNotesByProjectIdWithPagination(project_id, data['query'], data['page_no'], data['page_size'], data['sort_by'])
             pageData['page_no'] = data['page_no']
             pageData['page_size'] = data['page_size']
             return {'code': 200, 'message': '查询成功', 'page_data': pageData}, 200
+        except ValueError as e:
+            return {'code': 400, 'message': str(e)}, 400
         except Exception as e:
             return {'code': 500, 'message': '分页查询失败：' + str(e)}, 500
 
 class AllNoteManager(Resource):
     @jwt_required()
     @note_ns.doc(description='获取所有笔记列表')
-    @note_ns.marshal_with(note_response_list_model)
+    @fast_marshal_with(note_ns, note_response_list_model)
     def get(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('isRecent', type=str, required=False)
-        query_args = parser.parse_args()
+        query_args = note_all_list_query_schema.parse()
 
         try:
             current_user_id = get_jwt_identity()
             # notes = Note.getNotesByUserId(current_user_id)
 
-            # 添加过滤回收站笔记的条件
-            notes = Note.getNotesByUserIdExcludeRecycled(current_user_id)
-            if query_args['isRecent']:
-                notes = [note for note in notes if note.updated_at > datetime.now() - timedelta(days=30)]
+            # 添加过滤回收站笔记的条件，最近 30 天的条件在数据库中过滤
+            notes = Note.getNotesByUserIdExcludeRecycled(current_user_id, query_args['isRecent'])
             return {'code': 200, 'message': '查询成功', 'data': notes}, 200
         except Exception as e:
             return {'code': 500, 'message': str(e)}, 500
 
     @jwt_required()
     @note_ns.doc(description='获取所有笔记列表【分页接口】')
-    @note_ns.marshal_with(note_page_response_model)  # 或创建新的分页响应模型
+    @fast_marshal_with(note_ns, note_page_response_model)  # 或创建新的分页响应模型
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('is_recent', type=bool, required=False, default=False)
-        parser.add_argument('page_no', type=int, required=False, default=1)
-        parser.add_argument('page_size', type=int, required=False, default=20)
-        data = parser.parse_args()
+        data = note_all_page_request_schema.parse()
 
         try:
             current_user_id = get_jwt_identity()
 
+            if data['cursor'] is not None:
+                # 游标分页模式
+                pageData = Note.getNotesByUserIdExcludeRecycledWithCursor(
+                    current_user_id,
+                    data['is_recent'],
+                    data['cursor'],
+                    data['page_size'],
+                    data['with_total']
+                )
+                pageData['page_size'] = data['page_size']
+                return {'code': 200, 'message': '查询成功', 'page_data': pageData}, 200
+
             # 使用分页查询
             pageData = Note.getNotesByUserIdExcludeRecycledWithPagination(
                 current_user_id,
                 data['is_recent'],
                 data['page_no'],
-                data['page_size']
+                data['page_size'],
+                data['sort_by']
             )
             pageData['page_no'] = data['page_no']
             pageData['page_size'] = data['page_size']
             return {'code': 200, 'message': '查询成功', 'page_data': pageData}, 200
+        except ValueError as e:
+            return {'code': 400, 'message': str(e)}, 400
         except Exception as e:
             return {'code': 500, 'message': str(e)}, 500
\ No newline at end of file
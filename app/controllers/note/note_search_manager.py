@@ -0,0 +1,38 @@
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_restx import Resource
+from app.controllers import note_ns
+from app.models import Note
+from app.utils import split_search_terms, highlight_text, make_snippet, NGRAM_TOKEN_SIZE, fast_marshal_with
+from .note_api_model import note_search_response_model, note_search_query_schema
+
+class NoteSearchManager(Resource):
+    @jwt_required()
+    @note_ns.doc(description='全文检索笔记标题和内容（按相关度排序，分页）')
+    @fast_marshal_with(note_ns, note_search_response_model)
+    def get(self):
+        try:
+            data = note_search_query_schema.parse()
+        except Exception as e:
+            return {'code': 400, 'message': '参数错误'}, 400
+        terms = split_search_terms(data['q'])
+        if not terms:
+            return {'code': 400, 'message': '搜索关键字不能为空'}, 400
+        try:
+            current_user_id = get_jwt_identity()
+            pageData = Note.searchNotes(current_user_id, data['q'], data['projectId'], data['page_no'], data['page_size'])
+            # 所有关键字都参与过滤，都高亮；片段优先定位到较长的关键字（单字容易在开头附近命中）
+            focus_terms = [term for term in terms if len(term) >= NGRAM_TOKEN_SIZE] or terms
+            items = []
+            for note, score in pageData['data']:
+                item = note.dict()
+                content = item.pop('content')
+                item['score'] = score
+                item['title_highlight'] = highlight_text(note.title, terms)
+                item['snippet'] = make_snippet(content, terms, focus=focus_terms)
+                items.append(item)
+            pageData['data'] = items
+            pageData['page_no'] = data['page_no']
+            pageData['page_size'] = data['page_size']
+            return {'code': 200, 'message': '查询成功', 'page_data': pageData}, 200
+        except Exception as e:
+            return {'code': 500, 'message': '搜索失败：' + str(e)}, 500
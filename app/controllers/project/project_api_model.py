@@ -1,5 +1,6 @@
 from app.controllers import project_ns
 from flask_restx import fields
+from app.utils import RequestSchema
 
 project_model = project_ns.model('ProjectModel', {
     'id': fields.Integer(required=False, description='项目ID'),
@@ -60,7 +61,8 @@ project_delete_response_model = project_ns.model('ProjectDeleteResponseModel', {
 project_page_request_mode = project_ns.model('ProjectPageRequestModel', {
     'query': fields.Nested(project_model, required=False, allow_null=True, description='查询条件'),
     'page_no': fields.Integer(required=False, description='页码'),
-    'page_size': fields.Integer(required=False, description='每页数量')
+    'page_size': fields.Integer(required=False, description='每页数量'),
+    'sort_by': fields.String(required=False, description='排序条件，如 "updated_at desc"，可选 updated_at / created_at / name，默认按更新时间倒序')
 })
 project_page_model = project_ns.model('ProjectPageModel', {
     'total': fields.Integer(required=True, description='总条数'),
@@ -74,4 +76,11 @@ project_page_response_model = project_ns.model('ProjectPageResponseModel', {
     'code': fields.Integer(required=True, description='自定义状态码'),
     'message': fields.String(required=True, description='返回信息'),
     'page_data': fields.Nested(project_page_model, allow_null=True, description='分页数据')
-})
\ No newline at end of file
+})
+
+# 请求参数校验（模块加载时生成，各接口复用）
+project_add_request_schema = RequestSchema(project_add_request_model, exclude=('created_at', 'updated_at'),
+                                           type=dict(required=False, default='note'))
+project_update_request_schema = RequestSchema(project_update_request_model)
+project_page_request_schema = RequestSchema(project_page_request_mode, page_no=dict(default=1), page_size=dict(default=10))
+project_list_query_schema = RequestSchema(isRecent=dict(type=str), status=dict(type=str))
@@ -1,12 +1,14 @@
 from email.policy import default
 
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_restx import Resource, reqparse
+from flask_restx import Resource
 from app.controllers import project_ns
 from app.models import Project
+from app.utils import fast_marshal_with, make_etag, check_not_modified, parse_string_to_datetime
 from .project_api_model import project_response_list_model, project_delete_response_model, project_add_request_model, \
-    project_response_model, project_update_request_model, project_page_response_model, project_page_request_mode
-from datetime import datetime, timedelta
+    project_response_model, project_update_request_model, project_page_response_model, project_page_request_mode, \
+    project_add_request_schema, project_update_request_schema, project_page_request_schema, project_list_query_schema
+from datetime import datetime
 
 class SingleProjectManager(Resource):
     @jwt_required()
@@ -14,10 +16,14 @@ class SingleProjectManager(Resource):
     @project_ns.marshal_with(project_response_model)
     def get(self, project_id):
         try:
-            project = Project.getProjectById(project_id)
+            project = Project.getProjectDictById(project_id)
             if not project:
                 return {'code': 404, 'message': '项目不存在'}, 404
-            return {'code': 200, 'message': '查询成功', 'data': project}, 200
+            # 条件请求：ETag 取缓存中的项目信息摘要
+            not_modified, headers = check_not_modified(make_etag(project), parse_string_to_datetime(project['updated_at']))
+            if not_modified:
+                return {}, 304, headers
+            return {'code': 200, 'message': '查询成功', 'data': project}, 200, headers
         except Exception as e:
             return {'code': 500, 'message': str(e)}, 500
 
@@ -26,13 +32,8 @@ class SingleProjectManager(Resource):
     @project_ns.expect(project_add_request_model)
     @project_ns.marshal_with(project_response_model)
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('type', type=str, default='note', required=False)
-        parser.add_argument('name', type=str, required=True)
-        parser.add_argument('icon', type=str, required=False)
-        parser.add_argument('description', type=str, required=False)
         try:
-            data = parser.parse_args()
+            data = project_add_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         current_user_id = get_jwt_identity()
@@ -51,18 +52,8 @@ class SingleProjectManager(Resource):
     @project_ns.expect(project_update_request_model)
     @project_ns.marshal_with(project_response_model)
     def put(self, project_id):
-        parser = reqparse.RequestParser()
-        parser.add_argument('type', type=str, required=False)
-        parser.add_argument('name', type=str, required=False)
-        parser.add_argument('icon', type=str, required=False)
-        parser.add_argument('description', type=str, required=False)
-        parser.add_argument('folder', type=str, required=False)
-        parser.add_argument('status', type=str, required=False)
-        parser.add_argument('is_archived', type=bool, required=False)
-        parser.add_argument('is_recycle', type=bool, required=False)
-        parser.add_argument('is_favor', type=bool, required=False)
         try:
-            data = parser.parse_args()
+            data = project_update_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         data['update_time'] = datetime.now()
@@ -114,44 +105,41 @@ class UserProjectManager(Resource):
     #         return {'code': 500, 'message': str(e)}, 500
     @jwt_required()
     @project_ns.doc(description='获取用户项目列表')
-    @project_ns.marshal_with(project_response_list_model)
+    @fast_marshal_with(project_ns, project_response_list_model)
     def get(self):
         # 添加 query 参数 isRecent
-        parser = reqparse.RequestParser()
-        parser.add_argument('isRecent', type=str, required=False)
-        parser.add_argument('status', type=str, required=False)
-        query_args = parser.parse_args()
+        query_args = project_list_query_schema.parse()
         try:
             current_user_id = get_jwt_identity()
-            projects = Project.getProjectsByAccountId(current_user_id)
-            if query_args['isRecent']:
-                # 获取最近一个月的项目列表
-                projects = [project for project in projects if project.updated_at > datetime.now() - timedelta(days=30)]
-            if query_args['status']:
-                status_list = [status.strip() for status in query_args['status'].split(',')]
-                projects = [project for project in projects if project.status in status_list]
-            return {'code': 200, 'message': '查询成功', 'data': projects}, 200
+            # 最近一个月、状态（逗号分隔）条件在数据库中过滤
+            conditions = {'recent': bool(query_args['isRecent']), 'status': query_args['status']}
+            # 条件请求：先用聚合查询（条数 + 最大更新时间）判断列表是否变化（只用 ETag：移出列表的数据不影响剩余数据的最大更新时间，不能按 If-Modified-Since 判断），未变化时不加载项目
+            count, last_modified = Project.getProjectsStampByAccountId(current_user_id, conditions)
+            etag = make_etag('projects', current_user_id, query_args['isRecent'], query_args['status'], count, last_modified)
+            not_modified, headers = check_not_modified(etag)
+            if not_modified:
+                return {}, 304, headers
+            projects = Project.getProjectsByAccountId(current_user_id, conditions)
+            return {'code': 200, 'message': '查询成功', 'data': projects}, 200, headers
         except Exception as e:
             return {'code': 500, 'message': str(e)}, 500
 
     @jwt_required()
     @project_ns.doc(description='获取用户项目列表（分页接口）')
     @project_ns.expect(project_page_request_mode)
-    @project_ns.marshal_with(project_page_response_model)
+    @fast_marshal_with(project_ns, project_page_response_model)
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('query', type=dict, required=False)
-        parser.add_argument('page_no', type=int, required=False, default=1)
-        parser.add_argument('page_size', type=int, required=False, default=10)
         try:
-            data = parser.parse_args()
+            data = project_page_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         current_user_id = get_jwt_identity()
         try:
-            pageData = Project.getProjectsByAccountIdWithPagination(current_user_id, data['query'], data['page_no'], data['page_size'])
+            pageData = Project.getProjectsByAccountIdWithPagination(current_user_id, data['query'], data['page_no'], data['page_size'], data['sort_by'])
             pageData['page_no'] = data['page_no']
             pageData['page_size'] = data['page_size']
             return {'code': 200, 'message': '查询成功', 'page_data': pageData}, 200
+        except ValueError as e:
+            return {'code': 400, 'message': str(e)}, 400
         except Exception as e:
             return {'code': 500, 'message': '分页查询失败：'+str(e)}, 500
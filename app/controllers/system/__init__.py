@@ -0,0 +1 @@
+from .system_manager import PoolStatsManager, CacheStatsManager, QueryStatsManager
\ No newline at end of file
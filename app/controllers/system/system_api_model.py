@@ -0,0 +1,9 @@
+from app.controllers import system_ns
+from flask_restx import fields
+
+# 监控统计返回
+stats_response_model = system_ns.model('StatsResponseModel', {
+    'code': fields.Integer(required=True, description='自定义状态码'),
+    'message': fields.String(required=True, description='返回信息'),
+    'data': fields.Raw(description='统计数据', allow_null=True)
+})
@@ -0,0 +1,35 @@
+from flask_restx import Resource
+from app.controllers import system_ns
+from app.extension import db, redis_client, query_stats
+from app.utils import EntityCache, get_pool_stats, internal_only
+from .system_api_model import stats_response_model
+
+class PoolStatsManager(Resource):
+    @internal_only
+    @system_ns.doc(description='数据库连接池状态（仅限内部访问）', security=None)
+    @system_ns.marshal_with(stats_response_model)
+    def get(self):
+        try:
+            return {'code': 200, 'message': '查询成功', 'data': get_pool_stats(db.engine)}, 200
+        except Exception as e:
+            return {'code': 500, 'message': str(e)}, 500
+
+class CacheStatsManager(Resource):
+    @internal_only
+    @system_ns.doc(description='实体缓存命中统计（仅限内部访问）', security=None)
+    @system_ns.marshal_with(stats_response_model)
+    def get(self):
+        try:
+            return {'code': 200, 'message': '查询成功', 'data': EntityCache.stats(redis_client)}, 200
+        except Exception as e:
+            return {'code': 500, 'message': str(e)}, 500
+
+class QueryStatsManager(Resource):
+    @internal_only
+    @system_ns.doc(description='各接口数据库查询统计及最慢语句（仅限内部访问）', security=None)
+    @system_ns.marshal_with(stats_response_model)
+    def get(self):
+        try:
+            return {'code': 200, 'message': '查询成功', 'data': query_stats.snapshot()}, 200
+        except Exception as e:
+            return {'code': 500, 'message': str(e)}, 500
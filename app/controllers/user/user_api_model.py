@@ -1,5 +1,6 @@
 from app.controllers import user_ns
 from flask_restx import fields
+from app.utils import RequestSchema
 
 user_model = user_ns.model('User', {
     'id': fields.Integer(required=False, description='账户ID'),
@@ -30,4 +31,7 @@ update_user_request_model = user_ns.model('UpdateUserRequest', {
 delete_user_response_model = user_ns.model('DeleteUserResponse', {
     'code': fields.Integer(required=True, description='自定义状态码'),
     'message': fields.String(required=True, description='返回信息')
-})
\ No newline at end of file
+})
+
+# 请求参数校验（模块加载时生成，各接口复用）
+update_user_request_schema = RequestSchema(update_user_request_model)
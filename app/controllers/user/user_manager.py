@@ -1,8 +1,8 @@
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_restx import Resource, reqparse
+from flask_restx import Resource
 from app.controllers import user_ns
 from app.models import User
-from .user_api_model import get_user_by_id_response_model, update_user_request_model, delete_user_response_model
+from .user_api_model import get_user_by_id_response_model, update_user_request_model, delete_user_response_model, update_user_request_schema
 from app.utils import checkEmailFormat
 from datetime import datetime
 class UserManager(Resource):
@@ -33,13 +33,8 @@ class UserManager(Resource):
     @user_ns.marshal_with(get_user_by_id_response_model)
     def put(self):
         user_id = get_jwt_identity()
-        parser = reqparse.RequestParser()
-        parser.add_argument('username', type=str, required=False)
-        parser.add_argument('email', type=str, required=False)
-        parser.add_argument('password', type=str, required=False)
-        parser.add_argument('avatar', type=str, required=False)
         try:
-            data = parser.parse_args()
+            data = update_user_request_schema.parse()
         except Exception as e:
             return {'code': 400, 'message': '参数错误'}, 400
         if data['email']:
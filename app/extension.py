@@ -2,8 +2,44 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 import redis
+from app.utils.entityCache import EntityCache
+from app.utils.jobQueue import JobQueue
+from app.utils.writeBehind import WriteBehindWriter
+from app.utils.tokenBlocklist import TokenBlocklist
+from app.utils.queryStats import QueryStats
+from app.utils.metrics import Metrics
+from app.utils.hashExecutor import HashExecutor
+from app.utils.loginLimiter import LoginRateLimiter
+from app.utils.contentCodec import ContentCodec
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
-redis_client = redis.Redis()
\ No newline at end of file
+redis_client = redis.Redis()
+
+# JWT 黑名单
+token_blocklist = TokenBlocklist(redis_client)
+
+# 实体缓存
+note_cache = EntityCache(redis_client, 'note')
+project_cache = EntityCache(redis_client, 'project')
+user_cache = EntityCache(redis_client, 'user')
+
+# 后台任务队列
+job_queue = JobQueue(redis_client)
+
+# 笔记文件镜像异步写回
+note_file_writer = WriteBehindWriter()
+
+# 数据库查询统计
+query_stats = QueryStats()
+
+# Prometheus 监控指标
+metrics = Metrics()
+
+# 密码哈希线程池与登录限流
+hash_executor = HashExecutor()
+login_limiter = LoginRateLimiter(redis_client)
+
+# 笔记内容压缩
+content_codec = ContentCodec()
@@ -1,3 +1,6 @@
 from .user import User
 from .project import Project
-from .note import Note
\ No newline at end of file
+from .note import Note
+from .tombstone import SyncTombstone
+from .note_content import NoteContent
+from .note_search_text import NoteSearchText
\ No newline at end of file
@@ -1,14 +1,26 @@
-from datetime import datetime, timedelta
-from app.extension import db
-from app.utils import format_datetime_to_string
+from datetime import datetime
+from sqlalchemy.orm import joinedload, contains_eager
+from sqlalchemy.dialects.mysql import match
+from app.extension import db, note_cache
+from app.utils import hash_content, format_datetime_to_string, encode_cursor, decode_cursor, CURSOR_MAX_PAGE_SIZE, split_search_terms, build_boolean_query, NGRAM_TOKEN_SIZE
 from .project import Project
+from .note_content import NoteContent
+from .note_search_text import NoteSearchText
+from ..filters import FilterSet, Sorting, Equal, Like, In, AtLeast, AtMost, Recent
 class Note(db.Model):
     __tablename__ = 'note'
+    __table_args__ = (
+        # 项目下笔记列表：按项目过滤、排除回收站、按更新时间筛选/排序
+        db.Index('ix_note_project_recycle_updated', 'project_id', 'is_recycle', 'updated_at'),
+        # 增量同步：按项目查询某一时间之后变更的笔记（包括回收站中的笔记）
+        db.Index('ix_note_project_updated', 'project_id', 'updated_at'),
+        # 标题全文检索（ngram 分词，支持中文），内容的全文索引在 note_content 表上
+        db.Index('ft_note_title', 'title', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+    )
     id = db.Column(db.Integer(), primary_key=True, nullable=False, autoincrement=True, comment='笔记ID')
     project_id = db.Column(db.Integer(), db.ForeignKey('project.id'), nullable=False, comment='项目ID')
     type = db.Column(db.String(64), nullable=False, comment='笔记类型')
     title = db.Column(db.String(255), nullable=False, comment='笔记标题')
-    content = db.Column(db.Text(), nullable=False, comment='笔记内容')
     folder = db.Column(db.String(255), default='default', comment='笔记存储文件夹')
     status = db.Column(db.String(64), default='active', comment='笔记状态')
     is_archived = db.Column(db.Boolean(), default=False, comment='笔记是否归档')
@@ -16,7 +28,41 @@ class Note(db.Model):
     is_share = db.Column(db.Boolean(), default=False, comment='笔记是否分享')
     share_password = db.Column(db.String(255), default='', comment='笔记分享密码')
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.now, comment='创建时间')
+    content_hash = db.Column(db.String(32), comment='笔记内容哈希（BLAKE2b）')
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+    # 笔记内容单独存放在 note_content 表，访问 content 时才加载，列表、计数、状态更新不读写大字段
+    body = db.relationship(NoteContent, uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+
+    @property
+    def content(self):
+        return self.body.content if self.body is not None else ''
+
+    @content.setter
+    def content(self, value):
+        self.setContent(value)
+
+    # 设置笔记内容，返回内容是否变化；哈希相同时直接返回，不加载也不改写内容
+    def setContent(self, value):
+        content_hash = hash_content(value)
+        if self.id is not None and self.content_hash == content_hash:
+            return False
+        if self.body is None:
+            self.body = NoteContent(content=value)
+        elif self.body.content == value:
+            # 没有哈希的旧数据：内容相同时只补上哈希
+            self.content_hash = content_hash
+            return False
+        else:
+            self.body.content = value
+        self.content_hash = content_hash
+        # 只修改内容时 note 行的其他字段没有变化，需要手动更新时间（增量同步、ETag 依赖更新时间）
+        if self.id is not None:
+            self.updated_at = datetime.now()
+        return True
+
+    # 是否有未提交的修改（修改内容时会同时修改 content_hash，因此只需检查 note 行）
+    def hasChanges(self):
+        return db.session.is_modified(self)
 
     # 添加笔记
     def addNote(self):
@@ -25,13 +71,96 @@ class Note(db.Model):
 
     # 更新笔记
     def updateNote(self):
+        note_id = self.id
         db.session.add(self)
         db.session.commit()
+        note_cache.invalidate(note_id)
 
     # 删除笔记
     def deleteNote(self):
+        note_id = self.id
         db.session.delete(self)
         db.session.commit()
+        note_cache.invalidate(note_id)
+
+    # 批量导入笔记，按 mode 处理同一项目下已存在的笔记（不含回收站）：
+    # skip：标题和内容哈希都相同时跳过；overwrite：标题相同时覆盖内容（内容相同时跳过）；duplicate：总是新增
+    # 新建的笔记和被覆盖的笔记按批次 flush（被覆盖的笔记每批用一次 IN 查询加载），全部成功后统一提交一次，任一失败则整体回滚；
+    # 提交后对每篇被覆盖的笔记调用 on_updated（如写回文件）；返回新建、覆盖的笔记和跳过的笔记
+    @staticmethod
+    def importNotes(project_id, notes_data, mode='skip', chunk_size=500, on_updated=None):
+        # 标题 -> [(笔记ID或本次新建的笔记, 内容哈希)]
+        existing = {}
+        if mode != 'duplicate':
+            rows = db.session.query(Note.id, Note.title, Note.content_hash) \
+                .filter(Note.project_id == project_id, Note.is_recycle == False).order_by(Note.id)
+            for note_id, title, content_hash in rows:
+                existing.setdefault(title, []).append((note_id, content_hash))
+        imported = []
+        skipped = []
+        chunk = []
+        # 待覆盖的已有笔记 [(笔记ID, 内容)]，与新建的笔记一起按批次写入
+        updates = []
+        updated_notes = {}
+        try:
+            for note_data in notes_data:
+                title = note_data['title']
+                content_hash = hash_content(note_data['content'])
+                matches = existing.setdefault(title, [])
+                if mode != 'duplicate':
+                    same = [ref for ref, h in matches if h == content_hash]
+                    if same:
+                        skipped.append((same[0], title))
+                        continue
+                if mode == 'overwrite' and matches:
+                    ref = matches[0][0]
+                    matches[0] = (ref, content_hash)
+                    if isinstance(ref, Note):
+                        # 本次新建的笔记已记录为 created，只更新内容
+                        ref.setContent(note_data['content'])
+                        continue
+                    updates.append((ref, note_data['content']))
+                    imported.append({'id': ref, 'title': title, 'status': 'updated'})
+                else:
+                    note = Note(**note_data)
+                    chunk.append(note)
+                    # 同一批导入中重复的文件也按 mode 处理
+                    matches.append((note, content_hash))
+                if len(chunk) + len(updates) >= chunk_size:
+                    updated_notes.update(Note._applyUpdates(updates))
+                    imported.extend(dict(item, status='created') for item in Note._flushChunk(chunk))
+                    chunk, updates = [], []
+            if updates:
+                updated_notes.update(Note._applyUpdates(updates))
+            if chunk:
+                imported.extend(dict(item, status='created') for item in Note._flushChunk(chunk))
+            db.session.flush()
+            skipped = [{'id': ref.id if isinstance(ref, Note) else ref, 'title': title} for ref, title in skipped]
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for note_id, note in updated_notes.items():
+            note_cache.invalidate(note_id)
+            if on_updated:
+                on_updated(note)
+        return {'imported': imported, 'skipped': skipped}
+
+    # 用一次 IN 查询加载本批要覆盖的笔记并写入内容（同一笔记出现多次时以最后一次为准），返回 {笔记ID: 笔记}
+    @staticmethod
+    def _applyUpdates(updates):
+        query = Note.query.options(joinedload(Note.body)).filter(Note.id.in_({note_id for note_id, _ in updates}))
+        notes = {note.id: note for note in query}
+        for note_id, content in updates:
+            notes[note_id].setContent(content)
+        db.session.flush()
+        return notes
+
+    @staticmethod
+    def _flushChunk(chunk):
+        db.session.add_all(chunk)
+        db.session.flush()
+        return [{'id': note.id, 'title': note.title} for note in chunk]
 
     # 打印笔记信息
     def dict(self):
@@ -47,10 +176,16 @@ class Note(db.Model):
             'is_recycle': self.is_recycle,
             'is_share': self.is_share,
             'share_password': self.share_password,
+            'content_hash': self.content_hash,
             'created_at': format_datetime_to_string(self.created_at),
             'updated_at': format_datetime_to_string(self.updated_at)
         }
 
+    # 列表查询：只查询 note 表（内容在 note_content 表，列表接口只返回元数据）
+    @staticmethod
+    def listQuery():
+        return Note.query
+
     # 获取某一用户的所有笔记
     @staticmethod
     def getNotesByUserId(user_id):
@@ -61,77 +196,233 @@ class Note(db.Model):
     def getNoteById(note_id):
         return Note.query.filter_by(id=note_id).first()
 
+    # 根据笔记ID获取笔记并加行锁（增量更新时检查版本、写入内容期间不被其他请求修改）
+    @staticmethod
+    def getNoteByIdForUpdate(note_id):
+        return Note.query.filter_by(id=note_id).with_for_update().first()
+
+    # 批量查询笔记归属：一次 IN 查询联表获取 (笔记ID, 账户ID)
+    @staticmethod
+    def getNoteOwnersByIds(note_ids):
+        return db.session.query(Note.id, Project.account_id) \
+            .join(Project, Note.project_id == Project.id) \
+            .filter(Note.id.in_(note_ids)).all()
+
+    # 批量流式读取笔记：按 id 分批（id > 上一批最后一个 id），每批是一次短查询，
+    # 取完一批后结束事务、把连接还给连接池，流式下载较慢时不会一直占用连接和服务端游标
+    @staticmethod
+    def iterNotesByIds(note_ids, batch_size=100):
+        last_id = 0
+        while True:
+            notes = Note.query.options(joinedload(Note.body)) \
+                .filter(Note.id.in_(note_ids), Note.id > last_id).order_by(Note.id).limit(batch_size).all()
+            if not notes:
+                break
+            last_id = notes[-1].id
+            for note in notes:
+                db.session.expunge(note)  # 连同已加载的内容一起脱离会话，结束事务后仍可读取
+            db.session.rollback()
+            yield from notes
+            if len(notes) < batch_size:
+                break
+
+    # 根据笔记ID获取笔记信息（字典，优先读取缓存）
+    @staticmethod
+    def getNoteDictById(note_id):
+        def load():
+            note = Note.getNoteById(note_id)
+            return note.dict() if note else None
+        return note_cache.get(note_id, load)
+
     # 查询项目下的所有笔记
     @staticmethod
     def getNotesByProjectId(project_id):
         return Note.query.filter_by(project_id=project_id).all()
 
-    # 获取项目下的笔记（分页）
-    @staticmethod
-    def getNotesByProjectIdWithPagination(project_id, query_condition, page_no, page_size):
-        query = Note.query.filter_by(project_id=project_id)
-        if query_condition:
-            allowed_query_condition_keys = ['type', 'title', 'folder', 'status', 'is_archived', 'is_recycle', 'is_share', 'created_start_time', 'created_end_time', 'updated_start_time', 'updated_end_time']
-            for key, value in query_condition.items():
-                if key not in allowed_query_condition_keys:
-                    continue
-                if key in ['title', 'folder']:
-                    query = query.filter(getattr(Note, key).like('%{}%'.format(value)))
-                elif key in ['created_start_time', 'updated_start_time']:
-                    query = query.filter(Note.created_at >= value) if key == 'created_start_time' else query.filter(Note.updated_at >= value)
-                elif key in ['created_end_time', 'updated_end_time']:
-                    query = query.filter(Note.created_at <= value) if key == 'created_start_time' else query.filter(Note.updated_at <= value)
-                else:
-                    query = query.filter(getattr(Note, key) == value)
+    # 处理分页查询条件（按 note_filters 声明转换为 SQL 条件，时间或条件格式错误时抛出 ValueError）
+    @staticmethod
+    def _applyQueryCondition(query, query_condition):
+        return note_filters.apply(query, query_condition)
+
+    # 游标分页：按 (updated_at, id) 倒序，用 seek 条件代替 OFFSET，总数按需统计；每页条数不合法时抛出 ValueError
+    @staticmethod
+    def _paginateByCursor(query, cursor, page_size, with_total):
+        if isinstance(page_size, bool) or not isinstance(page_size, int) or not 1 <= page_size <= CURSOR_MAX_PAGE_SIZE:
+            raise ValueError(f'每页条数必须在 1 到 {CURSOR_MAX_PAGE_SIZE} 之间')
+        total = query.count() if with_total else None
+        if cursor:
+            updated_at, id = decode_cursor(cursor)
+            query = query.filter(db.or_(
+                Note.updated_at < updated_at,
+                db.and_(Note.updated_at == updated_at, Note.id < id)
+            ))
+        # 多取一条用于判断是否还有下一页
+        notes = query.order_by(Note.updated_at.desc(), Note.id.desc()).limit(page_size + 1).all()
+        has_more = len(notes) > page_size
+        notes = notes[:page_size]
+        return {
+            'data': notes,
+            'total': total,
+            'pages': (total + page_size - 1) // page_size if total is not None else None,
+            'next_cursor': encode_cursor(notes[-1].updated_at, notes[-1].id) if has_more else None,
+            'has_more': has_more
+        }
+
+    # 获取项目下的笔记（分页），sort_by 见 note_sorting，默认按更新时间倒序
+    @staticmethod
+    def getNotesByProjectIdWithPagination(project_id, query_condition, page_no, page_size, sort_by=None):
+        query = Note._applyQueryCondition(Note.listQuery().filter_by(project_id=project_id), query_condition)
         total = query.count()
-        notes = query.offset((page_no - 1) * page_size).limit(page_size).all()
+        notes = note_sorting.apply(query, sort_by).offset((page_no - 1) * page_size).limit(page_size).all()
         return {
             'data': notes,
             'total': total,
             'pages': (total + page_size - 1) // page_size
         }
 
+    # 获取项目下的笔记（游标分页）
+    @staticmethod
+    def getNotesByProjectIdWithCursor(project_id, query_condition, cursor, page_size, with_total=False):
+        query = Note._applyQueryCondition(Note.listQuery().filter_by(project_id=project_id), query_condition)
+        return Note._paginateByCursor(query, cursor, page_size, with_total)
+
+    # 项目下非回收站笔记的过滤条件（列表查询与列表版本戳共用）
+    @staticmethod
+    def _filterProjectNotesExcludeRecycled(query, project_id, title, isRecent):
+        return note_filters.apply(query.filter_by(project_id=project_id),
+                                  {'is_recycle': False, 'title': title, 'recent': bool(isRecent)})
+
+    # 用户下非回收站笔记的查询（列表、分页、游标分页共用）
+    @staticmethod
+    def _userNotesExcludeRecycledQuery(user_id, is_recent):
+        query = Note.listQuery().join(Project, Note.project_id == Project.id) \
+            .filter(Project.account_id == user_id)
+        return note_filters.apply(query, {'is_recycle': False, 'recent': bool(is_recent)})
+
     # 在 Note 模型中添加新方法
     @staticmethod
     def getNotesByProjectIdExcludeRecycled(project_id, title, isRecent):
         """获取项目下非回收站的笔记"""
-        query = Note.query.filter_by(project_id=project_id, is_recycle=False)
-        if title:
-            query = query.filter(Note.title.like(f'%{title}%'))
-        if isRecent:
-            updated_start_time = datetime.now() - timedelta(days=30)
-            updated_end_time = datetime.now()
-            query = query.filter(Note.updated_at >= updated_start_time)
-            query = query.filter(Note.updated_at <= updated_end_time)
+        return Note._filterProjectNotesExcludeRecycled(Note.listQuery(), project_id, title, isRecent).all()
 
-
-        return query.all()
+    # 项目下非回收站笔记的版本戳 (条数, 最大更新时间)，只做聚合查询不加载行，用于 ETag / Last-Modified
+    @staticmethod
+    def getNotesStampByProjectIdExcludeRecycled(project_id, title, isRecent):
+        query = Note._filterProjectNotesExcludeRecycled(Note.query, project_id, title, isRecent)
+        return query.with_entities(db.func.count(Note.id), db.func.max(Note.updated_at)).one()
 
     @staticmethod
-    def getNotesByUserIdExcludeRecycled(user_id):
-        """获取用户下非回收站的笔记"""
-        return Note.query.join(Project, Note.project_id == Project.id) \
-            .filter(Project.account_id == user_id) \
-            .filter(Note.is_recycle == False).all()
+    def getNotesByUserIdExcludeRecycled(user_id, is_recent=False):
+        """获取用户下非回收站的笔记，is_recent 为真时只返回最近 30 天更新的笔记"""
+        return Note._userNotesExcludeRecycledQuery(user_id, is_recent).all()
 
+    # 增量同步：按 (updated_at, id) 正序查询 position 之后、until 之前变更的笔记（包括移入回收站的笔记），多取一条用于判断是否还有更多
     @staticmethod
-    def getNotesByUserIdExcludeRecycledWithPagination(user_id, is_recent=False, page_no=1, page_size=20):
-        """获取用户下非回收站的笔记（分页）"""
+    def getChangedNotesByUserIdSince(user_id, position, until, limit):
+        query = Note.listQuery().join(Project, Note.project_id == Project.id) \
+            .filter(Project.account_id == user_id, Note.updated_at < until)
+        if position:
+            updated_at, id = position
+            query = query.filter(db.or_(
+                Note.updated_at > updated_at,
+                db.and_(Note.updated_at == updated_at, Note.id > id)
+            ))
+        return query.order_by(Note.updated_at, Note.id).limit(limit + 1).all()
 
-        query = Note.query.join(Project, Note.project_id == Project.id) \
-            .filter(Project.account_id == user_id) \
-            .filter(Note.is_recycle == False)
-        if is_recent:
-            updated_start_time = datetime.now() - timedelta(days=30)
-            updated_end_time = datetime.now()
-            query = query.filter(Note.updated_at >= updated_start_time)
-            query = query.filter(Note.updated_at <= updated_end_time)
+    @staticmethod
+    def getNotesByUserIdExcludeRecycledWithPagination(user_id, is_recent=False, page_no=1, page_size=20, sort_by=None):
+        """获取用户下非回收站的笔记（分页），默认按更新时间倒序"""
+        query = Note._userNotesExcludeRecycledQuery(user_id, is_recent)
         # 查询总数
         total = query.count()
 
-        notes = query.offset((page_no - 1) * page_size).limit(page_size).all()
+        notes = note_sorting.apply(query, sort_by).offset((page_no - 1) * page_size).limit(page_size).all()
         return {
             'data': notes,
             'total': total,
             'pages': (total + page_size - 1) // page_size
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def getNotesByUserIdExcludeRecycledWithCursor(user_id, is_recent=False, cursor=None, page_size=20, with_total=False):
+        """获取用户下非回收站的笔记（游标分页）"""
+        query = Note._userNotesExcludeRecycledQuery(user_id, is_recent)
+        return Note._paginateByCursor(query, cursor, page_size, with_total)
+
+    @staticmethod
+    def searchNotes(user_id, keyword, project_id=None, page_no=1, page_size=20):
+        """全文检索用户下非回收站的笔记（标题 + 内容），按相关度排序（分页）；压缩保存的内容通过 note_search_text 表检索"""
+        query = Note.searchQuery(user_id, keyword, project_id)
+        total = query.count()
+        rows = query.offset((page_no - 1) * page_size).limit(page_size).all()
+        return {
+            'data': rows,
+            'total': total,
+            'pages': (total + page_size - 1) // page_size
+        }
+
+    # 检索查询，返回 (笔记, 相关度) 的查询；fulltext 为空时按数据库判断是否使用全文索引（MySQL）
+    @staticmethod
+    def searchQuery(user_id, keyword, project_id=None, fulltext=None):
+        query = Note.query.join(Project, Note.project_id == Project.id) \
+            .join(NoteContent, NoteContent.note_id == Note.id).options(contains_eager(Note.body)) \
+            .filter(Project.account_id == user_id) \
+            .filter(Note.is_recycle == False)
+        if project_id:
+            query = query.filter(Note.project_id == project_id)
+        terms = split_search_terms(keyword)
+        boolean_query = build_boolean_query(terms)
+        if fulltext is None:
+            fulltext = db.engine.dialect.name == 'mysql'
+        fulltext = fulltext and bool(boolean_query)
+        # 短于 ngram 分词长度的词不在全文索引中（全文检索时被忽略），与不支持全文索引时（如测试用的 SQLite）一样用标题、内容模糊匹配过滤
+        like_terms = [term for term in terms if len(term) < NGRAM_TOKEN_SIZE] if fulltext else terms
+        if like_terms:
+            query = query.outerjoin(NoteSearchText, NoteSearchText.note_id == Note.id)
+            for term in like_terms:
+                query = query.filter(db.or_(
+                    Note.title.contains(term, autoescape=True),
+                    NoteContent.text.contains(term, autoescape=True),
+                    NoteSearchText.text.contains(term, autoescape=True),
+                ))
+        if not fulltext:
+            return query.add_columns(db.null().label('score')).order_by(Note.updated_at.desc())
+        # 标题、内容的全文索引在不同的表上，跨表 OR 多个 MATCH 时用不上索引；
+        # 分别在各自的表上检索（各走各的全文索引），合并命中的笔记 id，相关度为各项之和
+        title_score = match(Note.title, against=boolean_query).in_boolean_mode()
+        content_score = match(NoteContent.text, against=boolean_query).in_boolean_mode()
+        search_text_score = match(NoteSearchText.text, against=boolean_query).in_boolean_mode()
+        matched = db.union_all(
+            db.select(Note.id.label('note_id'), title_score.label('score')).where(title_score),
+            db.select(NoteContent.note_id.label('note_id'), content_score.label('score')).where(content_score),
+            db.select(NoteSearchText.note_id.label('note_id'), search_text_score.label('score')).where(search_text_score),
+        ).subquery()
+        scores = db.select(matched.c.note_id, db.func.sum(matched.c.score).label('score')) \
+            .group_by(matched.c.note_id).subquery()
+        return query.join(scores, scores.c.note_id == Note.id).add_columns(scores.c.score) \
+            .order_by(scores.c.score.desc(), Note.updated_at.desc())
+
+# 笔记查询条件：笔记列表、分页、版本戳共用
+note_filters = FilterSet(
+    type=Equal(Note.type),
+    title=Like(Note.title),
+    folder=Like(Note.folder),
+    status=In(Note.status),
+    is_archived=Equal(Note.is_archived),
+    is_recycle=Equal(Note.is_recycle),
+    is_share=Equal(Note.is_share),
+    created_start_time=AtLeast(Note.created_at),
+    created_end_time=AtMost(Note.created_at),
+    updated_start_time=AtLeast(Note.updated_at),
+    updated_end_time=AtMost(Note.updated_at),
+    recent=Recent(Note.updated_at),
+)
+
+# 笔记分页排序：可按更新时间、创建时间、标题排序，最后按 id 排序保证分页稳定
+note_sorting = Sorting(
+    Note.id,
+    'updated_at desc',
+    updated_at=Note.updated_at,
+    created_at=Note.created_at,
+    title=Note.title,
+)
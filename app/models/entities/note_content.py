@@ -0,0 +1,86 @@
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extension import db, content_codec
+from .note_search_text import NoteSearchText
+class NoteContent(db.Model):
+    __tablename__ = 'note_content'
+    __table_args__ = (
+        # 内容全文检索（ngram 分词，支持中文），只索引原文列，标题的全文索引在 note 表上
+        db.Index('ft_note_content_content', 'content', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+    )
+    note_id = db.Column(db.Integer(), db.ForeignKey('note.id', ondelete='CASCADE'), primary_key=True, nullable=False, comment='笔记ID')
+    text = db.Column('content', db.Text(), nullable=False, default='', comment='笔记内容原文（压缩保存时为空，原文在 note_search_text 表）')
+    compressed = db.Column(db.LargeBinary(length=16777215), comment='压缩后的笔记内容')
+    codec = db.Column(db.String(16), comment='压缩方式，为空表示未压缩')
+    # 压缩保存时原文另存一份到 note_search_text 表，全文检索仍能按内容命中；读取内容不加载该表
+    search_text = db.relationship(NoteSearchText, uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+
+    # 笔记内容：按 NOTE_CONTENT_CODEC 透明压缩
+    @property
+    def content(self):
+        if self.codec:
+            return content_codec.decompress(self.codec, self.compressed)
+        return self.text
+
+    @content.setter
+    def content(self, value):
+        self._store(value, content_codec.compress(value))
+
+    def _store(self, value, packed):
+        was_compressed = self.codec is not None
+        if packed is None:
+            self.text, self.compressed, self.codec = value, None, None
+            # 只有原先压缩保存的行才有检索原文，未压缩的行不查询该表
+            if was_compressed:
+                self.search_text = None
+        else:
+            self.codec, self.compressed = packed
+            self.text = ''
+            if was_compressed and self.search_text is not None:
+                self.search_text.text = value
+            else:
+                self.search_text = NoteSearchText(text=value)
+
+    # 按压缩配置重写已有笔记内容（codec='plain' 时全部解压），按笔记 id 分批处理
+    # dry_run 时只统计压缩前后的字节数与编解码耗时，不写回数据库
+    @staticmethod
+    def rewriteContents(codec=None, batch_size=500, dry_run=False):
+        stats = {'rows': 0, 'rewritten': 0, 'bytes_before': 0, 'bytes_after': 0, 'decode_seconds': 0.0, 'encode_seconds': 0.0}
+        last_id = 0
+        while True:
+            rows = NoteContent.query.filter(NoteContent.note_id > last_id).order_by(NoteContent.note_id).limit(batch_size).all()
+            if not rows:
+                break
+            for row in rows:
+                before = len(row.text.encode('utf-8')) + len(row.compressed or b'')
+                started = time.perf_counter()
+                text = row.content
+                decoded = time.perf_counter()
+                packed = None if codec == 'plain' else content_codec.compress(text, codec)
+                stats['decode_seconds'] += decoded - started
+                stats['encode_seconds'] += time.perf_counter() - decoded
+                stats['rows'] += 1
+                stats['bytes_before'] += before
+                stats['bytes_after'] += len(packed[1]) if packed else len(text.encode('utf-8'))
+                if (packed[0] if packed else None) != row.codec or (packed and packed[1] != row.compressed):
+                    stats['rewritten'] += 1
+                    if not dry_run:
+                        row._store(text, packed)
+            last_id = rows[-1].note_id
+            if not dry_run:
+                db.session.commit()
+        return stats
+
+
+# 拆分内容表的过渡期：NOTE_CONTENT_DUAL_WRITE 开启时，把本次 flush 新增、修改的内容同时写回 note.content
+# （旧版本服务只读 note.content）；note.content 上的触发器会再同步回 note_content，内容相同，不影响结果
+@event.listens_for(Session, 'after_flush')
+def _dualWriteLegacyContent(session, flush_context):
+    if not current_app.config.get('NOTE_CONTENT_DUAL_WRITE'):
+        return
+    rows = [{'note_id': row.note_id, 'content': row.content}
+            for row in list(session.new) + list(session.dirty) if isinstance(row, NoteContent)]
+    if rows:
+        session.connection().execute(db.text('UPDATE note SET content = :content WHERE id = :note_id'), rows)
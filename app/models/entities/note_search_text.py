@@ -0,0 +1,9 @@
+from app.extension import db
+class NoteSearchText(db.Model):
+    __tablename__ = 'note_search_text'
+    __table_args__ = (
+        # 压缩保存的笔记内容原文的全文检索（ngram 分词，支持中文）
+        db.Index('ft_note_search_text_content', 'content', mysql_prefix='FULLTEXT', mysql_with_parser='ngram'),
+    )
+    note_id = db.Column(db.Integer(), db.ForeignKey('note_content.note_id', ondelete='CASCADE'), primary_key=True, nullable=False, comment='笔记ID')
+    text = db.Column('content', db.Text(), nullable=False, default='', comment='压缩保存的笔记内容原文，只用于全文检索')
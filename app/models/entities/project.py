@@ -1,8 +1,16 @@
 from datetime import datetime
-from app.extension import db
+from app.extension import db, project_cache
 from app.utils import format_datetime_to_string
+from .tombstone import SyncTombstone
+from ..filters import FilterSet, Sorting, Equal, Like, In, AtLeast, AtMost, Recent
 class Project(db.Model):
     __tablename__ = 'project'
+    __table_args__ = (
+        # 账户下项目列表：按更新时间筛选/排序
+        db.Index('ix_project_account_updated', 'account_id', 'updated_at'),
+        # 账户下项目列表：按归档、回收站、收藏状态过滤
+        db.Index('ix_project_account_flags', 'account_id', 'is_archived', 'is_recycle', 'is_favor'),
+    )
     id = db.Column(db.Integer(), primary_key=True, nullable=False, autoincrement=True, comment='项目ID')
     account_id = db.Column(db.Integer(), db.ForeignKey('user.id'), nullable=False, comment='账户ID')
     type = db.Column(db.String(64), nullable=False, comment='项目类型')
@@ -24,13 +32,18 @@ class Project(db.Model):
 
     # 更新项目
     def updateProject(self):
+        project_id = self.id
         db.session.add(self)
         db.session.commit()
+        project_cache.invalidate(project_id)
 
-    # 删除项目
+    # 删除项目（同时记录删除，供增量同步下发）
     def deleteProject(self):
+        project_id = self.id
+        SyncTombstone.record(self.account_id, 'project', project_id)
         db.session.delete(self)
         db.session.commit()
+        project_cache.invalidate(project_id)
 
     # 打印项目信息
     def dict(self):
@@ -55,6 +68,14 @@ class Project(db.Model):
     def getProjectById(id):
         return Project.query.filter_by(id=id).first()
 
+    # 根据项目 id 查询项目信息（字典，优先读取缓存）
+    @staticmethod
+    def getProjectDictById(id):
+        def load():
+            project = Project.getProjectById(id)
+            return project.dict() if project else None
+        return project_cache.get(id, load)
+
     # 根据项目 name 查询项目信息（用于判断项目名是否重复）
     @staticmethod
     def getProjectByName(name, account_id):
@@ -65,10 +86,28 @@ class Project(db.Model):
     def getProjectByKeyword(keyword, account_id):
         return Project.query.filter(Project.name.like('%' + keyword + '%'), Project.account_id == account_id).all()
 
-    # 获取账户下的所有项目
+    # 获取账户下的项目，conditions 为 project_filters 中声明的条件（如 recent、status）
+    @staticmethod
+    def getProjectsByAccountId(account_id, conditions=None):
+        return project_filters.apply(Project.query.filter_by(account_id=account_id), conditions).all()
+
+    # 账户下项目的版本戳 (条数, 最大更新时间)，条件与项目列表一致，只做聚合查询不加载行，用于 ETag / Last-Modified
     @staticmethod
-    def getProjectsByAccountId(account_id):
-        return Project.query.filter_by(account_id=account_id).all()
+    def getProjectsStampByAccountId(account_id, conditions=None):
+        query = project_filters.apply(Project.query.filter_by(account_id=account_id), conditions)
+        return query.with_entities(db.func.count(Project.id), db.func.max(Project.updated_at)).one()
+
+    # 增量同步：按 (updated_at, id) 正序查询 position 之后、until 之前变更的项目，多取一条用于判断是否还有更多
+    @staticmethod
+    def getChangedProjectsByAccountIdSince(account_id, position, until, limit):
+        query = Project.query.filter(Project.account_id == account_id, Project.updated_at < until)
+        if position:
+            updated_at, id = position
+            query = query.filter(db.or_(
+                Project.updated_at > updated_at,
+                db.and_(Project.updated_at == updated_at, Project.id > id)
+            ))
+        return query.order_by(Project.updated_at, Project.id).limit(limit + 1).all()
 
     # 获取账户下的项目（分页接口）
     '''
@@ -88,49 +127,41 @@ class Project(db.Model):
 		}
     :param page: 页码
     :param per_page: 每页数量
+    :param sort_by: 排序条件，如 "updated_at desc"，可选字段见 project_sorting，默认按更新时间倒序
     :return: 包含项目列表、总数和总页数的字典
     '''
     @staticmethod
-    def getProjectsByAccountIdWithPagination(account_id, query_conditions, page, per_page):
-        query = Project.query.filter_by(account_id=account_id)
-
-        # 处理查询条件
-        if query_conditions:
-            # 根据项目类型过滤
-            if query_conditions.get('type'):
-                query = query.filter(Project.type == query_conditions['type'])
-
-            # 根据项目名称模糊匹配
-            if query_conditions.get('name'):
-                query = query.filter(Project.name.like('%' + query_conditions['name'] + '%'))
-
-            # 根据是否归档过滤
-            if query_conditions.get('is_archived') is not None:
-                query = query.filter(Project.is_archived == query_conditions['is_archived'])
-
-            # 根据是否在回收站过滤
-            if query_conditions.get('is_recycle') is not None:
-                query = query.filter(Project.is_recycle == query_conditions['is_recycle'])
-
-            # 根据是否收藏过滤
-            if query_conditions.get('is_favor') is not None:
-                query = query.filter(Project.is_favor == query_conditions['is_favor'])
-
-            # 根据创建时间范围过滤
-            if query_conditions.get('created_start_time'):
-                query = query.filter(Project.created_at >= query_conditions['created_start_time'])
-            if query_conditions.get('created_end_time'):
-                query = query.filter(Project.created_at <= query_conditions['created_end_time'])
-
-            # 根据更新时间范围过滤
-            if query_conditions.get('updated_start_time'):
-                query = query.filter(Project.updated_at >= query_conditions['updated_start_time'])
-            if query_conditions.get('updated_end_time'):
-                query = query.filter(Project.updated_at <= query_conditions['updated_end_time'])
+    def getProjectsByAccountIdWithPagination(account_id, query_conditions, page, per_page, sort_by=None):
+        # 处理查询条件（与项目列表共用 project_filters）
+        query = project_filters.apply(Project.query.filter_by(account_id=account_id), query_conditions)
         total = query.count()
-        projects = query.offset((page - 1) * per_page).limit(per_page).all()
+        projects = project_sorting.apply(query, sort_by).offset((page - 1) * per_page).limit(per_page).all()
         return {
             'data': projects,
             'total': total,
             'pages': (total + per_page - 1) // per_page
-        }
\ No newline at end of file
+        }
+
+# 项目查询条件：项目列表、分页、版本戳共用
+project_filters = FilterSet(
+    type=Equal(Project.type),
+    name=Like(Project.name),
+    status=In(Project.status),
+    is_archived=Equal(Project.is_archived),
+    is_recycle=Equal(Project.is_recycle),
+    is_favor=Equal(Project.is_favor),
+    created_start_time=AtLeast(Project.created_at),
+    created_end_time=AtMost(Project.created_at),
+    updated_start_time=AtLeast(Project.updated_at),
+    updated_end_time=AtMost(Project.updated_at),
+    recent=Recent(Project.updated_at),
+)
+
+# 项目分页排序：可按更新时间、创建时间、名称排序，最后按 id 排序保证分页稳定
+project_sorting = Sorting(
+    Project.id,
+    'updated_at desc',
+    updated_at=Project.updated_at,
+    created_at=Project.created_at,
+    name=Project.name,
+)
@@ -0,0 +1,53 @@
+from datetime import datetime
+from flask import current_app
+from app.extension import db
+from app.utils import format_datetime_to_string
+class SyncTombstone(db.Model):
+    __tablename__ = 'sync_tombstone'
+    __table_args__ = (
+        # 增量同步：按账户查询某一时间之后删除的数据
+        db.Index('ix_sync_tombstone_account_deleted', 'account_id', 'deleted_at'),
+    )
+    id = db.Column(db.Integer(), primary_key=True, nullable=False, autoincrement=True, comment='记录ID')
+    account_id = db.Column(db.Integer(), nullable=False, comment='账户ID')
+    entity_type = db.Column(db.String(32), nullable=False, comment='被删除数据的类型：note / project')
+    entity_id = db.Column(db.Integer(), nullable=False, comment='被删除数据的ID')
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.now, comment='删除时间')
+
+    # 记录删除（不提交，与删除操作在同一事务中提交）
+    @staticmethod
+    def record(account_id, entity_type, entity_id):
+        db.session.add(SyncTombstone(account_id=account_id, entity_type=entity_type, entity_id=entity_id))
+
+    def dict(self):
+        return {
+            'type': self.entity_type,
+            'id': self.entity_id,
+            'deleted_at': format_datetime_to_string(self.deleted_at)
+        }
+
+    # 最早的未提交事务的开始时间（不含当前连接），没有未提交事务或查询失败时返回 None
+    # updated_at 在 flush 时由应用写入、提交时才可见，长事务（例如批量导入）提交的数据可能早于同步上界，
+    # 同步上界不能超过仍未提交的事务的开始时间；需要 PROCESS 权限读取 information_schema.INNODB_TRX
+    @staticmethod
+    def getOldestOpenTransactionStart():
+        try:
+            return db.session.execute(db.text(
+                'SELECT MIN(trx_started) FROM information_schema.INNODB_TRX WHERE trx_mysql_thread_id <> CONNECTION_ID()'
+            )).scalar()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(f"查询未提交事务失败，同步上界只按延迟计算: {str(e)}")
+            return None
+
+    # 增量同步：按 (deleted_at, id) 正序查询 position 之后、until 之前删除的数据，多取一条用于判断是否还有更多
+    @staticmethod
+    def getTombstonesByAccountIdSince(account_id, position, until, limit):
+        query = SyncTombstone.query.filter(SyncTombstone.account_id == account_id, SyncTombstone.deleted_at < until)
+        if position:
+            deleted_at, id = position
+            query = query.filter(db.or_(
+                SyncTombstone.deleted_at > deleted_at,
+                db.and_(SyncTombstone.deleted_at == deleted_at, SyncTombstone.id > id)
+            ))
+        return query.order_by(SyncTombstone.deleted_at, SyncTombstone.id).limit(limit + 1).all()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from app.extension import db
+from app.extension import db, user_cache
 from app.utils import format_datetime_to_string
 class User(db.Model):
     __tablename__ = 'user' # 表名，与数据库中的表名一致
@@ -19,13 +19,17 @@ class User(db.Model):
     
     # 更新用户
     def updateUser(self):
+        user_id = self.id
         db.session.add(self)
         db.session.commit()
+        user_cache.invalidate(user_id)
     
     # 删除用户
     def deleteUser(self):
+        user_id = self.id
         db.session.delete(self)
         db.session.commit()
+        user_cache.invalidate(user_id)
     
     # 打印用户信息
     def dict(self):
@@ -55,6 +59,19 @@ class User(db.Model):
     def getUserById(id):
         return User.query.filter_by(id=id).first()
     
+    # 根据用户ID获取用户公开信息（字典，不含密码和 salt，优先读取缓存）
+    @staticmethod
+    def getUserDictById(id):
+        def load():
+            user = User.getUserById(id)
+            if not user:
+                return None
+            data = user.dict()
+            data.pop('password')
+            data.pop('salt')
+            return data
+        return user_cache.get(id, load)
+
     # 查询所有用户
     @staticmethod
     def getAllUser():
@@ -0,0 +1,151 @@
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import and_
+
+# “最近”列表的默认天数
+RECENT_DAYS = 30
+
+# ISO 8601 之外兼容的旧格式
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M')
+DATE_ONLY_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# 解析时间条件：优先按 ISO 8601 解析（支持毫秒、时区及 Z 后缀），再尝试旧格式；
+# 数据库中保存的是服务器本地时间（不带时区），带时区的值换算为本地时间后去掉时区；
+# 只有日期时下界取当天 0 点，上界（end_of_day）取当天最后一刻
+def parse_datetime(value, end_of_day=False):
+    if isinstance(value, datetime):
+        return value
+    value = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value[-1:] in ('Z', 'z') else value)
+    except ValueError:
+        parsed = _parse_legacy_datetime(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    if end_of_day and DATE_ONLY_PATTERN.fullmatch(value):
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+def _parse_legacy_datetime(value):
+    for format_str in DATETIME_FORMATS + ('%Y-%m-%d',):
+        try:
+            return datetime.strptime(value, format_str)
+        except ValueError:
+            pass
+    raise ValueError('无效的时间: {}'.format(value))
+
+class Filter(object):
+    """
+    单个过滤条件：绑定一个列，compile(value) 把请求中的值转换为 SQL 条件，值为空时返回 None（不过滤）
+    """
+    def __init__(self, column):
+        self.column = column
+
+    def compile(self, value):
+        raise NotImplementedError
+
+class Equal(Filter):
+    # 等值过滤；False / 0 是有效值，None 和空字符串不过滤；传入列表时按 IN 过滤
+    def compile(self, value):
+        if isinstance(value, (list, tuple)):
+            return In(self.column).compile(value)
+        if value is None or value == '':
+            return None
+        return self.column == value
+
+class Like(Filter):
+    # 模糊匹配
+    def compile(self, value):
+        if not value:
+            return None
+        return self.column.like('%{}%'.format(value))
+
+class In(Filter):
+    # 多值过滤，接受列表或逗号分隔的字符串
+    def compile(self, value):
+        if isinstance(value, str):
+            value = value.split(',')
+        values = [item.strip() if isinstance(item, str) else item for item in value or []]
+        values = [item for item in values if item is not None and item != '']
+        if not values:
+            return None
+        return self.column.in_(values)
+
+class AtLeast(Filter):
+    # 时间范围下界（包含），字符串按 DATETIME_FORMATS 解析，格式错误时抛出 ValueError
+    def compile(self, value):
+        if not value:
+            return None
+        return self.column >= parse_datetime(value)
+
+class AtMost(Filter):
+    # 时间范围上界（包含），只有日期时包含当天
+    def compile(self, value):
+        if not value:
+            return None
+        return self.column <= parse_datetime(value, end_of_day=True)
+
+class Recent(Filter):
+    # 最近 N 天内（包含边界，不包含未来时间）；值为 True 时使用默认天数
+    def compile(self, value):
+        if not value:
+            return None
+        days = RECENT_DAYS if value is True else int(value)
+        now = datetime.now()
+        return and_(self.column >= now - timedelta(days=days), self.column <= now)
+
+class FilterSet(object):
+    """
+    可组合的查询条件：在模型定义处声明一次 条件名 -> Filter，
+    列表、分页、版本戳等查询共用同一份声明，把请求中的条件字典转换为 SQL 条件，未声明的条件名忽略
+    """
+    def __init__(self, **filters):
+        self.filters = filters
+
+    def conditions(self, values):
+        conditions = []
+        for key, value in (values or {}).items():
+            spec = self.filters.get(key)
+            if spec is None:
+                continue
+            condition = spec.compile(value)
+            if condition is not None:
+                conditions.append(condition)
+        return conditions
+
+    def apply(self, query, values):
+        conditions = self.conditions(values)
+        return query.filter(*conditions) if conditions else query
+
+class Sorting(object):
+    """
+    排序条件：声明可排序的字段，sort_by 形如 'updated_at desc' 或 'status asc, updated_at desc'（也可以是列表），
+    未指定时使用默认排序；最后按 tiebreaker（主键）排序，保证分页结果稳定，方向与最后一个排序字段一致
+    """
+    def __init__(self, tiebreaker, default, **columns):
+        self.tiebreaker = tiebreaker
+        self.columns = columns
+        self.default = self.parse(default)
+
+    def parse(self, sort_by):
+        if not sort_by:
+            return self.default
+        items = sort_by.split(',') if isinstance(sort_by, str) else sort_by
+        order = []
+        for item in items:
+            parts = str(item).split()
+            if not parts:
+                continue
+            key = parts[0]
+            direction = parts[1].lower() if len(parts) > 1 else 'asc'
+            if key not in self.columns or direction not in ('asc', 'desc') or len(parts) > 2:
+                raise ValueError('无效的排序条件: {}'.format(item))
+            order.append((key, direction == 'desc'))
+        return order or self.default
+
+    def apply(self, query, sort_by=None):
+        order = self.parse(sort_by)
+        clauses = [self.columns[key].desc() if desc else self.columns[key].asc() for key, desc in order]
+        last_desc = order[-1][1] if order else False
+        clauses.append(self.tiebreaker.desc() if last_desc else self.tiebreaker.asc())
+        return query.order_by(*clauses)
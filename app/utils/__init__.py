@@ -1,3 +1,20 @@
 from .dateformat import *
 from .strFormatValid import *
-from .saltSecret import *
\ No newline at end of file
+from .saltSecret import *
+from .pageCursor import *
+from .entityCache import *
+from .jobQueue import *
+from .writeBehind import *
+from .searchText import *
+from .tokenBlocklist import *
+from .poolStats import *
+from .internalAccess import *
+from .queryStats import *
+from .metrics import *
+from .requestSchema import *
+from .fastMarshal import *
+from .conditionalRequest import *
+from .hashExecutor import *
+from .loginLimiter import *
+from .contentCodec import *
+from .textPatch import *
\ No newline at end of file
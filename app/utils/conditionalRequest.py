@@ -0,0 +1,27 @@
+import hashlib
+from datetime import timezone
+from flask import request
+from werkzeug.http import http_date
+
+# 根据资源的版本信息（id、更新时间、条数等）生成 ETag
+def make_etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+def check_not_modified(etag, last_modified=None):
+    """
+    条件请求判断：返回 (是否未修改, 响应头)
+    If-None-Match 优先；没有 If-None-Match 时才比较 If-Modified-Since（精确到秒）。
+    未修改时接口直接返回 304 和响应头，不再查询数据和序列化
+    :param etag: make_etag 生成的版本标识（弱 ETag）
+    :param last_modified: 最后修改时间（与库中时间一致的本地时间，按 UTC 输出，前后一致即可比较）；
+                          只用于单个资源，列表移除数据时最大更新时间可能不变，列表接口不要传
+    """
+    headers = {'ETag': 'W/"{}"'.format(etag), 'Cache-Control': 'private, no-cache'}
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        headers['Last-Modified'] = http_date(last_modified)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag), headers
+    if last_modified is not None and request.if_modified_since is not None:
+        return request.if_modified_since >= last_modified, headers
+    return False, headers
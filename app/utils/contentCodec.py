@@ -0,0 +1,62 @@
+import hashlib
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 笔记内容哈希（BLAKE2b，16 字节），按原文计算，用于跳过未变化的写入和导入去重
+def hash_content(value):
+    return hashlib.blake2b((value or '').encode('utf-8'), digest_size=16).hexdigest()
+
+class ContentCodec(object):
+    """
+    笔记内容压缩编解码
+    压缩后的字节和压缩方式分别保存在 note_content 的 BLOB 列和 codec 列，原文列留空（原文另存到 note_search_text 表供全文检索）；没有 codec 的行（旧数据、未压缩的短内容）直接读原文列，
+    因此开启或关闭压缩都不需要先迁移已有数据。NOTE_CONTENT_CODEC 为空时不压缩（默认），可选 zlib、zstd（需安装 zstandard）
+    """
+    def __init__(self):
+        self.codec = None
+        self.level = 6
+        self.min_size = 1024
+
+    def init_app(self, app):
+        codec = app.config.get('NOTE_CONTENT_CODEC') or None
+        if codec == 'zstd' and zstandard is None:
+            app.logger.warning('未安装 zstandard，笔记内容改用 zlib 压缩')
+            codec = 'zlib'
+        if codec not in (None, 'zlib', 'zstd'):
+            raise ValueError(f'不支持的笔记内容压缩方式: {codec}')
+        # 过渡期触发器会把 note.content 的原文复制回 note_content 的原文列，与压缩保存冲突
+        if codec and app.config.get('NOTE_CONTENT_DUAL_WRITE'):
+            raise ValueError('NOTE_CONTENT_DUAL_WRITE 开启期间不能开启笔记内容压缩')
+        self.codec = codec
+        self.level = app.config.get('NOTE_CONTENT_COMPRESS_LEVEL', self.level)
+        self.min_size = app.config.get('NOTE_CONTENT_COMPRESS_MIN_SIZE', self.min_size)
+
+    # 压缩内容，返回 (压缩方式, 压缩后的字节)；未开启压缩、内容过短或压缩后没有变小时返回 None，按原文保存
+    def compress(self, value, codec=None):
+        codec = codec or self.codec
+        if not codec or value is None or len(value) < self.min_size:
+            return None
+        raw = value.encode('utf-8')
+        if codec == 'zstd':
+            packed = zstandard.ZstdCompressor(level=self.level).compress(raw)
+        else:
+            packed = zlib.compress(raw, self.level)
+        if len(packed) >= len(raw):
+            return None
+        return codec, packed
+
+    # 按压缩方式解压
+    def decompress(self, codec, packed):
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError('笔记内容使用 zstd 压缩，需要安装 zstandard 才能读取')
+            raw = zstandard.ZstdDecompressor().decompress(packed)
+        elif codec == 'zlib':
+            raw = zlib.decompress(packed)
+        else:
+            raise ValueError(f'未知的笔记内容压缩方式: {codec}')
+        return raw.decode('utf-8')
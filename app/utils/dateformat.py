@@ -1,2 +1,7 @@
+from datetime import datetime
+
 def format_datetime_to_string(datetime, format_str = '%Y-%m-%d %H:%M:%S'):
-    return datetime.strftime(format_str)
\ No newline at end of file
+    return datetime.strftime(format_str)
+
+def parse_string_to_datetime(string, format_str = '%Y-%m-%d %H:%M:%S'):
+    return datetime.strptime(string, format_str)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+import redis
+
+class EntityCache(object):
+    """
+    基于 Redis 的实体缓存：读穿透 + 写失效
+    缓存键带版本号，dict() 结构变化时递增 VERSION 即可让旧缓存整体失效；
+    Redis 不可用时直接回源数据库，不影响接口可用性。
+    每个实体另有一个失效计数：失效时递增，未命中回源前先读取计数，回填时计数已变化（回源期间有写入提交并失效）
+    则放弃回填，避免把回源读到的旧数据写回缓存
+    """
+    VERSION = 1
+    STATS_KEY = 'lifocus:cache:stats'
+    STATS_FLUSH_INTERVAL = 10  # 命中统计写回 Redis 的间隔（秒）
+
+    def __init__(self, client, name, ttl=300):
+        self.client = client
+        self.name = name
+        self.ttl = ttl
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._pending_stats = {}
+        self._last_flush = time.monotonic()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CACHE_TTL', self.ttl)
+        self.enabled = app.config.get('CACHE_ENABLED', True)
+
+    def _key(self, entity_id):
+        return 'lifocus:cache:v{}:{}:{}'.format(self.VERSION, self.name, entity_id)
+
+    def _generation_key(self, entity_id):
+        return 'lifocus:cache:gen:{}:{}'.format(self.name, entity_id)
+
+    # 读取缓存，未命中时调用 loader 回源并回填
+    def get(self, entity_id, loader):
+        if not self.enabled:
+            return loader()
+        key = self._key(entity_id)
+        generation_key = self._generation_key(entity_id)
+        try:
+            # 缓存和失效计数一次读取，命中时仍只有一次网络往返
+            cached, generation = self.client.mget(key, generation_key)
+        except redis.RedisError:
+            self._count('error')
+            return loader()
+        if cached is not None:
+            self._count('hit')
+            return json.loads(cached)
+        self._count('miss')
+        data = loader()
+        if data is not None:
+            self._fill(key, generation_key, generation, data)
+        return data
+
+    # 回填缓存：WATCH 失效计数，计数与回源前读取的不一致（或回填期间被修改）时放弃回填
+    def _fill(self, key, generation_key, generation, data):
+        try:
+            with self.client.pipeline() as pipe:
+                pipe.watch(generation_key)
+                if pipe.get(generation_key) != generation:
+                    self._count('stale')
+                    return
+                pipe.multi()
+                pipe.set(key, json.dumps(data), ex=self.ttl)
+                pipe.execute()
+        except redis.WatchError:
+            self._count('stale')
+        except redis.RedisError:
+            self._count('error')
+
+    # 写操作提交后删除缓存并递增失效计数；计数的过期时间与缓存相同，回源耗时不会超过缓存有效期
+    def invalidate(self, entity_id):
+        if not self.enabled:
+            return
+        generation_key = self._generation_key(entity_id)
+        try:
+            pipe = self.client.pipeline()
+            pipe.delete(self._key(entity_id))
+            pipe.incr(generation_key)
+            pipe.expire(generation_key, self.ttl)
+            pipe.execute()
+        except redis.RedisError:
+            self._count('error')
+
+    # 统计先在进程内累加，定期批量写回 Redis，避免每次读取多一次网络往返
+    def _count(self, kind):
+        field = '{}:{}'.format(self.name, kind)
+        with self._lock:
+            self._pending_stats[field] = self._pending_stats.get(field, 0) + 1
+            if time.monotonic() - self._last_flush < self.STATS_FLUSH_INTERVAL:
+                return
+            pending, self._pending_stats = self._pending_stats, {}
+            self._last_flush = time.monotonic()
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for field, value in pending.items():
+                pipe.hincrby(self.STATS_KEY, field, value)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+
+    # 查询所有进程汇总的命中统计，形如 {'note:hit': 10, 'note:miss': 2}
+    @staticmethod
+    def stats(client):
+        return {k.decode('utf-8'): int(v) for k, v in client.hgetall(EntityCache.STATS_KEY).items()}
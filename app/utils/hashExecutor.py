@@ -0,0 +1,39 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+class HashBusyError(Exception):
+    """哈希线程池已满或等待超时，接口返回 503"""
+    pass
+
+class HashExecutor(object):
+    """
+    密码哈希线程池
+    PBKDF2 / scrypt 等密码哈希计算量大，集中在固定数量的线程中执行，限制每个进程同时进行的哈希计算数量，
+    避免登录、注册高峰时占满 CPU 拖慢其他接口；排队数量有上限，超出时立即抛出 HashBusyError（背压），不再无限排队
+    """
+    def __init__(self):
+        self.timeout = 10
+        self._executor = None
+        self._slots = None
+
+    def init_app(self, app):
+        workers = app.config.get('HASH_WORKERS', 2)
+        self.timeout = app.config.get('HASH_TIMEOUT', self.timeout)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lifocus-hash')
+        # 执行中 + 排队中的任务总数上限
+        self._slots = threading.BoundedSemaphore(workers + app.config.get('HASH_QUEUE_SIZE', 16))
+
+    # 在线程池中执行 func(*args) 并等待结果
+    def run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashBusyError('服务繁忙，请稍后重试')
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashBusyError('服务繁忙，请稍后重试')
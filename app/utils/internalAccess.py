@@ -0,0 +1,30 @@
+import hmac
+from functools import wraps
+from flask import request, current_app
+
+def _request_token():
+    token = request.headers.get('X-Internal-Token')
+    if token:
+        return token
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        return authorization[len('Bearer '):]
+    return ''
+
+# 仅允许内部访问的接口（监控指标、系统接口等）
+# 反向代理后面所有请求的来源地址都是代理地址，不能只看来源地址：配置了 INTERNAL_ACCESS_TOKEN 时必须携带令牌
+# （X-Internal-Token 或 Authorization: Bearer），未配置时只在调试模式下按来源地址放行；
+# 来源地址由 ProxyFix 按 PROXY_FIX_X_FOR 解析为真实客户端地址
+def internal_only(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get('INTERNAL_ACCESS_TOKEN')
+        if token:
+            if not hmac.compare_digest(_request_token().encode('utf-8'), token.encode('utf-8')):
+                return {'code': 403, 'message': '仅限内部访问'}, 403
+        elif not current_app.debug:
+            return {'code': 403, 'message': '仅限内部访问（未配置 INTERNAL_ACCESS_TOKEN）'}, 403
+        if request.remote_addr not in current_app.config['INTERNAL_ALLOWED_IPS']:
+            return {'code': 403, 'message': '仅限内部访问'}, 403
+        return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,252 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import redis
+
+class JobError(Exception):
+    """任务执行失败，message 会作为任务的错误信息返回给前端"""
+    pass
+
+class JobHandle(object):
+    """传给任务函数的句柄，用于上报进度和获取产物路径"""
+    PROGRESS_INTERVAL = 0.5  # 进度写入的最小间隔（秒），避免频繁写 Redis
+
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.id = job_id
+        self._last_report = 0
+
+    def progress(self, done, total):
+        now = time.monotonic()
+        if done < total and now - self._last_report < self.PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        self.queue.update(self.id, progress=done, total=total)
+
+    # 记录产物文件名并返回写入路径，产物目录在任务写入产物时才创建
+    def artifact_path(self, filename):
+        self.queue.update(self.id, artifact=filename)
+        path = self.queue.artifact_path(self.id, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+class JobQueue(object):
+    """
+    后台任务队列
+    任务在进程内线程池中执行，请求线程提交后立即返回；任务状态保存在 Redis 中，
+    多进程部署时任意 worker 都可以查询进度。JOB_BACKEND='memory' 时状态保存在进程内存中（只能在测试中使用，
+    已完成的任务超过 JOB_TTL 后在提交新任务时清除）。
+    每个进程定期在 Redis 中写入心跳，任务记录执行它的进程；进程退出（重启、崩溃）后心跳过期，
+    该进程未完成的任务在其他进程首次使用任务队列或查询该任务时标记为失败，不会一直停留在执行中。
+    任务产物写在 JOB_ARTIFACT_DIR 中，同一台服务器上的所有进程都可以下载；多台服务器部署时需将其配置为共享目录，
+    否则只能从生成产物的服务器下载
+    """
+    KEY_PREFIX = 'lifocus:job:'
+    ACTIVE_KEY = 'lifocus:job:active'  # 未完成的任务 id
+    WORKER_KEY_PREFIX = 'lifocus:job:worker:'  # 进程心跳
+    HEARTBEAT_INTERVAL = 10  # 心跳间隔（秒），超过 3 个间隔未更新视为进程已退出
+
+    def __init__(self, client):
+        self.client = client
+        self.app = None
+        self.backend = 'redis'
+        self.ttl = 24 * 60 * 60
+        self.artifact_dir = None
+        self.host = socket.gethostname()
+        self.worker_id = None
+        self._pid = None
+        self._executor = None
+        self._memory_store = {}  # job_id -> (最后写入时间, 任务)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.backend = app.config.get('JOB_BACKEND', 'redis')
+        if self.backend not in ('redis', 'memory'):
+            raise ValueError(f'不支持的任务状态存储: {self.backend}')
+        # 内存存储只在当前进程可见，多进程部署时查询不到其他进程的任务
+        if self.backend == 'memory' and not app.testing:
+            raise ValueError("JOB_BACKEND='memory' 只能在测试中使用")
+        self.ttl = app.config.get('JOB_TTL', self.ttl)
+        self.artifact_dir = app.config['JOB_ARTIFACT_DIR']
+        self._executor = ThreadPoolExecutor(max_workers=app.config.get('JOB_WORKERS', 2), thread_name_prefix='lifocus-job')
+
+    # 提交任务，func(job, *args, **kwargs) 的返回值作为任务结果
+    def submit(self, kind, owner_id, func, *args, **kwargs):
+        self._ensure_worker()
+        job_id = uuid.uuid4().hex
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._save({
+            'id': job_id,
+            'kind': kind,
+            'owner_id': str(owner_id),
+            'status': 'pending',
+            'progress': 0,
+            'total': 0,
+            'result': None,
+            'error': None,
+            'artifact': None,
+            'worker': self.worker_id,
+            'host': self.host,
+            'created_at': now,
+            'updated_at': now
+        })
+        if self.backend != 'memory':
+            self.client.sadd(self.ACTIVE_KEY, job_id)
+        self._purge_expired_jobs()
+        self._purge_expired_artifacts()
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, func, args, kwargs):
+        with self.app.app_context():
+            self.update(job_id, status='running')
+            try:
+                result = func(JobHandle(self, job_id), *args, **kwargs)
+                job = self.get(job_id) or {}
+                self.update(job_id, status='succeeded', result=result, progress=job.get('total', 0))
+            except JobError as e:
+                self.update(job_id, status='failed', error=str(e))
+            except Exception as e:
+                self.app.logger.exception('任务 %s 执行失败', job_id)
+                self.update(job_id, status='failed', error='任务执行失败：' + str(e))
+            finally:
+                self._discard_active(job_id)
+
+    def get(self, job_id):
+        self._ensure_worker()
+        job = self._load(job_id)
+        if job and self._is_orphaned(job):
+            job = self._fail_orphaned(job)
+        return job
+
+    def _load(self, job_id):
+        if self.backend == 'memory':
+            with self._lock:
+                entry = self._memory_store.get(job_id)
+                return dict(entry[1]) if entry else None
+        data = self.client.get(self.KEY_PREFIX + job_id)
+        return json.loads(data) if data is not None else None
+
+    # 产物是否在本机生成（未配置共享目录时只能在本机下载）
+    def is_local(self, job):
+        return job.get('host') in (None, self.host)
+
+    # 当前进程首次使用时登记进程 id、写入心跳并启动心跳线程，同时把已退出进程遗留的任务标记为失败；
+    # 延迟到首次使用时才启动线程，避免 fork 前创建的线程在子进程中失效
+    def _ensure_worker(self):
+        if self.backend == 'memory' or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.worker_id = '{}:{}:{}'.format(self.host, os.getpid(), uuid.uuid4().hex[:8])
+            self._pid = os.getpid()
+        try:
+            self._heartbeat()
+            self._fail_orphaned_jobs()
+        except redis.RedisError:
+            pass
+        threading.Thread(target=self._heartbeat_loop, name='lifocus-job-heartbeat', daemon=True).start()
+
+    def _heartbeat(self):
+        self.client.set(self.WORKER_KEY_PREFIX + self.worker_id, '', ex=self.HEARTBEAT_INTERVAL * 3)
+
+    def _heartbeat_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.HEARTBEAT_INTERVAL)
+            try:
+                self._heartbeat()
+            except redis.RedisError:
+                pass
+
+    # 任务未完成，且执行它的进程心跳已过期（没有记录进程的旧任务不处理）
+    def _is_orphaned(self, job):
+        if self.backend == 'memory' or job['status'] not in ('pending', 'running') or not job.get('worker'):
+            return False
+        if job['worker'] == self.worker_id:
+            return False
+        return not self.client.exists(self.WORKER_KEY_PREFIX + job['worker'])
+
+    def _fail_orphaned(self, job):
+        self.update(job['id'], status='failed', error='任务所在进程已退出，请重新提交')
+        self._discard_active(job['id'])
+        return self._load(job['id'])
+
+    def _fail_orphaned_jobs(self):
+        for job_id in self.client.smembers(self.ACTIVE_KEY):
+            job_id = job_id.decode('utf-8')
+            job = self._load(job_id)
+            if job is None:
+                self._discard_active(job_id)
+                continue
+            if self._is_orphaned(job):
+                self.app.logger.warning('任务 %s 所在进程 %s 已退出，标记为失败', job_id, job['worker'])
+                self._fail_orphaned(job)
+            elif job['status'] not in ('pending', 'running'):
+                self._discard_active(job_id)
+
+    def _discard_active(self, job_id):
+        if self.backend == 'memory':
+            return
+        try:
+            self.client.srem(self.ACTIVE_KEY, job_id)
+        except redis.RedisError:
+            pass
+
+    def update(self, job_id, **fields):
+        # 任务状态只由执行该任务的线程写入（进程退出后由其他进程标记失败），读-改-写不存在并发冲突
+        job = self._load(job_id)
+        if not job:
+            return
+        job.update(fields)
+        job['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._save(job)
+
+    def _save(self, job):
+        if self.backend == 'memory':
+            with self._lock:
+                self._memory_store[job['id']] = (time.monotonic(), job)
+            return
+        try:
+            self.client.set(self.KEY_PREFIX + job['id'], json.dumps(job), ex=self.ttl)
+        except redis.RedisError as e:
+            raise JobError('任务状态保存失败：' + str(e))
+
+    # 产物路径（只拼接路径，不创建目录）
+    def artifact_path(self, job_id, filename):
+        return os.path.join(self.artifact_dir, job_id, filename)
+
+    # 内存存储：清除已完成且超过保留时间的任务（Redis 存储由键过期清除）
+    def _purge_expired_jobs(self):
+        if self.backend != 'memory':
+            return
+        expire_before = time.monotonic() - self.ttl
+        with self._lock:
+            for job_id, (saved_at, job) in list(self._memory_store.items()):
+                if saved_at < expire_before and job['status'] not in ('pending', 'running'):
+                    del self._memory_store[job_id]
+
+    # 清理超过保留时间的任务产物
+    def _purge_expired_artifacts(self):
+        if not os.path.isdir(self.artifact_dir):
+            return
+        expire_before = time.time() - self.ttl
+        for entry in os.scandir(self.artifact_dir):
+            try:
+                if entry.stat().st_mtime >= expire_before:
+                    continue
+                if entry.is_dir():
+                    for child in os.scandir(entry.path):
+                        os.remove(child.path)
+                    os.rmdir(entry.path)
+                else:
+                    os.remove(entry.path)
+            except OSError:
+                pass
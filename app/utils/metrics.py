@@ -0,0 +1,103 @@
+import os
+import time
+from functools import wraps
+from flask import g, request, Response
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Metrics(object):
+    """
+    Prometheus 监控指标
+    记录各接口的请求耗时、状态码、请求/响应大小，以及数据库语句和 Redis 命令耗时，通过 /metrics 以 Prometheus 文本格式输出。
+    多进程部署（gunicorn）时设置环境变量 PROMETHEUS_MULTIPROC_DIR 指向各 worker 共享的空目录，
+    输出时会汇总所有 worker 的数据；worker 退出时需在 gunicorn 的 child_exit 钩子中调用 Metrics.mark_process_dead(worker.pid)
+    """
+    def __init__(self):
+        self.enabled = True
+        self.request_latency = Histogram('lifocus_http_request_duration_seconds', '接口请求耗时',
+                                         ['method', 'endpoint'], buckets=LATENCY_BUCKETS)
+        self.request_count = Counter('lifocus_http_requests_total', '接口请求次数',
+                                     ['method', 'endpoint', 'status'])
+        self.request_size = Histogram('lifocus_http_request_size_bytes', '请求体大小',
+                                      ['method', 'endpoint'], buckets=SIZE_BUCKETS)
+        self.response_size = Histogram('lifocus_http_response_size_bytes', '响应体大小',
+                                       ['method', 'endpoint'], buckets=SIZE_BUCKETS)
+        self.db_latency = Histogram('lifocus_db_query_duration_seconds', '数据库语句耗时',
+                                    ['operation'], buckets=LATENCY_BUCKETS)
+        self.redis_latency = Histogram('lifocus_redis_command_duration_seconds', 'Redis 命令耗时',
+                                       ['command'], buckets=LATENCY_BUCKETS)
+
+    def init_app(self, app, redis_client=None):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        if redis_client is not None:
+            self._instrument_redis(redis_client)
+
+    # 接口统计，endpoint 使用路由规则（如 /api/note/singleNote/<int:note_id>），避免标签基数随 id 增长
+    def _before_request(self):
+        g.metrics_start_time = time.perf_counter()
+
+    def _after_request(self, response):
+        if 'metrics_start_time' not in g:
+            return response
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        self.request_latency.labels(request.method, endpoint).observe(time.perf_counter() - g.metrics_start_time)
+        self.request_count.labels(request.method, endpoint, str(response.status_code)).inc()
+        if request.content_length is not None:
+            self.request_size.labels(request.method, endpoint).observe(request.content_length)
+        # 流式响应（如导出 zip）没有固定长度，不统计大小
+        if response.content_length is not None:
+            self.response_size.labels(request.method, endpoint).observe(response.content_length)
+        return response
+
+    # 数据库语句耗时，按语句类型（SELECT / INSERT / UPDATE / DELETE 等）区分；
+    # 开始时间记录在语句的执行上下文上，语句出错时随上下文丢弃，不在连接上累积
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_start_time = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start_time = getattr(context, '_metrics_start_time', None)
+        if start_time is None:
+            return
+        duration = time.perf_counter() - start_time
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+        self.db_latency.labels(operation).observe(duration)
+
+    # Redis 命令耗时，包装客户端的 execute_command（pipeline 和 pubsub 不经过此方法，不统计）
+    def _instrument_redis(self, client):
+        execute_command = client.execute_command
+
+        @wraps(execute_command)
+        def timed_execute_command(*args, **options):
+            start_time = time.perf_counter()
+            try:
+                return execute_command(*args, **options)
+            finally:
+                command = str(args[0]).upper() if args else 'UNKNOWN'
+                self.redis_latency.labels(command).observe(time.perf_counter() - start_time)
+        client.execute_command = timed_execute_command
+
+    # 输出 Prometheus 文本格式，多进程模式下汇总所有 worker 的数据
+    def export(self):
+        if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+    @staticmethod
+    def mark_process_dead(pid):
+        if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            multiprocess.mark_process_dead(pid)
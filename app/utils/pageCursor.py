@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import datetime
+
+# 游标分页每页最多条数
+CURSOR_MAX_PAGE_SIZE = 100
+
+# 游标分页：将最后一条记录的 (updated_at, id) 编码为不透明的游标字符串
+def encode_cursor(updated_at, id):
+    raw = json.dumps([updated_at.strftime('%Y-%m-%d %H:%M:%S.%f'), id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+# 解析游标，格式错误时抛出 ValueError
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        updated_at, id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        return datetime.strptime(updated_at, '%Y-%m-%d %H:%M:%S.%f'), int(id)
+    except Exception:
+        raise ValueError('无效的游标: {}'.format(cursor))
+
+# 增量同步令牌：记录各类数据已同步到的位置 (时间, id) 以及本轮同步的时间上界 until
+# state 形如 {'until': datetime 或 None, 'notes': (datetime, id) 或 None, ...}
+def encode_sync_token(state):
+    raw = {}
+    for key, value in state.items():
+        if isinstance(value, datetime):
+            raw[key] = value.strftime('%Y-%m-%d %H:%M:%S.%f')
+        elif value:
+            raw[key] = [value[0].strftime('%Y-%m-%d %H:%M:%S.%f'), value[1]]
+        else:
+            raw[key] = None
+    raw = json.dumps(raw, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+# 解析同步令牌，格式错误时抛出 ValueError
+def decode_sync_token(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        state = {}
+        for key, value in raw.items():
+            if isinstance(value, str):
+                state[key] = datetime.strptime(value, '%Y-%m-%d %H:%M:%S.%f')
+            elif value:
+                state[key] = (datetime.strptime(value[0], '%Y-%m-%d %H:%M:%S.%f'), int(value[1]))
+            else:
+                state[key] = None
+        return state
+    except Exception:
+        raise ValueError('无效的同步令牌: {}'.format(token))
@@ -0,0 +1,68 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+class Histogram(object):
+    """线程安全的累计直方图，buckets 为各桶上限（秒）"""
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    # 返回累计分布：{'buckets': {'0.001': n, ..., '+Inf': n}, 'sum': s, 'count': c}
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total_sum, total_count = self._sum, self._count
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {'buckets': buckets, 'sum': total_sum, 'count': total_count}
+
+# 获取连接的等待时间分布（进程级，连接池重建后继续累计）
+pool_wait_histogram = Histogram((0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+
+class InstrumentedQueuePool(QueuePool):
+    """记录获取连接耗时（含排队等待和新建连接）及超时次数的连接池"""
+    timeout_count = 0  # 类属性，连接池重建后继续累计
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            InstrumentedQueuePool.timeout_count += 1
+            raise
+        finally:
+            pool_wait_histogram.observe(time.perf_counter() - start)
+
+# 当前连接池状态
+def get_pool_stats(engine):
+    pool = engine.pool
+    stats = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'timeouts': InstrumentedQueuePool.timeout_count,
+            'wait_time': pool_wait_histogram.snapshot()
+        })
+    return stats
@@ -0,0 +1,106 @@
+import heapq
+import threading
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryStats(object):
+    """
+    请求级数据库查询统计
+    通过 SQLAlchemy before/after_cursor_execute 事件记录每条语句的耗时，按请求汇总查询次数和数据库总耗时并写入
+    Server-Timing 响应头；超过阈值的语句写入慢查询日志；按接口累计统计并保留最慢的若干条语句
+    """
+    TOP_STATEMENTS = 5  # 每个接口保留的最慢语句数量
+    STATEMENT_MAX_LENGTH = 500  # 记录语句的最大长度
+
+    def __init__(self):
+        self.enabled = True
+        self.slow_threshold = 0.2
+        self.logger = None
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('QUERY_STATS_ENABLED', True)
+        self.slow_threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200) / 1000.0
+        self.logger = app.logger
+        if not self.enabled:
+            return
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    # 开始时间记录在本条语句的执行上下文上：语句出错时不会触发 after_cursor_execute，上下文随语句一起丢弃，
+    # 不会像记录在连接上那样在长期复用的连接中不断累积
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_stats_start_time = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start_time = getattr(context, '_query_stats_start_time', None)
+        if start_time is None:
+            return
+        duration = time.perf_counter() - start_time
+        if duration >= self.slow_threshold:
+            self.logger.warning('慢查询 %.1fms: %s', duration * 1000, statement[:self.STATEMENT_MAX_LENGTH])
+        if has_request_context() and 'query_count' in g:
+            g.query_count += 1
+            g.query_time += duration
+            # 只保留本次请求最慢的语句，避免记录所有语句
+            if len(g.query_slowest) < self.TOP_STATEMENTS:
+                heapq.heappush(g.query_slowest, (duration, statement))
+            elif duration > g.query_slowest[0][0]:
+                heapq.heapreplace(g.query_slowest, (duration, statement))
+
+    def _before_request(self):
+        g.request_start_time = time.perf_counter()
+        g.query_count = 0
+        g.query_time = 0.0
+        g.query_slowest = []
+
+    def _after_request(self, response):
+        if 'query_count' not in g:
+            return response
+        total_time = time.perf_counter() - g.request_start_time
+        response.headers.add('Server-Timing', 'db;dur={:.2f};desc="{} queries"'.format(g.query_time * 1000, g.query_count))
+        response.headers.add('Server-Timing', 'total;dur={:.2f}'.format(total_time * 1000))
+        if request.url_rule is not None:
+            self._record('{} {}'.format(request.method, request.url_rule.rule))
+        return response
+
+    # 按接口累计统计
+    def _record(self, endpoint):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {'requests': 0, 'queries': 0, 'db_time': 0.0, 'max_queries': 0, 'slowest': []}
+            stats['requests'] += 1
+            stats['queries'] += g.query_count
+            stats['db_time'] += g.query_time
+            stats['max_queries'] = max(stats['max_queries'], g.query_count)
+            for duration, statement in g.query_slowest:
+                item = (duration, statement[:self.STATEMENT_MAX_LENGTH])
+                if len(stats['slowest']) < self.TOP_STATEMENTS:
+                    heapq.heappush(stats['slowest'], item)
+                elif duration > stats['slowest'][0][0]:
+                    heapq.heapreplace(stats['slowest'], item)
+
+    # 各接口的查询统计，按数据库总耗时倒序
+    def snapshot(self):
+        with self._lock:
+            result = []
+            for endpoint, stats in self._endpoints.items():
+                result.append({
+                    'endpoint': endpoint,
+                    'requests': stats['requests'],
+                    'queries': stats['queries'],
+                    'avg_queries': stats['queries'] / stats['requests'],
+                    'max_queries': stats['max_queries'],
+                    'db_time_ms': stats['db_time'] * 1000,
+                    'avg_db_time_ms': stats['db_time'] * 1000 / stats['requests'],
+                    'slowest': [{'duration_ms': duration * 1000, 'statement': statement}
+                                for duration, statement in sorted(stats['slowest'], reverse=True)]
+                })
+        return sorted(result, key=lambda item: item['db_time_ms'], reverse=True)
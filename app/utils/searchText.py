@@ -0,0 +1,45 @@
+import html
+import re
+
+# ngram 分词的最小长度（与 MySQL ngram_token_size 保持一致），更短的词无法命中全文索引
+NGRAM_TOKEN_SIZE = 2
+
+# 拆分搜索关键字，去掉布尔模式中的特殊字符
+def split_search_terms(keyword):
+    cleaned = re.sub(r'[+\-<>()~*"@]', ' ', keyword or '')
+    return [term for term in cleaned.split() if term]
+
+# 生成布尔模式的全文检索语句：每个词都必须以短语形式出现
+def build_boolean_query(terms):
+    return ' '.join('+"{}"'.format(term) for term in terms if len(term) >= NGRAM_TOKEN_SIZE)
+
+def _term_pattern(terms):
+    return re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+
+# 高亮文本中的关键字（先转义 HTML，再用 <mark> 包裹命中的词）
+def highlight_text(text, terms):
+    if not text or not terms:
+        return html.escape(text or '')
+    parts = []
+    last = 0
+    for found in _term_pattern(terms).finditer(text):
+        parts.append(html.escape(text[last:found.start()]))
+        parts.append('<mark>{}</mark>'.format(html.escape(found.group(0))))
+        last = found.end()
+    parts.append(html.escape(text[last:]))
+    return ''.join(parts)
+
+# 截取第一个命中位置附近的片段并高亮；focus 为定位片段使用的关键字（默认与 terms 相同）
+def make_snippet(text, terms, width=120, focus=None):
+    if not text:
+        return ''
+    start = 0
+    focus = focus or terms
+    if focus:
+        found = _term_pattern(focus).search(text)
+        if found:
+            start = max(0, found.start() - width // 3)
+    snippet = text[start:start + width]
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if start + width < len(text) else ''
+    return prefix + highlight_text(snippet, terms) + suffix
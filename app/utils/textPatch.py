@@ -0,0 +1,23 @@
+# 按操作列表修改文本，每个操作为 {'offset': 位置, 'delete': 删除的字符数, 'insert': 插入的文本}
+# 位置按 Unicode 字符计算，且都相对于修改前的文本；操作按位置升序排列、互不重叠，不合法时抛出 ValueError
+def apply_text_ops(text, ops):
+    parts = []
+    last = 0
+    for op in ops:
+        if not isinstance(op, dict):
+            raise ValueError('补丁操作格式错误')
+        offset = op.get('offset')
+        delete = op.get('delete') or 0
+        insert = op.get('insert') or ''
+        if not _is_int(offset) or not _is_int(delete) or not isinstance(insert, str):
+            raise ValueError('补丁操作格式错误')
+        if offset < last or delete < 0 or offset + delete > len(text):
+            raise ValueError('补丁操作位置超出范围或相互重叠')
+        parts.append(text[last:offset])
+        parts.append(insert)
+        last = offset + delete
+    parts.append(text[last:])
+    return ''.join(parts)
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
@@ -0,0 +1,95 @@
+import threading
+import time
+import redis
+
+class TokenBlocklist(object):
+    """
+    JWT 黑名单本地缓存
+    已注销的 jti 在进程内保存（到期自动清除），通过 Redis 发布/订阅实时同步，并定期增量拉取兜底，
+    未注销 token 的检查不再访问 Redis。同步异常时退化为直接查询 Redis
+    """
+    CHANNEL = 'lifocus:jwt:revoked'
+    ZSET_KEY = 'lifocus:jwt:blocklist'  # member 为 jti，score 为注销时间
+
+    def __init__(self, client):
+        self.client = client
+        self.enabled = True
+        self.sync_interval = 5
+        self.retention = 60 * 60  # 黑名单保留时长，不小于 token 有效期
+        self._revoked = {}  # jti -> 本地过期时间
+        self._lock = threading.Lock()
+        self._last_score = 0
+        self._last_sync = 0
+        self._thread = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get('JWT_BLOCKLIST_LOCAL', True)
+        self.sync_interval = app.config.get('JWT_BLOCKLIST_SYNC_INTERVAL', self.sync_interval)
+        self.retention = int(max(
+            app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds(),
+            app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds()
+        ))
+
+    # 注销 token：写入 Redis 并广播给所有进程
+    def revoke(self, jti, expires_in):
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(jti, '', ex=expires_in)  # 兼容按 jti 直接查询的旧逻辑
+        pipe.zadd(self.ZSET_KEY, {jti: now})
+        pipe.zremrangebyscore(self.ZSET_KEY, 0, now - self.retention)
+        pipe.publish(self.CHANNEL, jti)
+        pipe.execute()
+        with self._lock:
+            self._revoked[jti] = now + self.retention
+
+    def is_revoked(self, jti):
+        if not self.enabled:
+            return self.client.get(jti) is not None
+        self._ensure_started()
+        # 本地数据超过两个同步周期未更新，说明同步异常，直接查询 Redis
+        if time.monotonic() - self._last_sync > self.sync_interval * 2:
+            return self.client.get(jti) is not None
+        with self._lock:
+            return jti in self._revoked
+
+    def _ensure_started(self):
+        # 延迟到首次使用时才启动线程，避免 fork 前创建的线程在子进程中失效
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sync_loop, name='lifocus-jwt-blocklist', daemon=True)
+                self._thread.start()
+
+    def _sync_loop(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                # 订阅后再全量拉取一次，避免订阅前的注销消息丢失
+                self._pull()
+                while True:
+                    # 等待消息直到下一次增量拉取的时间，保证本地数据不超过一个同步周期未更新
+                    timeout = max(0.0, self._last_sync + self.sync_interval - time.monotonic())
+                    message = pubsub.get_message(timeout=timeout)
+                    if message and message['type'] == 'message':
+                        with self._lock:
+                            self._revoked[message['data'].decode('utf-8')] = time.time() + self.retention
+                    if time.monotonic() - self._last_sync >= self.sync_interval:
+                        self._pull()
+            except redis.RedisError:
+                time.sleep(self.sync_interval)
+
+    # 增量拉取上次同步之后注销的 jti，并清理已过期的记录
+    def _pull(self):
+        now = time.time()
+        # 回退 1 秒，覆盖不同进程之间的时钟误差
+        start = max(self._last_score - 1, now - self.retention)
+        entries = self.client.zrangebyscore(self.ZSET_KEY, start, '+inf', withscores=True)
+        with self._lock:
+            for jti, score in entries:
+                self._revoked[jti.decode('utf-8')] = score + self.retention
+                self._last_score = max(self._last_score, score)
+            for jti in [jti for jti, expire_at in self._revoked.items() if expire_at <= now]:
+                del self._revoked[jti]
+        self._last_sync = time.monotonic()
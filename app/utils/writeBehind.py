@@ -0,0 +1,103 @@
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+class WriteBehindWriter(object):
+    """
+    文件异步写回队列
+    写入/删除请求先放入待处理表，合并窗口内对同一路径的多次操作只执行最后一次；
+    后台线程池执行实际的文件操作，写入使用临时文件 + rename 保证原子性。
+    同一路径同一时间只有一个操作在执行，保证先后顺序
+    """
+    def __init__(self, coalesce_window=0.5, max_workers=2):
+        self.coalesce_window = coalesce_window
+        self.max_workers = max_workers
+        self._pending = {}  # path -> content，content 为 None 表示删除
+        self._inflight = {}  # path -> future
+        # 任务已完成时 add_done_callback 会在当前线程立即回调，需要可重入锁
+        self._lock = threading.RLock()
+        self._executor = None
+        self._dispatcher = None
+        # 后台线程中没有应用上下文，保存应用的 logger 供写入线程使用
+        self.logger = logging.getLogger(__name__)
+
+    def init_app(self, app):
+        self.logger = app.logger
+        self.coalesce_window = app.config.get('NOTE_MIRROR_COALESCE_WINDOW', self.coalesce_window)
+        self.max_workers = app.config.get('NOTE_MIRROR_WORKERS', self.max_workers)
+        # 进程退出前写完所有待处理文件
+        atexit.register(self.flush)
+
+    def write(self, path, content):
+        self._enqueue(path, content)
+
+    def delete(self, path):
+        self._enqueue(path, None)
+
+    def _enqueue(self, path, content):
+        with self._lock:
+            self._pending[path] = content
+            # 延迟到首次使用时才启动线程，避免 fork 前创建的线程在子进程中失效
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='lifocus-mirror')
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name='lifocus-mirror-dispatcher', daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            time.sleep(self.coalesce_window)
+            self._submit_pending()
+
+    def _submit_pending(self):
+        """提交待处理的操作，正在执行中的路径留到下一轮"""
+        with self._lock:
+            if self._executor is None:
+                return []
+            futures = []
+            for path in list(self._pending):
+                if path in self._inflight:
+                    continue
+                content = self._pending.pop(path)
+                future = self._executor.submit(self._apply, path, content)
+                self._inflight[path] = future
+                future.add_done_callback(lambda f, path=path: self._done(path))
+                futures.append(future)
+            return futures
+
+    def _done(self, path):
+        with self._lock:
+            self._inflight.pop(path, None)
+
+    # 立即执行所有待处理的操作并等待完成，用于进程退出和测试
+    def flush(self, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            self._submit_pending()
+            with self._lock:
+                if not self._pending and not self._inflight:
+                    return True
+                futures = list(self._inflight.values())
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return False
+            wait(futures, timeout=remaining)
+
+    def _apply(self, path, content):
+        try:
+            if content is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                self.logger.debug('已删除笔记文件: %s', path)
+                return
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = '{}.{}.tmp'.format(path, uuid.uuid4().hex)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+            self.logger.debug('笔记已保存到: %s', path)
+        except Exception:
+            self.logger.exception('写入笔记文件时发生错误: %s', path)
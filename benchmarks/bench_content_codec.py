@@ -0,0 +1,106 @@
+"""
+笔记内容压缩基准：在固定随机种子生成的 Markdown 语料上，比较不压缩、zlib、zstd（已安装 zstandard 时）的
+存储大小、编解码耗时，以及通过 ORM 保存、读取单篇笔记的耗时
+python -m benchmarks.bench_content_codec --notes 500
+"""
+import argparse
+import random
+import time
+from .common import app, db, reset_database, measure, summarize, print_table
+
+WORDS = ('笔记 项目 同步 检索 压缩 数据库 缓存 接口 分页 索引 任务 导出 导入 进度 权限 用户 会议 计划 复盘 需求 '
+         'note sync cache index query export import release deploy review design api schema token').split()
+
+
+def _paragraph(rng):
+    return ''.join(rng.choice(WORDS) + rng.choice(('', '，', ' ', '。')) for _ in range(rng.randint(20, 80)))
+
+
+# 生成一篇 Markdown：标题、段落、列表、代码块、表格混合，长度约 1KB 到 200KB（多数为几 KB 到几十 KB）
+def make_document(rng):
+    target = int(min(200 * 1024, max(1024, rng.lognormvariate(9.5, 1.0))))
+    parts = ['# ' + _paragraph(rng)[:30]]
+    while sum(len(part) for part in parts) < target:
+        kind = rng.random()
+        if kind < 0.5:
+            parts.append(_paragraph(rng))
+        elif kind < 0.7:
+            parts.append('\n'.join('- ' + _paragraph(rng)[:40] for _ in range(rng.randint(3, 8))))
+        elif kind < 0.85:
+            parts.append('```python\n' + '\n'.join('def {}_{}(x):\n    return x * {}'.format(rng.choice(WORDS[20:]), i, rng.randint(1, 99))
+                                                   for i in range(rng.randint(2, 6))) + '\n```')
+        else:
+            parts.append('| 字段 | 说明 |\n| --- | --- |\n' + '\n'.join('| {} | {} |'.format(rng.choice(WORDS), _paragraph(rng)[:20])
+                                                                     for _ in range(rng.randint(3, 10))))
+        parts.append('## ' + _paragraph(rng)[:20])
+    return '\n\n'.join(parts)
+
+
+# 存储字节数：内容行（原文列 + 压缩列）和检索原文表；按 UTF-8 字节计（SQLite 的 length() 对文本按字符计）
+def _storage_bytes():
+    from app.models import NoteContent, NoteSearchText
+    row_bytes = sum(len((text or '').encode('utf-8')) + len(compressed or b'')
+                    for text, compressed in db.session.query(NoteContent.text, NoteContent.compressed))
+    search_bytes = sum(len(text.encode('utf-8')) for text, in db.session.query(NoteSearchText.text))
+    return row_bytes, search_bytes
+
+
+def run_codec(codec, documents, level):
+    from app.extension import content_codec
+    from app.models import Note
+    user, project = reset_database()
+    content_codec.codec = codec
+    content_codec.level = level
+
+    # 编解码（不含数据库）
+    packed = [content_codec.compress(doc) for doc in documents]
+    encode = measure(content_codec.compress, documents)
+    decode = measure(lambda item: content_codec.decompress(*item), [item for item in packed if item]) if codec else []
+
+    # 保存：每篇笔记单独提交（与编辑保存一致）
+    note_ids = []
+
+    def save(doc):
+        note = Note(project_id=project.id, type='markdown', title='文档', content=doc)
+        note.addNote()
+        note_ids.append(note.id)
+    write = measure(save, documents)
+
+    # 读取：清空会话后按 id 读取内容（与打开单篇笔记一致）
+    db.session.remove()
+    read = measure(lambda note_id: Note.getNoteById(note_id).content, note_ids)
+    row_bytes, search_bytes = _storage_bytes()
+    return row_bytes, search_bytes, encode, decode, write, read
+
+
+def main():
+    parser = argparse.ArgumentParser(description='笔记内容压缩基准')
+    parser.add_argument('--notes', type=int, default=500, help='语料中的笔记数')
+    parser.add_argument('--level', type=int, default=6, help='压缩级别')
+    parser.add_argument('--seed', type=int, default=20260216, help='语料随机种子')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [make_document(rng) for _ in range(args.notes)]
+    raw_bytes = sum(len(doc.encode('utf-8')) for doc in documents)
+    from app.utils.contentCodec import zstandard
+    codecs = [None, 'zlib'] + (['zstd'] if zstandard is not None else [])
+    rows = []
+    with app.app_context():
+        print('语料：{} 篇，共 {:.1f} MB（UTF-8），数据库：{}'.format(len(documents), raw_bytes / 1024 / 1024, db.engine.url.drivername))
+        for codec in codecs:
+            started = time.perf_counter()
+            row_bytes, search_bytes, encode, decode, write, read = run_codec(codec, documents, args.level)
+            rows.append([
+                codec or 'plain',
+                '{:.1f} MB ({:.0%})'.format(row_bytes / 1024 / 1024, row_bytes / raw_bytes),
+                '{:.1f} MB'.format((row_bytes + search_bytes) / 1024 / 1024),
+                summarize(encode), summarize(decode), summarize(write), summarize(read),
+                '{:.1f}s'.format(time.perf_counter() - started),
+            ])
+    print('耗时列为 平均 / p50 / p95（毫秒，每篇笔记）')
+    print_table(['压缩', '内容行大小', '含检索原文', '压缩', '解压', 'ORM 保存', 'ORM 读取', '总耗时'], rows)
+
+
+if __name__ == '__main__':
+    main()
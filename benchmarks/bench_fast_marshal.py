@@ -0,0 +1,51 @@
+"""
+列表序列化基准：同一批笔记行分别用 restx 的 marshal（marshal_with 的做法）和 fast_marshal_with 的预编译序列化函数输出，
+再经 restx 的 JSON 输出得到响应内容，比较耗时并校验两者逐字节一致
+python -m benchmarks.bench_fast_marshal --rows 5000
+"""
+import argparse
+import random
+from flask_restx import marshal
+from flask_restx.representations import output_json
+from .common import app, db, reset_database, measure, summarize, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表序列化基准')
+    parser.add_argument('--rows', type=int, default=5000, help='笔记行数')
+    parser.add_argument('--repeat', type=int, default=20, help='每种方式重复次数')
+    args = parser.parse_args()
+
+    from app.models import Note
+    from app.controllers.note.note_api_model import note_response_list_model, note_page_response_model
+    from app.utils.fastMarshal import compile_model
+
+    rng = random.Random(20260216)
+    with app.app_context():
+        _, project = reset_database()
+        db.session.add_all(Note(project_id=project.id, type=rng.choice(('markdown', 'todo')), title='笔记标题 {}'.format(i),
+                                content='', folder=rng.choice((None, '工作', '生活/计划')), status=rng.choice((None, 'draft')),
+                                is_archived=rng.random() < 0.1, is_share=rng.random() < 0.1)
+                           for i in range(args.rows))
+        db.session.commit()
+        notes = Note.getNotesByProjectIdExcludeRecycled(project.id, None, False)
+        list_payload = {'code': 200, 'message': '查询成功', 'data': notes}
+        page_payload = {'code': 200, 'message': '查询成功',
+                        'page_data': {'data': notes, 'total': len(notes), 'pages': 1, 'page_no': 1, 'page_size': len(notes)}}
+
+        rows = []
+        for name, model, payload in (('列表', note_response_list_model, list_payload), ('分页', note_page_response_model, page_payload)):
+            serialize = compile_model(model)
+            expected = output_json(marshal(payload, model), 200).get_data()
+            actual = output_json(serialize(payload), 200).get_data()
+            assert actual == expected, '{} 输出与 marshal 不一致'.format(name)
+            slow = measure(lambda _: output_json(marshal(payload, model), 200), range(args.repeat))
+            fast = measure(lambda _: output_json(serialize(payload), 200), range(args.repeat))
+            rows.append([name + ' / marshal_with', summarize(slow), '1.00x', len(expected)])
+            rows.append([name + ' / fast_marshal_with', summarize(fast), '{:.2f}x'.format(sum(slow) / sum(fast)), len(actual)])
+    print('{} 行，每种方式 {} 次，耗时为 平均 / p50 / p95（毫秒，含 JSON 编码），两种输出逐字节一致'.format(len(notes), args.repeat))
+    print_table(['方式', '耗时', '加速', '响应字节'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+笔记导入基准：生成一个包含多篇 Markdown 的 ZIP（固定随机种子），比较逐篇提交（批量导入之前的做法）
+与 Note.importNotes 按批 flush、整体提交一次的耗时
+python -m benchmarks.bench_note_import --notes 5000
+"""
+import argparse
+import io
+import random
+import time
+import zipfile
+from .common import app, db, reset_database, print_table
+
+WORDS = '笔记 项目 同步 检索 压缩 数据库 缓存 接口 分页 索引 任务 导出 导入 进度 release deploy review'.split()
+
+
+def make_archive(count, rng):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(count):
+            body = '# 笔记 {}\n\n'.format(i) + '\n\n'.join(' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 200)))
+                                                          for _ in range(rng.randint(1, 10)))
+            archive.writestr('导入/目录{}/笔记{}.md'.format(i % 20, i), body)
+    return buffer.getvalue()
+
+
+def _read_archive(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            yield info.filename.rsplit('/', 1)[-1][:-3], archive.read(info).decode('utf-8')
+
+
+# 对照组：每篇笔记单独 add + commit
+def import_per_row(project_id, data):
+    from app.models import Note
+    for title, content in _read_archive(data):
+        Note(project_id=project_id, type='note', title=title, content=content, folder='imported').addNote()
+
+
+def import_batched(project_id, data, mode):
+    from app.controllers.note.note_import_manager import NoteImportManager
+    result = NoteImportManager()._import_zip_file(io.BytesIO(data), project_id, mode)
+    assert not isinstance(result, tuple), result
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='笔记导入基准')
+    parser.add_argument('--notes', type=int, default=5000, help='压缩包中的笔记数')
+    parser.add_argument('--chunk-sizes', default='100,500,2000', help='批量导入的批次大小，逗号分隔')
+    args = parser.parse_args()
+
+    rng = random.Random(20260216)
+    data = make_archive(args.notes, rng)
+    rows = []
+    with app.app_context():
+        print('压缩包：{} 篇笔记，{:.1f} MB，数据库：{}'.format(args.notes, len(data) / 1024 / 1024, db.engine.url.drivername))
+        runs = [('逐篇提交', None, import_per_row)]
+        for chunk_size in map(int, args.chunk_sizes.split(',')):
+            runs.append(('批量导入 chunk={}'.format(chunk_size), chunk_size, lambda project_id, data: import_batched(project_id, data, 'skip')))
+        baseline = None
+        for label, chunk_size, run in runs:
+            _, project = reset_database()
+            project_id = project.id
+            if chunk_size:
+                app.config['NOTE_IMPORT_CHUNK_SIZE'] = chunk_size
+            elapsed = _timed(run, project_id, data)
+            baseline = baseline or elapsed
+            rows.append([label, '{:.2f}s'.format(elapsed), '{:.0f}'.format(args.notes / elapsed), '{:.1f}x'.format(baseline / elapsed)])
+        # 在最后一次导入的基础上再导入一次：overwrite 模式下内容哈希相同，全部跳过
+        elapsed = _timed(import_batched, project_id, data, 'overwrite')
+        rows.append(['重复导入（全部跳过）', '{:.2f}s'.format(elapsed), '{:.0f}'.format(args.notes / elapsed), '{:.1f}x'.format(baseline / elapsed)])
+    print_table(['方式', '耗时', '篇/秒', '相对逐篇提交'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+列表接口基准：生成 1 万篇、每篇约 50KB 内容的笔记，测量各列表接口的响应字节数和耗时；
+对照组为拆分内容表之前的做法（查询笔记时连同内容一起加载并返回）
+python -m benchmarks.bench_note_list --notes 10000 --body-kb 50
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from .common import app, db, reset_database, measure, summarize, print_table
+
+BATCH_SIZE = 500
+
+
+def _populate(project_id, count, body_size, rng):
+    from app.models import Note, NoteContent
+    now = datetime.now()
+    # 几种不同的正文轮流使用，避免生成 500MB 随机文本；中文字符按 UTF-8 3 字节计，正文为 body_size 字节左右
+    bodies = [''.join(rng.choice('笔记内容检索同步缓存分页接口') for _ in range(body_size // 3)) for _ in range(8)]
+    for start in range(0, count, BATCH_SIZE):
+        ids = range(start + 1, min(start + BATCH_SIZE, count) + 1)
+        db.session.execute(db.insert(Note), [{
+            'id': note_id, 'project_id': project_id, 'type': 'note', 'title': '笔记 {}'.format(note_id),
+            'created_at': now - timedelta(minutes=note_id), 'updated_at': now - timedelta(minutes=note_id),
+        } for note_id in ids])
+        db.session.execute(db.insert(NoteContent), [{'note_id': note_id, 'text': bodies[note_id % len(bodies)]} for note_id in ids])
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表接口基准')
+    parser.add_argument('--notes', type=int, default=10000, help='笔记数')
+    parser.add_argument('--body-kb', type=int, default=50, help='每篇笔记的内容大小（KB，UTF-8）')
+    parser.add_argument('--repeat', type=int, default=5, help='每个接口的请求次数')
+    args = parser.parse_args()
+
+    from flask_jwt_extended import create_access_token
+    from flask_restx import marshal, fields
+    from flask_restx.representations import output_json
+    from sqlalchemy.orm import joinedload
+    from app.models import Note
+    from app.controllers.note.note_api_model import note_model
+
+    rng = random.Random(20260216)
+    client = app.test_client()
+    with app.app_context():
+        user, project = reset_database()
+        project_id = project.id
+        _populate(project_id, args.notes, args.body_kb * 1024, rng)
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+        project_headers = dict(headers, **{'X-Project-Id': str(project_id)})
+        requests = [
+            ('GET /note/projectNote（全部）', lambda: client.get('/api/note/projectNote', query_string={'projectId': project_id}, headers=headers)),
+            ('POST /note/projectNote（分页 20）', lambda: client.post('/api/note/projectNote', json={'page_no': 1, 'page_size': 20}, headers=project_headers)),
+            ('POST /note/projectNote（游标 20）', lambda: client.post('/api/note/projectNote', json={'cursor': '', 'page_size': 20}, headers=project_headers)),
+            ('GET /note/allNote（全部）', lambda: client.get('/api/note/allNote', headers=headers)),
+            ('POST /note/allNote（分页 20）', lambda: client.post('/api/note/allNote', json={'page_no': 1, 'page_size': 20}, headers=headers)),
+        ]
+        rows = []
+        for label, send in requests:
+            size = len(send().get_data())
+            rows.append([label, '{:.1f} KB'.format(size / 1024), summarize(measure(lambda _: send(), range(args.repeat)))])
+
+        # 对照组：连同内容一起查询并返回（拆分内容表之前的列表接口）
+        def full_list(_):
+            db.session.remove()
+            notes = Note.query.options(joinedload(Note.body)).filter_by(project_id=project_id, is_recycle=False).all()
+            return output_json(marshal({'code': 200, 'message': '查询成功', 'data': [note.dict() for note in notes]},
+                                       {'data': fields.List(fields.Nested(note_model))}), 200).get_data()
+        size = len(full_list(None))
+        rows.append(['对照：全部笔记含内容', '{:.1f} KB'.format(size / 1024), summarize(measure(full_list, range(args.repeat)))])
+    print('{} 篇笔记，每篇内容约 {} KB，每个接口 {} 次，耗时为 平均 / p50 / p95（毫秒）'.format(args.notes, args.body_kb, args.repeat))
+    print_table(['接口', '响应大小', '耗时'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+笔记检索基准：生成 10 万篇笔记（固定随机种子），测量 Note.searchNotes 在不同关键字组合下的耗时
+默认使用 SQLite（模糊匹配）；设置 TEST_DATABASE_URL 指向 MySQL 时测量全文索引（短词用模糊匹配补充过滤）
+python -m benchmarks.bench_note_search --notes 100000
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from .common import app, db, reset_database, measure, summarize, print_table
+
+WORDS = ('周报 月报 会议 需求 设计 接口 检索 缓存 同步 导出 导入 压缩 索引 分页 部署 复盘 计划 预算 合同 客户 '
+         'release deploy review sync cache index export import schema token').split()
+BATCH_SIZE = 5000
+
+
+# 正文词表：以随机生成的双字词为主，少量混入上面的常用词，使各关键字的命中数接近真实分布
+def _vocabulary(rng, size=5000):
+    return [chr(0x4e00 + rng.randrange(3000)) + chr(0x4e00 + rng.randrange(3000)) for _ in range(size)]
+
+
+def _word(rng, vocabulary):
+    return rng.choice(WORDS) if rng.random() < 0.02 else rng.choice(vocabulary)
+
+# (说明, 关键字)
+KEYWORDS = [
+    ('单个长词', '检索'),
+    ('两个长词', '检索 缓存'),
+    ('长词 + 短词', '检索 A'),
+    ('只有短词', 'A'),
+    ('英文长词', 'deploy'),
+    ('无结果', '不存在的词'),
+]
+
+
+def _populate(project_id, count, rng):
+    from app.models import Note, NoteContent
+    now = datetime.now()
+    vocabulary = _vocabulary(rng)
+    for start in range(0, count, BATCH_SIZE):
+        ids = range(start + 1, min(start + BATCH_SIZE, count) + 1)
+        db.session.execute(db.insert(Note), [{
+            'id': note_id, 'project_id': project_id, 'type': 'note', 'is_recycle': note_id % 50 == 0,
+            'title': '{} {} {}'.format(rng.choice(WORDS), rng.choice(WORDS), rng.choice('ABCDEFG')),
+            'created_at': now - timedelta(minutes=note_id), 'updated_at': now - timedelta(minutes=note_id),
+        } for note_id in ids])
+        db.session.execute(db.insert(NoteContent), [{
+            'note_id': note_id, 'text': '\n'.join(' '.join(_word(rng, vocabulary) for _ in range(12)) for _ in range(rng.randint(5, 40))),
+        } for note_id in ids])
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='笔记检索基准')
+    parser.add_argument('--notes', type=int, default=100000, help='笔记数')
+    parser.add_argument('--repeat', type=int, default=10, help='每个关键字的查询次数')
+    parser.add_argument('--page-size', type=int, default=20, help='每页数量')
+    args = parser.parse_args()
+
+    from app.models import Note
+    rng = random.Random(20260216)
+    with app.app_context():
+        user, project = reset_database()
+        _populate(project.id, args.notes, rng)
+        fulltext = db.engine.dialect.name == 'mysql'
+        driver = db.engine.url.drivername
+        rows = []
+        for label, keyword in KEYWORDS:
+            search = lambda _: Note.searchNotes(user.id, keyword, page_size=args.page_size)
+            total = search(None)['total']
+            rows.append([label, keyword, total, summarize(measure(search, range(args.repeat)))])
+    print('{} 篇笔记，数据库：{}（{}），每个关键字 {} 次，耗时为 平均 / p50 / p95（毫秒，含计数和首页查询）'.format(
+        args.notes, driver, '全文索引' if fulltext else '模糊匹配', args.repeat))
+    print_table(['关键字组合', '关键字', '命中数', '耗时'], rows)
+
+
+if __name__ == '__main__':
+    main()
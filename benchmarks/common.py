@@ -0,0 +1,65 @@
+"""
+基准测试公共部分：按测试配置创建应用，默认使用临时 SQLite 数据库（设置 TEST_DATABASE_URL 可指向 MySQL，
+例如测试全文索引），Redis 替换为 fakeredis。各脚本用 python -m benchmarks.<脚本名> 运行，--help 查看参数
+"""
+import os
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp(prefix='lifocus-bench-')
+os.environ['FLASK_ENV'] = 'testing'
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite:///' + os.path.join(_tmp_dir, 'bench.db'))
+os.environ.setdefault('JOB_ARTIFACT_DIR', os.path.join(_tmp_dir, 'jobs'))
+os.environ.setdefault('SECRET_KEY', 'bench-secret-key')
+os.environ.setdefault('JWT_SECRET_KEY', 'bench-jwt-secret-key-with-enough-length')
+os.environ.setdefault('QUERY_STATS_ENABLED', 'False')
+os.environ.setdefault('METRICS_ENABLED', 'False')
+
+import fakeredis  # noqa: E402
+from app import app  # noqa: E402
+from app.extension import db, redis_client  # noqa: E402
+
+redis_client.connection_pool = fakeredis.FakeRedis().connection_pool
+
+
+# 重建所有表，返回 (用户, 项目)
+def reset_database():
+    from app.models import User, Project
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    user = User(username='bench', email='bench@example.com', password='', salt='')
+    user.addUser()
+    project = Project(account_id=user.id, type='note', name='基准测试')
+    project.addProject()
+    return user, project
+
+
+# 依次执行 func，返回每次的耗时（秒）
+def measure(func, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))] if ordered else 0.0
+
+
+# 耗时摘要：平均 / p50 / p95（毫秒）
+def summarize(samples):
+    if not samples:
+        return '-'
+    return '{:.3f} / {:.3f} / {:.3f}'.format(sum(samples) / len(samples) * 1000, percentile(samples, 50) * 1000, percentile(samples, 95) * 1000)
+
+
+def print_table(headers, rows):
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    print('  '.join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)))
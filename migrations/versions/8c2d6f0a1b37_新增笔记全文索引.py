@@ -0,0 +1,27 @@
+"""新增笔记全文索引
+
+Revision ID: 8c2d6f0a1b37
+Revises: 3b8f1c2d4e5a
+Create Date: 2026-01-12 14:03:27.518840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2d6f0a1b37'
+down_revision = '3b8f1c2d4e5a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 标题、内容全文索引，使用 ngram 分词以支持中文检索
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.create_index('ft_note_title_content', ['title', 'content'], unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+
+
+def downgrade():
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.drop_index('ft_note_title_content')
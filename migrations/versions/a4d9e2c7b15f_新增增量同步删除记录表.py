@@ -0,0 +1,44 @@
+"""新增增量同步删除记录表
+
+Revision ID: a4d9e2c7b15f
+Revises: 8c2d6f0a1b37
+Create Date: 2026-01-19 10:26:41.205317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d9e2c7b15f'
+down_revision = '8c2d6f0a1b37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 删除记录，供增量同步下发已删除的笔记和项目
+    op.create_table('sync_tombstone',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False, comment='记录ID'),
+    sa.Column('account_id', sa.Integer(), nullable=False, comment='账户ID'),
+    sa.Column('entity_type', sa.String(length=32), nullable=False, comment='被删除数据的类型：note / project'),
+    sa.Column('entity_id', sa.Integer(), nullable=False, comment='被删除数据的ID'),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False, comment='删除时间'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('sync_tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_sync_tombstone_account_deleted', ['account_id', 'deleted_at'], unique=False)
+
+    # 增量同步：按项目查询某一时间之后变更的笔记（包括回收站中的笔记）
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.create_index('ix_note_project_updated', ['project_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.drop_index('ix_note_project_updated')
+
+    with op.batch_alter_table('sync_tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_sync_tombstone_account_deleted')
+
+    op.drop_table('sync_tombstone')
@@ -0,0 +1,94 @@
+"""拆分笔记内容表
+
+Revision ID: b7e3f1a9c2d4
+Revises: a4d9e2c7b15f
+Create Date: 2026-01-26 09:42:18.630294
+
+笔记内容迁移到 note_content 表，分步完成，部署期间不停服：
+1. 本迁移：新建 note_content，按 id 分批回填内容，note.content 改为可空；
+   创建触发器，把旧版本服务写入 note.content 的内容同步到 note_content（只同步这一个方向）
+2. 部署新版本服务并设置 NOTE_CONTENT_DUAL_WRITE=True：新版本读 note_content，写入时同时写回 note.content，
+   仍在运行的旧版本服务、以及回滚到旧版本后读到的都是最新内容
+   （不用 note_content 上的反向触发器：旧版本写 note 时正向触发器写入 note_content，
+   反向触发器再更新 note 会因“触发器不能修改触发语句正在使用的表”而报错）
+3. 确认旧版本服务全部下线、不再需要回滚后，关闭 NOTE_CONTENT_DUAL_WRITE 并重新部署
+4. c5a8d2e6f013：补齐缺失的内容，删除触发器和 note.content（必须在第 3 步之后执行，否则仍在双写的服务会写入失败）
+过渡期内不能开启 NOTE_CONTENT_CODEC（触发器会把原文复制回 note_content 的原文列）
+创建触发器需要 TRIGGER 权限（开启 binlog 时还需要 log_bin_trust_function_creators）
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f1a9c2d4'
+down_revision = 'a4d9e2c7b15f'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    op.create_table('note_content',
+    sa.Column('note_id', sa.Integer(), nullable=False, comment='笔记ID'),
+    sa.Column('content', sa.Text(), nullable=False, comment='笔记内容（按 NOTE_CONTENT_CODEC 透明压缩）'),
+    sa.ForeignKeyConstraint(['note_id'], ['note.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('note_id')
+    )
+    # 新版本服务写入笔记时不再写 note.content
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=True, existing_comment='笔记内容')
+
+    # 旧版本服务新增、修改笔记内容时同步到 note_content
+    op.execute("""
+        CREATE TRIGGER tr_note_content_insert AFTER INSERT ON note FOR EACH ROW
+        BEGIN
+            IF NEW.content IS NOT NULL THEN
+                INSERT INTO note_content (note_id, content) VALUES (NEW.id, NEW.content)
+                ON DUPLICATE KEY UPDATE content = VALUES(content);
+            END IF;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER tr_note_content_update AFTER UPDATE ON note FOR EACH ROW
+        BEGIN
+            IF NEW.content IS NOT NULL AND NOT (NEW.content <=> OLD.content) THEN
+                INSERT INTO note_content (note_id, content) VALUES (NEW.id, NEW.content)
+                ON DUPLICATE KEY UPDATE content = VALUES(content);
+            END IF;
+        END
+    """)
+
+    # 按 id 分批回填，每批单独执行，避免长时间锁住 note 表
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text('SELECT COALESCE(MAX(id), 0) FROM note')).scalar()
+    for start in range(0, max_id, BATCH_SIZE):
+        bind.execute(sa.text(
+            'INSERT IGNORE INTO note_content (note_id, content) '
+            'SELECT id, content FROM note WHERE id > :start AND id <= :end AND content IS NOT NULL'
+        ), {'start': start, 'end': start + BATCH_SIZE})
+
+    # 内容、标题分别建立全文索引（旧的联合索引在删除 note.content 时一起删除）
+    with op.batch_alter_table('note_content', schema=None) as batch_op:
+        batch_op.create_index('ft_note_content_content', ['content'], unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.create_index('ft_note_title', ['title'], unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS tr_note_content_update')
+    op.execute('DROP TRIGGER IF EXISTS tr_note_content_insert')
+
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.drop_index('ft_note_title')
+
+    # 新版本服务写入的内容只在 note_content 中，恢复到 note.content
+    op.execute('UPDATE note n JOIN note_content c ON c.note_id = n.id SET n.content = c.content')
+    op.execute("UPDATE note SET content = '' WHERE content IS NULL")
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=False, existing_comment='笔记内容')
+
+    with op.batch_alter_table('note_content', schema=None) as batch_op:
+        batch_op.drop_index('ft_note_content_content')
+    op.drop_table('note_content')
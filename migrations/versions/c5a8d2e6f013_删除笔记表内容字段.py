@@ -0,0 +1,62 @@
+"""删除笔记表内容字段
+
+Revision ID: c5a8d2e6f013
+Revises: b7e3f1a9c2d4
+Create Date: 2026-01-26 10:15:03.284716
+
+在新版本服务全部部署、并关闭 NOTE_CONTENT_DUAL_WRITE 重新部署之后执行（见 b7e3f1a9c2d4）
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a8d2e6f013'
+down_revision = 'b7e3f1a9c2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('DROP TRIGGER IF EXISTS tr_note_content_update')
+    op.execute('DROP TRIGGER IF EXISTS tr_note_content_insert')
+
+    # 补齐缺失的内容（理论上已由回填和触发器写入，这里兜底）
+    op.execute(
+        "INSERT IGNORE INTO note_content (note_id, content) "
+        "SELECT id, COALESCE(content, '') FROM note"
+    )
+
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.drop_index('ft_note_title_content')
+        batch_op.drop_column('content')
+
+
+def downgrade():
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content', sa.Text(), nullable=True, comment='笔记内容'))
+
+    op.execute('UPDATE note n JOIN note_content c ON c.note_id = n.id SET n.content = c.content')
+
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.create_index('ft_note_title_content', ['title', 'content'], unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+
+    # 恢复触发器，回到“旧、新版本服务同时运行”的中间状态
+    op.execute("""
+        CREATE TRIGGER tr_note_content_insert AFTER INSERT ON note FOR EACH ROW
+        BEGIN
+            IF NEW.content IS NOT NULL THEN
+                INSERT INTO note_content (note_id, content) VALUES (NEW.id, NEW.content)
+                ON DUPLICATE KEY UPDATE content = VALUES(content);
+            END IF;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER tr_note_content_update AFTER UPDATE ON note FOR EACH ROW
+        BEGIN
+            IF NEW.content IS NOT NULL AND NOT (NEW.content <=> OLD.content) THEN
+                INSERT INTO note_content (note_id, content) VALUES (NEW.id, NEW.content)
+                ON DUPLICATE KEY UPDATE content = VALUES(content);
+            END IF;
+        END
+    """)
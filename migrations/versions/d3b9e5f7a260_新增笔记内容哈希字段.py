@@ -0,0 +1,61 @@
+"""新增笔记内容哈希字段
+
+Revision ID: d3b9e5f7a260
+Revises: c5a8d2e6f013
+Create Date: 2026-02-02 15:21:46.905132
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import base64
+import hashlib
+import zlib
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b9e5f7a260'
+down_revision = 'c5a8d2e6f013'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+# 内容哈希：BLAKE2b（16 字节），与本迁移编写时的 app.utils.hash_content 一致；迁移不依赖应用代码，之后修改算法不影响本迁移
+def _hash(value):
+    return hashlib.blake2b((value or '').encode('utf-8'), digest_size=16).hexdigest()
+
+
+# 解析 "\x1f<编码>\x1f<base64(压缩数据)>" 格式的压缩内容（压缩数据改存 BLOB 列之前的格式），其他内容原样返回
+def _decode(value):
+    if not value.startswith('\x1f'):
+        return value
+    codec, payload = value[1:].split('\x1f', 1)
+    packed = base64.b64decode(payload)
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(packed).decode('utf-8')
+    return zlib.decompress(packed).decode('utf-8')
+
+
+def upgrade():
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=32), nullable=True, comment='笔记内容哈希（BLAKE2b）'))
+
+    # 按笔记 id 分批计算已有笔记的内容哈希（内容可能已压缩，按原文计算）
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            'SELECT note_id, content FROM note_content WHERE note_id > :last_id ORDER BY note_id LIMIT :limit'
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).all()
+        if not rows:
+            break
+        bind.execute(sa.text('UPDATE note SET content_hash = :content_hash WHERE id = :id'),
+                     [{'id': note_id, 'content_hash': _hash(_decode(content))} for note_id, content in rows])
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,71 @@
+"""笔记压缩内容改存BLOB列
+
+Revision ID: e6c1a8d4b392
+Revises: d3b9e5f7a260
+Create Date: 2026-02-09 11:08:52.417360
+
+压缩后的内容原先以 "\\x1f<编码>\\x1f<base64>" 保存在带全文索引的 content 列中，base64 抵消了部分压缩收益，
+ngram 还会索引 base64 文本；改为压缩字节存 BLOB 列、压缩方式存 codec 列，content 列只保存原文（压缩时为空）
+"""
+from alembic import op
+import sqlalchemy as sa
+import base64
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c1a8d4b392'
+down_revision = 'd3b9e5f7a260'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    with op.batch_alter_table('note_content', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('compressed', sa.LargeBinary(length=16777215), nullable=True, comment='压缩后的笔记内容'))
+        batch_op.add_column(sa.Column('codec', sa.String(length=16), nullable=True, comment='压缩方式，为空表示未压缩'))
+        batch_op.alter_column('content', existing_type=sa.Text(), existing_nullable=False,
+                              comment='笔记内容原文（压缩保存时为空）', existing_comment='笔记内容（按 NOTE_CONTENT_CODEC 透明压缩）')
+
+    # 已压缩的行：base64 解码后移到 BLOB 列（压缩数据本身不变，不需要解压）
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT note_id, content FROM note_content WHERE note_id > :last_id AND content LIKE CONCAT(CHAR(31), '%') "
+            "ORDER BY note_id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).all()
+        if not rows:
+            break
+        params = []
+        for note_id, content in rows:
+            codec, payload = content[1:].split('\x1f', 1)
+            params.append({'id': note_id, 'codec': codec, 'compressed': base64.b64decode(payload)})
+        bind.execute(sa.text(
+            "UPDATE note_content SET content = '', compressed = :compressed, codec = :codec WHERE note_id = :id"
+        ), params)
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            'SELECT note_id, codec, compressed FROM note_content WHERE note_id > :last_id AND codec IS NOT NULL '
+            'ORDER BY note_id LIMIT :limit'
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).all()
+        if not rows:
+            break
+        bind.execute(sa.text('UPDATE note_content SET content = :content WHERE note_id = :id'), [
+            {'id': note_id, 'content': '\x1f' + codec + '\x1f' + base64.b64encode(compressed).decode('ascii')}
+            for note_id, codec, compressed in rows
+        ])
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('note_content', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), existing_nullable=False,
+                              comment='笔记内容（按 NOTE_CONTENT_CODEC 透明压缩）', existing_comment='笔记内容原文（压缩保存时为空）')
+        batch_op.drop_column('codec')
+        batch_op.drop_column('compressed')
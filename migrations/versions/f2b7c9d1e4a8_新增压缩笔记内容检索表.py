@@ -0,0 +1,65 @@
+"""新增压缩笔记内容检索表
+
+Revision ID: f2b7c9d1e4a8
+Revises: e6c1a8d4b392
+Create Date: 2026-02-16 10:21:45.602318
+
+压缩保存的笔记内容原文列为空，note_content 上的全文索引检索不到；原文另存到 note_search_text 表（单独的全文索引），
+读取内容只读压缩列，检索走该表。已压缩的行在此解压后回填（解压逻辑固定在本文件中，不依赖应用代码）
+"""
+from alembic import op
+import sqlalchemy as sa
+import zlib
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7c9d1e4a8'
+down_revision = 'e6c1a8d4b392'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _decompress(codec, packed):
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(packed).decode('utf-8')
+    return zlib.decompress(packed).decode('utf-8')
+
+
+def upgrade():
+    op.create_table('note_search_text',
+        sa.Column('note_id', sa.Integer(), nullable=False, comment='笔记ID'),
+        sa.Column('content', sa.Text(), nullable=False, comment='压缩保存的笔记内容原文，只用于全文检索'),
+        sa.ForeignKeyConstraint(['note_id'], ['note_content.note_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('note_id')
+    )
+    with op.batch_alter_table('note_search_text', schema=None) as batch_op:
+        batch_op.create_index('ft_note_search_text_content', ['content'], unique=False, mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+    with op.batch_alter_table('note_content', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), existing_nullable=False,
+                              comment='笔记内容原文（压缩保存时为空，原文在 note_search_text 表）', existing_comment='笔记内容原文（压缩保存时为空）')
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            'SELECT note_id, codec, compressed FROM note_content WHERE note_id > :last_id AND codec IS NOT NULL '
+            'ORDER BY note_id LIMIT :limit'
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).all()
+        if not rows:
+            break
+        bind.execute(sa.text('INSERT INTO note_search_text (note_id, content) VALUES (:id, :content)'), [
+            {'id': note_id, 'content': _decompress(codec, compressed)} for note_id, codec, compressed in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    with op.batch_alter_table('note_content', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), existing_nullable=False,
+                              comment='笔记内容原文（压缩保存时为空）', existing_comment='笔记内容原文（压缩保存时为空，原文在 note_search_text 表）')
+    with op.batch_alter_table('note_search_text', schema=None) as batch_op:
+        batch_op.drop_index('ft_note_search_text_content')
+    op.drop_table('note_search_text')
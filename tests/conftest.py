@@ -0,0 +1,64 @@
+import os
+import tempfile
+import pytest
+import fakeredis
+from sqlalchemy import event
+
+# 导入 app 包时会按 FLASK_ENV 创建应用，需在导入前设置测试环境变量
+_tmp_dir = tempfile.mkdtemp(prefix='lifocus-test-')
+os.environ['FLASK_ENV'] = 'testing'
+os.environ.setdefault('TEST_DATABASE_URL', 'sqlite:///' + os.path.join(_tmp_dir, 'test.db'))
+os.environ.setdefault('JOB_ARTIFACT_DIR', os.path.join(_tmp_dir, 'jobs'))
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-with-enough-length')
+
+from app import app as flask_app  # noqa: E402
+from app.extension import db, redis_client  # noqa: E402
+
+# SQLite 默认不执行外键约束，打开后与 MySQL 一样按 ON DELETE CASCADE 删除关联行
+with flask_app.app_context():
+    @event.listens_for(db.engine, 'connect')
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        if db.engine.dialect.name == 'sqlite':
+            dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+# 所有测试共用一个 fakeredis 服务端，每个测试开始前清空
+_redis_server = fakeredis.FakeServer()
+redis_client.connection_pool = fakeredis.FakeRedis(server=_redis_server).connection_pool
+
+
+@pytest.fixture
+def app():
+    redis_client.flushall()
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    from app.models import User
+    user = User(username='tester', email='tester@example.com', password='', salt='')
+    user.addUser()
+    return user
+
+
+@pytest.fixture
+def project(user):
+    from app.models import Project
+    project = Project(account_id=user.id, type='note', name='测试项目')
+    project.addProject()
+    return project
+
+
+@pytest.fixture
+def auth_headers(user):
+    from flask_jwt_extended import create_access_token
+    return {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
@@ -0,0 +1,159 @@
+import threading
+import pytest
+from app.extension import db, redis_client, note_cache, project_cache
+from app.models import Note, Project
+from app.utils import EntityCache
+from . import conftest
+
+
+@pytest.fixture
+def note(project):
+    note = Note(project_id=project.id, type='markdown', title='原标题', content='原内容')
+    note.addNote()
+    return note
+
+
+@pytest.fixture
+def cache(app):
+    return EntityCache(redis_client, 'test', ttl=60)
+
+
+def test_get_reads_through_then_hits(cache):
+    calls = []
+    loader = lambda: calls.append(1) or {'id': 1}
+    assert cache.get(1, loader) == {'id': 1}
+    assert cache.get(1, loader) == {'id': 1}
+    assert len(calls) == 1
+
+
+def test_none_is_not_cached(cache):
+    calls = []
+    loader = lambda: calls.append(1)
+    assert cache.get(1, loader) is None
+    assert cache.get(1, loader) is None
+    assert len(calls) == 2
+
+
+def test_update_note_invalidates_after_commit(note):
+    assert Note.getNoteDictById(note.id)['title'] == '原标题'
+    note.title = '新标题'
+    note.content = '新内容'
+    note.updateNote()
+    data = Note.getNoteDictById(note.id)
+    assert data['title'] == '新标题'
+    assert data['content'] == '新内容'
+
+
+def test_delete_note_invalidates(note):
+    note_id = note.id
+    assert Note.getNoteDictById(note_id) is not None
+    note.deleteNote()
+    assert Note.getNoteDictById(note_id) is None
+
+
+def test_import_overwrite_invalidates(note, project):
+    assert Note.getNoteDictById(note.id)['content'] == '原内容'
+    Note.importNotes(project.id, [{'project_id': project.id, 'type': 'markdown', 'title': '原标题', 'content': '导入内容'}], mode='overwrite')
+    assert Note.getNoteDictById(note.id)['content'] == '导入内容'
+
+
+def test_update_and_delete_project_invalidate(project):
+    project_id = project.id
+    assert Project.getProjectDictById(project_id)['name'] == '测试项目'
+    assert redis_client.exists(project_cache._key(project_id))
+    project.name = '改名项目'
+    project.updateProject()
+    # 更新后缓存被清除，下次读取回源
+    assert not redis_client.exists(project_cache._key(project_id))
+    assert Project.getProjectDictById(project_id)['name'] == '改名项目'
+    project.deleteProject()
+    assert not redis_client.exists(project_cache._key(project_id))
+    assert Project.getProjectDictById(project_id) is None
+
+
+def test_cache_does_not_leak_uncommitted_changes(note):
+    # 未提交的修改不会进入缓存：回源读取的是其他会话可见的数据，提交后再失效
+    Note.getNoteDictById(note.id)
+    note.title = '未提交'
+    assert Note.getNoteDictById(note.id)['title'] == '原标题'
+    db.session.rollback()
+
+
+def test_stale_fill_is_dropped_when_invalidated_during_load(cache):
+    # 回源读到旧数据后、回填前，写请求提交并失效：旧数据不能写回缓存
+    value = {'version': 1}
+
+    def loader():
+        old = dict(value)
+        value['version'] = 2
+        cache.invalidate(1)
+        return old
+
+    assert cache.get(1, loader) == {'version': 1}
+    assert cache.get(1, lambda: dict(value)) == {'version': 2}
+
+
+def test_stale_fill_race_between_threads(note):
+    # 读线程回源后阻塞，期间写请求提交修改并失效缓存，读线程恢复后不能把旧数据写回
+    loaded = threading.Event()
+    resume = threading.Event()
+    results = {}
+    note_id = note.id
+    stale = note.dict()
+
+    def slow_loader():
+        loaded.set()
+        resume.wait(5)
+        return stale
+
+    def reader():
+        with conftest.flask_app.app_context():
+            results['data'] = note_cache.get(note_id, slow_loader)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    assert loaded.wait(5)
+    note.title = '并发修改'
+    note.updateNote()
+    resume.set()
+    thread.join(5)
+    assert results['data']['title'] == '原标题'
+    assert Note.getNoteDictById(note_id)['title'] == '并发修改'
+
+
+def test_invalidate_between_fills_does_not_block_later_fills(cache):
+    cache.invalidate(1)
+    calls = []
+    loader = lambda: calls.append(1) or {'id': 1}
+    cache.get(1, loader)
+    cache.get(1, loader)
+    assert len(calls) == 1
+
+
+def test_redis_unavailable_falls_back_to_loader(cache):
+    conftest._redis_server.connected = False
+    try:
+        assert cache.get(1, lambda: {'id': 1}) == {'id': 1}
+        cache.invalidate(1)
+    finally:
+        conftest._redis_server.connected = True
+
+
+def test_disabled_cache_always_loads(cache):
+    cache.enabled = False
+    calls = []
+    loader = lambda: calls.append(1) or {'id': 1}
+    cache.get(1, loader)
+    cache.get(1, loader)
+    assert len(calls) == 2
+
+
+def test_hit_miss_stats_are_flushed(cache, monkeypatch):
+    monkeypatch.setattr(EntityCache, 'STATS_FLUSH_INTERVAL', 0)
+    loader = lambda: {'id': 1}
+    cache.get(1, loader)
+    cache.get(1, loader)
+    cache.get(1, loader)
+    stats = EntityCache.stats(redis_client)
+    assert stats['test:miss'] == 1
+    assert stats['test:hit'] == 2
@@ -0,0 +1,67 @@
+import pytest
+from flask_restx import marshal
+from flask_restx.representations import output_json
+from app.controllers.note.note_api_model import note_response_list_model, note_page_response_model
+from app.models import Note
+from app.utils.fastMarshal import compile_model
+
+
+@pytest.fixture
+def notes(project):
+    # 覆盖空值、非 ASCII、特殊字符和布尔值的各种组合
+    rows = [
+        Note(project_id=project.id, type='markdown', title='周报 "第一周"', content='正文', folder=None, status=None),
+        Note(project_id=project.id, type='markdown', title='a\\b\n<script>', content='x', folder='工作/计划', status='draft',
+             is_archived=True, is_share=True, share_password='123'),
+        Note(project_id=project.id, type='todo', title='😀 emoji', content='', folder='', is_recycle=False),
+    ]
+    for note in rows:
+        note.addNote()
+    return rows
+
+
+# restx marshal_with 的响应内容：marshal 后交给 restx 的 JSON 输出
+def _marshal_with_body(payload, model):
+    return output_json(marshal(payload, model), 200).get_data()
+
+
+def test_list_response_matches_marshal_with(client, auth_headers, project, notes):
+    resp = client.get('/api/note/projectNote', query_string={'projectId': project.id}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert len(resp.get_json()['data']) == 3
+    payload = {'code': 200, 'message': '查询成功', 'data': Note.getNotesByProjectIdExcludeRecycled(project.id, None, False)}
+    assert resp.get_data() == _marshal_with_body(payload, note_response_list_model)
+
+
+def test_page_response_matches_marshal_with(client, auth_headers, project, notes):
+    headers = dict(auth_headers, **{'X-Project-Id': str(project.id)})
+    resp = client.post('/api/note/projectNote', json={'page_no': 1, 'page_size': 2}, headers=headers)
+    assert resp.status_code == 200
+    page_data = Note.getNotesByProjectIdWithPagination(project.id, None, 1, 2)
+    page_data.update(page_no=1, page_size=2)
+    payload = {'code': 200, 'message': '查询成功', 'page_data': page_data}
+    assert resp.get_data() == _marshal_with_body(payload, note_page_response_model)
+
+
+def test_cursor_page_response_matches_marshal_with(client, auth_headers, project, notes):
+    headers = dict(auth_headers, **{'X-Project-Id': str(project.id)})
+    resp = client.post('/api/note/projectNote', json={'cursor': '', 'page_size': 2}, headers=headers)
+    assert resp.status_code == 200
+    page_data = Note.getNotesByProjectIdWithCursor(project.id, None, '', 2)
+    page_data['page_size'] = 2
+    payload = {'code': 200, 'message': '查询成功', 'page_data': page_data}
+    assert resp.get_data() == _marshal_with_body(payload, note_page_response_model)
+
+
+@pytest.mark.parametrize('payload', [
+    {'code': 500, 'message': '失败'},
+    {'code': 200, 'message': None, 'data': None},
+    {'code': 200, 'message': '查询成功', 'data': []},
+])
+def test_error_and_empty_payloads_match_marshal(app, payload):
+    assert compile_model(note_response_list_model)(payload) == marshal(payload, note_response_list_model)
+
+
+def test_empty_page_payload_matches_marshal(app):
+    payload = {'code': 200, 'message': '查询成功', 'page_data': None}
+    assert compile_model(note_page_response_model)(payload) == marshal(payload, note_page_response_model)
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from hypothesis import given, settings, HealthCheck, strategies as st
+from app.extension import db
+from app.models import Note
+from app.models.filters import parse_datetime
+
+BASE_DAY = datetime(2025, 6, 1)
+TITLES = st.text(alphabet='abc', min_size=1, max_size=3)
+TYPES = st.sampled_from(['markdown', 'text'])
+STATUSES = st.sampled_from(['active', 'draft', 'done'])
+# 与 datetime.now() 的偏移（小时），避开 0 和最近 30 天的边界，查询时刻的微小差异不影响结果
+RECENT_OFFSETS = st.integers(min_value=-1000, max_value=100).filter(lambda hours: hours not in (0, -720))
+
+note_rows = st.lists(st.fixed_dictionaries({
+    'title': TITLES,
+    'type': TYPES,
+    'status': STATUSES,
+    'is_archived': st.booleans(),
+    'is_recycle': st.booleans(),
+    'created_at': st.integers(min_value=0, max_value=10 * 24 * 60).map(lambda minutes: BASE_DAY + timedelta(minutes=minutes)),
+    'updated_offset': RECENT_OFFSETS,
+}), max_size=15)
+
+
+# 时间条件：只有日期、秒级时间或 ISO 8601（T 分隔），返回 (请求中的值, 期望的边界)
+def _time_bound(end_of_day):
+    def build(args):
+        day, minutes, style = args
+        moment = BASE_DAY + timedelta(days=day, minutes=minutes)
+        if style == 'date':
+            bound = moment.replace(hour=0, minute=0)
+            if end_of_day:
+                bound = bound.replace(hour=23, minute=59, second=59, microsecond=999999)
+            return moment.strftime('%Y-%m-%d'), bound
+        if style == 'iso':
+            return moment.isoformat(), moment
+        return moment.strftime('%Y-%m-%d %H:%M:%S'), moment
+    return st.tuples(st.integers(0, 10), st.integers(0, 24 * 60 - 1), st.sampled_from(['date', 'iso', 'legacy'])).map(build)
+
+
+conditions = st.fixed_dictionaries({}, optional={
+    'title': TITLES,
+    'type': TYPES,
+    'status': st.lists(STATUSES, min_size=1, max_size=3),
+    'is_archived': st.booleans(),
+    'is_recycle': st.booleans(),
+    'created_start_time': _time_bound(end_of_day=False),
+    'created_end_time': _time_bound(end_of_day=True),
+    'recent': st.booleans(),
+})
+
+sort_options = st.sampled_from([None, 'updated_at desc', 'created_at asc', 'title asc, updated_at desc', 'title desc, created_at asc'])
+
+
+# 内存中的参考实现：按条件过滤、按排序字段排序，最后按 id 排序（方向与最后一个排序字段一致）
+def _reference(rows, condition, sort_by, now):
+    def matches(row):
+        for key, value in condition.items():
+            if key == 'title' and value not in row['title']:
+                return False
+            if key == 'status' and row['status'] not in value:
+                return False
+            if key in ('type', 'is_archived', 'is_recycle') and row[key] != value:
+                return False
+            if key == 'created_start_time' and row['created_at'] < value[1]:
+                return False
+            if key == 'created_end_time' and row['created_at'] > value[1]:
+                return False
+            if key == 'recent' and value and not now - timedelta(days=30) <= row['updated_at'] <= now:
+                return False
+        return True
+
+    order = [(item.split()[0], item.split()[1] == 'desc') for item in (sort_by or 'updated_at desc').split(',')]
+    result = [row for row in rows if matches(row)]
+    result.sort(key=lambda row: row['id'], reverse=order[-1][1])
+    for key, desc in reversed(order):
+        result.sort(key=lambda row: row[key], reverse=desc)
+    return [row['id'] for row in result]
+
+
+@settings(max_examples=60, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(rows=note_rows, condition=conditions, sort_by=sort_options, page_size=st.integers(1, 4))
+def test_note_pagination_matches_reference(project, rows, condition, sort_by, page_size):
+    Note.query.delete()
+    now = datetime.now().replace(microsecond=0)
+    for row in rows:
+        row['updated_at'] = now + timedelta(hours=row.pop('updated_offset'))
+        note = Note(project_id=project.id, **row)
+        db.session.add(note)
+        db.session.flush()
+        row['id'] = note.id
+    db.session.commit()
+
+    query_condition = {key: value[0] if key.endswith('_time') else value for key, value in condition.items()}
+    expected = _reference(rows, condition, sort_by, now)
+    actual = []
+    page_no = 1
+    while True:
+        page = Note.getNotesByProjectIdWithPagination(project.id, query_condition, page_no, page_size, sort_by)
+        assert page['total'] == len(expected)
+        if not page['data']:
+            break
+        actual.extend(note.id for note in page['data'])
+        page_no += 1
+    assert actual == expected
+
+
+def test_parse_datetime_iso_formats():
+    assert parse_datetime('2025-12-17T08:30:00') == datetime(2025, 12, 17, 8, 30)
+    assert parse_datetime('2025-12-17T08:30:00.250') == datetime(2025, 12, 17, 8, 30, 0, 250000)
+    expected = datetime(2025, 12, 17, 8, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert parse_datetime('2025-12-17T08:30:00Z') == expected
+    assert parse_datetime('2025-12-17T16:30:00+08:00') == expected
+
+
+def test_parse_datetime_legacy_formats_and_dates():
+    assert parse_datetime('2025-12-17 08:30:00') == datetime(2025, 12, 17, 8, 30)
+    assert parse_datetime('2025-12-17 08:30') == datetime(2025, 12, 17, 8, 30)
+    assert parse_datetime('2025-12-17') == datetime(2025, 12, 17)
+    assert parse_datetime('2025-12-17', end_of_day=True) == datetime(2025, 12, 17, 23, 59, 59, 999999)
+    assert parse_datetime('2025-12-17 08:30:00', end_of_day=True) == datetime(2025, 12, 17, 8, 30)
+
+
+@pytest.mark.parametrize('value', ['', 'yesterday', '2025-13-01', '17/12/2025'])
+def test_parse_datetime_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_datetime(value)
+
+
+def test_recent_excludes_future_and_includes_cutoff(project):
+    now = datetime.now()
+    offsets = {'inside': timedelta(days=-29), 'old': timedelta(days=-31), 'future': timedelta(days=1)}
+    for title, offset in offsets.items():
+        Note(project_id=project.id, type='markdown', title=title, updated_at=now + offset).addNote()
+    notes = Note.getNotesByProjectIdExcludeRecycled(project.id, None, True)
+    assert [note.title for note in notes] == ['inside']
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+import pytest
+from app.extension import redis_client
+from app.utils import JobQueue
+
+
+@pytest.fixture
+def queue(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_BACKEND', 'redis')
+    queue = JobQueue(redis_client)
+    queue.init_app(app)
+    return queue
+
+
+def _store_job(job_id, status, worker, host=None):
+    job = {'id': job_id, 'kind': 'export', 'owner_id': '1', 'status': status, 'progress': 0, 'total': 0,
+           'result': None, 'error': None, 'artifact': None, 'worker': worker, 'host': host,
+           'created_at': '2025-01-01 00:00:00', 'updated_at': '2025-01-01 00:00:00'}
+    redis_client.set(JobQueue.KEY_PREFIX + job_id, json.dumps(job))
+    redis_client.sadd(JobQueue.ACTIVE_KEY, job_id)
+
+
+def _wait_for_status(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] not in ('pending', 'running'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('任务未完成')
+
+
+def test_submit_records_worker_and_clears_active_set(queue):
+    job_id = queue.submit('export', 1, lambda job: {'ok': True})
+    job = _wait_for_status(queue, job_id)
+    assert job['status'] == 'succeeded'
+    assert job['result'] == {'ok': True}
+    assert job['worker'] == queue.worker_id
+    assert job['host'] == queue.host
+    assert not redis_client.sismember(JobQueue.ACTIVE_KEY, job_id)
+
+
+def test_jobs_of_dead_worker_fail_on_startup(queue):
+    _store_job('orphan', 'running', 'other-host:123:dead')
+    _store_job('waiting', 'pending', 'other-host:123:dead')
+    queue.submit('export', 1, lambda job: None)
+    for job_id in ('orphan', 'waiting'):
+        job = json.loads(redis_client.get(JobQueue.KEY_PREFIX + job_id))
+        assert job['status'] == 'failed'
+        assert '进程已退出' in job['error']
+        assert not redis_client.sismember(JobQueue.ACTIVE_KEY, job_id)
+
+
+def test_jobs_of_live_worker_are_kept(queue):
+    redis_client.set(JobQueue.WORKER_KEY_PREFIX + 'other-host:456:alive', '', ex=30)
+    _store_job('busy', 'running', 'other-host:456:alive')
+    assert queue.get('busy')['status'] == 'running'
+    assert redis_client.sismember(JobQueue.ACTIVE_KEY, 'busy')
+
+
+def test_worker_dying_after_startup_is_detected_on_query(queue):
+    redis_client.set(JobQueue.WORKER_KEY_PREFIX + 'other-host:789:gone', '', ex=30)
+    _store_job('later', 'running', 'other-host:789:gone')
+    assert queue.get('later')['status'] == 'running'
+    redis_client.delete(JobQueue.WORKER_KEY_PREFIX + 'other-host:789:gone')
+    assert queue.get('later')['status'] == 'failed'
+
+
+def test_artifact_from_other_host_is_reported(client, auth_headers, user, monkeypatch, queue):
+    monkeypatch.setattr('app.controllers.note.note_job_manager.job_queue', queue)
+    redis_client.set(JobQueue.WORKER_KEY_PREFIX + 'other-host:1:x', '', ex=30)
+    _store_job('remote', 'succeeded', 'other-host:1:x', host='other-host')
+    job = json.loads(redis_client.get(JobQueue.KEY_PREFIX + 'remote'))
+    job.update(owner_id=str(user.id), artifact='notes.zip')
+    redis_client.set(JobQueue.KEY_PREFIX + 'remote', json.dumps(job))
+    response = client.get('/api/note/jobs/remote/artifact', headers=auth_headers)
+    assert response.status_code == 409
+
+
+@pytest.fixture
+def memory_queue(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_BACKEND', 'memory')
+    queue = JobQueue(redis_client)
+    queue.init_app(app)
+    return queue
+
+
+def test_memory_backend_evicts_finished_jobs_after_ttl(memory_queue):
+    finished = memory_queue.submit('export', 1, lambda job: None)
+    _wait_for_status(memory_queue, finished)
+    release = threading.Event()
+    running = memory_queue.submit('export', 1, lambda job: release.wait(5))
+    memory_queue.ttl = 0
+    try:
+        latest = memory_queue.submit('export', 1, lambda job: None)
+        # 已完成且超过保留时间的任务被清除，执行中的任务保留
+        assert memory_queue.get(finished) is None
+        assert memory_queue.get(running)['status'] in ('pending', 'running')
+    finally:
+        release.set()
+    assert _wait_for_status(memory_queue, latest)['status'] == 'succeeded'
+
+
+def test_memory_backend_only_allowed_in_tests(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_BACKEND', 'memory')
+    monkeypatch.setitem(app.config, 'TESTING', False)
+    with pytest.raises(ValueError):
+        JobQueue(redis_client).init_app(app)
+
+
+def test_artifact_directory_created_only_when_job_writes(memory_queue):
+    path = memory_queue.artifact_path('missing', 'notes.zip')
+    assert not os.path.exists(os.path.dirname(path))
+
+    def write_artifact(job):
+        with open(job.artifact_path('notes.zip'), 'wb') as f:
+            f.write(b'zip')
+    job_id = memory_queue.submit('export', 1, write_artifact)
+    job = _wait_for_status(memory_queue, job_id)
+    assert job['status'] == 'succeeded' and job['artifact'] == 'notes.zip'
+    assert os.path.exists(memory_queue.artifact_path(job_id, 'notes.zip'))
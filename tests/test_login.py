@@ -0,0 +1,189 @@
+import threading
+import time
+import pytest
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.security import generate_password_hash
+from app.controllers.auth import login as login_module
+from app.extension import login_limiter
+from app.models import Note, User
+from app.utils import HashExecutor, HashBusyError
+
+PASSWORD = 'secret-password'
+
+
+@pytest.fixture
+def account(app):
+    user = User(username='alice', email='alice@example.com', salt='salt', password=generate_password_hash('salt' + PASSWORD))
+    user.addUser()
+    return user
+
+
+def _login(client, username='alice', password=PASSWORD, **kwargs):
+    return client.post('/api/auth/login', json={'username': username, 'password': password}, **kwargs)
+
+
+def test_login_succeeds_and_rejects_wrong_password(client, account):
+    assert _login(client).status_code == 200
+    assert _login(client, password='wrong').status_code == 400
+
+
+def test_login_is_throttled_per_user(client, account, monkeypatch):
+    monkeypatch.setattr(login_limiter, 'user_limit', 3)
+    assert [_login(client, password='wrong').status_code for _ in range(3)] == [400] * 3
+    response = _login(client)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+
+def test_login_is_throttled_per_ip(client, account, monkeypatch):
+    monkeypatch.setattr(login_limiter, 'ip_limit', 3)
+    assert [_login(client, username='user{}'.format(i)).status_code for i in range(3)] == [400] * 3
+    assert _login(client, username='someone-else').status_code == 429
+
+
+def test_unconfigured_proxy_does_not_throttle_everyone_by_proxy_address(client, account, monkeypatch):
+    # 经过代理但未配置 PROXY_FIX_X_FOR 时所有请求的 remote_addr 都是代理地址，不能按它限流
+    monkeypatch.setattr(login_limiter, 'ip_limit', 3)
+    for i in range(5):
+        headers = {'X-Forwarded-For': '203.0.113.{}'.format(i)}
+        assert _login(client, username='user{}'.format(i), headers=headers).status_code == 400
+
+
+def test_proxy_fix_throttles_per_real_client_ip(app, client, account, monkeypatch):
+    monkeypatch.setattr(login_limiter, 'ip_limit', 3)
+    monkeypatch.setitem(app.config, 'PROXY_FIX_X_FOR', 1)
+    monkeypatch.setattr(app, 'wsgi_app', ProxyFix(app.wsgi_app, x_for=1))
+    attacker = {'X-Forwarded-For': '203.0.113.9'}
+    for i in range(3):
+        assert _login(client, username='user{}'.format(i), headers=attacker).status_code == 400
+    assert _login(client, username='user9', headers=attacker).status_code == 429
+    # 同一代理后面的其他客户端不受影响
+    assert _login(client, headers={'X-Forwarded-For': '198.51.100.7'}).status_code == 200
+
+
+def _hash_executor(app, monkeypatch, workers, queue_size):
+    monkeypatch.setitem(app.config, 'HASH_WORKERS', workers)
+    monkeypatch.setitem(app.config, 'HASH_QUEUE_SIZE', queue_size)
+    executor = HashExecutor()
+    executor.init_app(app)
+    return executor
+
+
+def test_hash_executor_bounds_concurrency_and_rejects_overflow(app, monkeypatch):
+    executor = _hash_executor(app, monkeypatch, workers=2, queue_size=1)
+    release = threading.Event()
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def blocking_hash():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        release.wait(5)
+        with lock:
+            running.pop()
+        return True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(executor.run(blocking_hash))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while len(peak) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # 2 个执行中 + 1 个排队，第 4 个立即被拒绝
+    with pytest.raises(HashBusyError):
+        executor.run(blocking_hash)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [True, True, True]
+    assert max(peak) == 2
+
+
+def _run_load(app, note_id, headers, login_threads, logins_per_thread, duration):
+    """并发登录的同时持续读取笔记，返回 (读取耗时列表, 登录状态码列表, 读取状态码集合)"""
+    stop = threading.Event()
+    read_latencies = []
+    read_statuses = set()
+    login_statuses = []
+    lock = threading.Lock()
+
+    def reader():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            status = client.get('/api/note/singleNote/{}'.format(note_id), headers=headers).status_code
+            with lock:
+                read_latencies.append(time.perf_counter() - start)
+                read_statuses.add(status)
+
+    def login_worker(index):
+        client = app.test_client()
+        for i in range(logins_per_thread):
+            status = _login(client, headers={'X-Forwarded-For': '203.0.113.{}'.format(index)}).status_code
+            with lock:
+                login_statuses.append(status)
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    workers = [threading.Thread(target=login_worker, args=(i,)) for i in range(login_threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+    time.sleep(max(0, duration))
+    stop.set()
+    reader_thread.join(10)
+    return read_latencies, login_statuses, read_statuses
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))] * 1000 if values else 0
+
+
+def test_benchmark_logins_mixed_with_note_reads(app, account, project, auth_headers, monkeypatch):
+    monkeypatch.setattr(login_limiter, 'enabled', False)
+    note = Note(project_id=project.id, type='markdown', title='读取', content='内容')
+    note.addNote()
+    peak = {'running': 0, 'max': 0}
+    lock = threading.Lock()
+    check_password_hash = login_module.check_password_hash
+
+    def counted_check_password_hash(*args):
+        with lock:
+            peak['running'] += 1
+            peak['max'] = max(peak['max'], peak['running'])
+        try:
+            return check_password_hash(*args)
+        finally:
+            with lock:
+                peak['running'] -= 1
+
+    monkeypatch.setattr(login_module, 'check_password_hash', counted_check_password_hash)
+    idle, _, _ = _run_load(app, note.id, auth_headers, 0, 0, 0.5)
+
+    # 有界线程池：1 个哈希线程，最多排队 2 个，其余登录请求立即返回 503
+    monkeypatch.setattr(login_module, 'hash_executor', _hash_executor(app, monkeypatch, workers=1, queue_size=2))
+    bounded, bounded_logins, bounded_reads = _run_load(app, note.id, auth_headers, 8, 3, 0)
+    bounded_peak = peak['max']
+
+    # 对照：不经过线程池，每个请求线程直接计算哈希
+    peak['max'] = 0
+    unbounded_executor = type('Inline', (), {'run': staticmethod(lambda func, *args: func(*args))})()
+    monkeypatch.setattr(login_module, 'hash_executor', unbounded_executor)
+    unbounded, unbounded_logins, unbounded_reads = _run_load(app, note.id, auth_headers, 8, 3, 0)
+
+    print('\n笔记读取耗时 p50 / p95（ms）：空闲 {:.1f} / {:.1f}，有界线程池 {:.1f} / {:.1f}，直接计算 {:.1f} / {:.1f}'.format(
+        _percentile(idle, 50), _percentile(idle, 95), _percentile(bounded, 50), _percentile(bounded, 95),
+        _percentile(unbounded, 50), _percentile(unbounded, 95)))
+    print('登录结果：有界线程池 200×{} 503×{}（同时哈希最多 {} 个），直接计算 200×{}（同时哈希最多 {} 个）'.format(
+        bounded_logins.count(200), bounded_logins.count(503), bounded_peak,
+        unbounded_logins.count(200), peak['max']))
+    assert bounded_reads == unbounded_reads == {200}
+    assert bounded_peak == 1
+    assert set(bounded_logins) <= {200, 503}
+    assert 503 in bounded_logins
+    assert bounded and unbounded
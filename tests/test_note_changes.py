@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+import pytest
+from app.controllers.note import note_changes_manager
+from app.extension import db, note_file_writer
+from app.models import Note, Project, SyncTombstone
+
+# 初始数据的时间早于第一次同步的时间上界，之后通过接口产生的变更都晚于该上界
+FIRST_SYNC = datetime.now().replace(microsecond=0) - timedelta(days=1)
+INITIAL = FIRST_SYNC - timedelta(minutes=10)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 控制同步上界使用的当前时间
+    class Clock(datetime):
+        current = None
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.current
+    monkeypatch.setattr(note_changes_manager, 'datetime', Clock)
+    return Clock
+
+
+@pytest.fixture(autouse=True)
+def no_mirror(monkeypatch):
+    monkeypatch.setattr(note_file_writer, 'write', lambda path, content: None)
+    monkeypatch.setattr(note_file_writer, 'delete', lambda path: None)
+
+
+def _add_notes(project, count, updated_at=INITIAL):
+    notes = [Note(project_id=project.id, type='note', title='笔记{}'.format(i), content='正文') for i in range(count)]
+    db.session.add_all(notes)
+    db.session.commit()
+    ids = [note.id for note in notes]
+    db.session.execute(db.update(Note).where(Note.id.in_(ids)).values(updated_at=updated_at))
+    db.session.commit()
+    return ids
+
+
+def _changes(client, headers, since=None, limit=None):
+    params = {key: value for key, value in (('since', since), ('limit', limit)) if value is not None}
+    resp = client.get('/api/note/changes', query_string=params, headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+    return resp.get_json()['data']
+
+
+def _sync_all(client, headers, since=None, limit=None):
+    # 按 next_since 连续请求直到 has_more 为假，返回所有批次和最后的令牌
+    batches = []
+    while True:
+        data = _changes(client, headers, since, limit)
+        batches.append(data)
+        since = data['next_since']
+        if not data['has_more']:
+            return batches, since
+
+
+def test_token_returns_only_later_changes(client, auth_headers, project, clock):
+    a, b, c = _add_notes(project, 3)
+    clock.current = FIRST_SYNC
+    first = _changes(client, auth_headers)
+    assert [note['id'] for note in first['notes']] == [a, b, c]
+    assert not first['has_more']
+
+    # 第一次同步之后：新增 d、修改 a、删除 b（移入回收站），c 不变
+    headers = dict(auth_headers, **{'X-Project-Id': str(project.id)})
+    d = client.post('/api/note/singleNote', json={'type': 'note', 'title': '新笔记', 'content': '正文'}, headers=headers).get_json()['data']['id']
+    client.put('/api/note/singleNote/{}'.format(a), json={'content': '新内容'}, headers=auth_headers)
+    client.delete('/api/note/singleNote/{}'.format(b), headers=auth_headers)
+
+    clock.current = datetime.now() + timedelta(hours=1)
+    second = _changes(client, auth_headers, first['next_since'])
+    assert [(note['id'], note['is_recycle']) for note in second['notes']] == [(d, False), (a, False), (b, True)]
+    assert [item['id'] for item in second['projects']] == [project.id]
+    assert second['deleted'] == []
+
+    third = _changes(client, auth_headers, second['next_since'])
+    assert (third['notes'], third['projects'], third['deleted'], third['has_more']) == ([], [], [], False)
+
+
+def test_deleted_projects_come_back_as_tombstones(client, auth_headers, user, project, clock):
+    removed = Project(account_id=user.id, type='note', name='待删除项目')
+    removed.addProject()
+    removed_id = removed.id
+    clock.current = FIRST_SYNC
+    token = _changes(client, auth_headers)['next_since']
+
+    assert client.delete('/api/project/singleProject/{}'.format(removed_id), headers=auth_headers).status_code == 200
+    clock.current = datetime.now() + timedelta(hours=1)
+    data = _changes(client, auth_headers, token)
+    assert [(item['type'], item['id']) for item in data['deleted']] == [('project', removed_id)]
+    assert removed_id not in [item['id'] for item in data['projects']]
+    # 删除记录只下发一次
+    assert _changes(client, auth_headers, data['next_since'])['deleted'] == []
+
+
+def test_batches_do_not_skip_rows_sharing_updated_at(client, auth_headers, user, project, clock):
+    ids = _add_notes(project, 7)
+    deleted_at = INITIAL
+    db.session.add_all(SyncTombstone(account_id=user.id, entity_type='project', entity_id=1000 + i, deleted_at=deleted_at) for i in range(5))
+    db.session.commit()
+    clock.current = FIRST_SYNC
+    batches, token = _sync_all(client, auth_headers, limit=3)
+    assert [batch['has_more'] for batch in batches] == [True, True, False]
+    assert [note['id'] for batch in batches for note in batch['notes']] == ids
+    assert [item['id'] for batch in batches for item in batch['deleted']] == [1000 + i for i in range(5)]
+
+    # 上一轮取完后，之后同一时间写入的行仍在新的上界之后，不会因共享时间而遗漏
+    later = FIRST_SYNC + timedelta(minutes=5)
+    more = _add_notes(project, 4, updated_at=later)
+    clock.current = FIRST_SYNC + timedelta(hours=1)
+    batches, _ = _sync_all(client, auth_headers, token, limit=2)
+    assert [note['id'] for batch in batches for note in batch['notes']] == more
@@ -0,0 +1,96 @@
+import pytest
+from app.extension import db, content_codec
+from app.models import Note, NoteContent, NoteSearchText
+
+BODY = '# 周报\n\n' + '本周完成了全文检索的压缩支持。' * 100 + '\n关键字：蓝鲸计划\n'
+
+
+@pytest.fixture
+def compression(app, monkeypatch):
+    monkeypatch.setattr(content_codec, 'codec', 'zlib')
+    monkeypatch.setattr(content_codec, 'min_size', 64)
+    return content_codec
+
+
+def _add_note(project, content, title='周报'):
+    note = Note(project_id=project.id, type='markdown', title=title, content=content)
+    note.addNote()
+    return note
+
+
+def test_compressed_content_round_trip(project, compression):
+    note = _add_note(project, BODY)
+    db.session.expire_all()
+    body = db.session.get(NoteContent, note.id)
+    assert body.codec == 'zlib'
+    assert body.text == ''
+    assert len(body.compressed) < len(BODY.encode('utf-8'))
+    assert Note.getNoteById(note.id).content == BODY
+
+
+def test_search_finds_compressed_note_by_body_word(user, project, compression):
+    note = _add_note(project, BODY)
+    _add_note(project, '无关的内容', title='其他')
+    result = Note.searchNotes(user.id, '蓝鲸计划')
+    assert result['total'] == 1
+    assert result['data'][0][0].id == note.id
+
+
+def test_search_text_follows_content_changes(user, project, compression):
+    note = _add_note(project, BODY)
+    note.content = BODY.replace('蓝鲸计划', '白鹭计划')
+    note.updateNote()
+    assert Note.searchNotes(user.id, '蓝鲸计划')['total'] == 0
+    assert Note.searchNotes(user.id, '白鹭计划')['total'] == 1
+    # 改为短内容后按原文保存，检索原文随之删除
+    note.content = '短内容'
+    note.updateNote()
+    assert db.session.get(NoteSearchText, note.id) is None
+    assert Note.searchNotes(user.id, '短内容')['total'] == 1
+
+
+def test_rewrite_contents_keeps_search_text_in_sync(user, project, compression):
+    note = _add_note(project, BODY)
+    NoteContent.rewriteContents('plain')
+    assert db.session.get(NoteSearchText, note.id) is None
+    assert Note.searchNotes(user.id, '蓝鲸计划')['total'] == 1
+    NoteContent.rewriteContents('zlib')
+    assert db.session.get(NoteSearchText, note.id).text == BODY
+    assert Note.searchNotes(user.id, '蓝鲸计划')['total'] == 1
+
+
+def test_deleting_note_removes_search_text(project, compression):
+    note = _add_note(project, BODY)
+    note_id = note.id
+    note.deleteNote()
+    assert db.session.get(NoteSearchText, note_id) is None
+
+
+def _legacy_content(note_id):
+    return db.session.execute(db.text('SELECT content FROM note WHERE id = :id'), {'id': note_id}).scalar()
+
+
+def test_dual_write_keeps_legacy_column_current(app, project, monkeypatch):
+    # 模拟过渡期：note 表仍保留 content 列
+    db.session.execute(db.text('ALTER TABLE note ADD COLUMN content TEXT'))
+    db.session.commit()
+    note = _add_note(project, '未开启双写')
+    assert _legacy_content(note.id) is None
+
+    monkeypatch.setitem(app.config, 'NOTE_CONTENT_DUAL_WRITE', True)
+    note = _add_note(project, '第一版')
+    assert _legacy_content(note.id) == '第一版'
+    note.content = '第二版'
+    note.updateNote()
+    assert _legacy_content(note.id) == '第二版'
+    # 只修改元数据时内容保持不变
+    note.title = '新标题'
+    note.updateNote()
+    assert _legacy_content(note.id) == '第二版'
+
+
+def test_dual_write_cannot_be_combined_with_compression(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'NOTE_CONTENT_CODEC', 'zlib')
+    monkeypatch.setitem(app.config, 'NOTE_CONTENT_DUAL_WRITE', True)
+    with pytest.raises(ValueError):
+        content_codec.init_app(app)
@@ -0,0 +1,77 @@
+import io
+import os
+import tracemalloc
+import zipfile
+import psutil
+from sqlalchemy import event
+from app.extension import db
+from app.models import Note, NoteContent
+
+NOTE_COUNT = 5000
+CONTENT_SIZE = 4096  # 每篇笔记的内容长度，全部内容约 20MB
+BATCH_SIZE = 100  # 与 Note.iterNotesByIds 默认的批次大小一致
+
+
+def _create_notes(project_id, count):
+    note_ids = []
+    for start in range(0, count, 500):
+        notes = [Note(project_id=project_id, type='markdown', title='笔记{}'.format(i)) for i in range(start, min(start + 500, count))]
+        db.session.add_all(notes)
+        db.session.flush()
+        # 随机字节的十六进制文本，压缩后约为原来的一半，ZIP 整体缓存在内存中时 RSS 会明显增长
+        db.session.add_all(NoteContent(note_id=note.id, text=os.urandom(CONTENT_SIZE // 2).hex()) for note in notes)
+        note_ids.extend(note.id for note in notes)
+    db.session.commit()
+    db.session.remove()
+    return note_ids
+
+
+def _export(client, headers, note_ids):
+    return client.post('/api/note/export', json={'note_ids': ','.join(map(str, note_ids))}, headers=headers, buffered=False)
+
+
+def test_export_streams_in_batched_queries(client, project, auth_headers):
+    note_ids = _create_notes(project.id, NOTE_COUNT)
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        response = _export(client, auth_headers, note_ids)
+        assert response.status_code == 200
+        body = io.BytesIO()
+        for chunk in response.response:
+            body.write(chunk)
+        response.close()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    # 归属检查一次 IN 查询，读取笔记按批次查询，与笔记数量成批次关系而不是 2N
+    assert len(statements) <= 1 + NOTE_COUNT // BATCH_SIZE + 1
+    with zipfile.ZipFile(body) as zipf:
+        names = zipf.namelist()
+        assert len(names) == NOTE_COUNT
+        assert len(zipf.read(names[-1])) == CONTENT_SIZE
+
+
+def test_export_memory_stays_flat(client, project, auth_headers):
+    note_ids = _create_notes(project.id, NOTE_COUNT)
+    total_content = NOTE_COUNT * CONTENT_SIZE
+    process = psutil.Process()
+    response = _export(client, auth_headers, note_ids)
+    assert response.status_code == 200
+    rss_before = process.memory_info().rss
+    peak_rss = rss_before
+    tracemalloc.start()
+    try:
+        size = 0
+        for chunk in response.response:
+            size += len(chunk)
+            peak_rss = max(peak_rss, process.memory_info().rss)
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        response.close()
+    assert size > total_content // 2
+    # 整个 ZIP 或所有笔记同时留在内存中时，增长至少是全部内容的大小；
+    # 流式导出的峰值只有一批笔记、IN 参数列表和 ZIP 中央目录（每个文件几百字节），与内容大小无关
+    assert peak_traced < total_content // 2
+    assert peak_rss - rss_before < total_content // 2
@@ -0,0 +1,135 @@
+import io
+import zipfile
+import pytest
+from sqlalchemy import event
+from app.extension import db, note_file_writer
+from app.models import Note
+from app.utils import hash_content
+
+
+@pytest.fixture
+def mirror(monkeypatch):
+    # 记录写回文件系统的请求，不写入真实文件
+    writes = []
+    monkeypatch.setattr(note_file_writer, 'write', lambda path, content: writes.append((path, content)))
+    monkeypatch.setattr(note_file_writer, 'delete', lambda path: writes.append((path, None)))
+    return writes
+
+
+def _add_note(project, title, content):
+    note = Note(project_id=project.id, type='note', title=title, content=content)
+    note.addNote()
+    return note
+
+
+def _zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def _import(client, project, headers, files, mode):
+    headers = dict(headers, **{'X-Project-Id': str(project.id)})
+    return client.post('/api/note/import', query_string={'mode': mode}, headers=headers,
+                       data={'file': (_zip(files), 'notes.zip')}, content_type='multipart/form-data')
+
+
+def _notes(project):
+    db.session.expire_all()
+    return {(note.title, note.content) for note in Note.query.filter_by(project_id=project.id)}
+
+
+def test_skip_mode_skips_identical_notes(client, project, auth_headers, mirror):
+    existing = _add_note(project, '周报', '第一版')
+    resp = _import(client, project, auth_headers, [('周报.md', '第一版'), ('周报 2.md', '第一版'), ('dir/周报.md', '第二版')], 'skip')
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert body['skipped'] == [{'id': existing.id, 'title': '周报'}]
+    assert [item['status'] for item in body['data']] == ['created', 'created']
+    assert _notes(project) == {('周报', '第一版'), ('周报 2', '第一版'), ('周报', '第二版')}
+    assert mirror == []
+
+
+def test_overwrite_mode_updates_content_hash_and_mirror(client, project, auth_headers, mirror):
+    existing = _add_note(project, '周报', '第一版')
+    unchanged = _add_note(project, '月报', '不变')
+    resp = _import(client, project, auth_headers, [('周报.md', '第二版'), ('月报.md', '不变'), ('年报.md', '新建')], 'overwrite')
+    body = resp.get_json()
+    assert {(item['title'], item['status']) for item in body['data']} == {('周报', 'updated'), ('年报', 'created')}
+    assert body['skipped'] == [{'id': unchanged.id, 'title': '月报'}]
+    assert _notes(project) == {('周报', '第二版'), ('月报', '不变'), ('年报', '新建')}
+    note = db.session.get(Note, existing.id)
+    assert note.content_hash == hash_content('第二版')
+    # 被覆盖的笔记在提交后写回文件，新建的笔记与原来一样不写回
+    assert [(path.endswith('周报.md'), content) for path, content in mirror] == [(True, '第二版')]
+
+
+def test_overwrite_mode_applies_repeated_titles_in_order(client, project, auth_headers, mirror):
+    _add_note(project, '周报', '第一版')
+    _import(client, project, auth_headers, [('a/周报.md', '第二版'), ('b/周报.md', '第三版'), ('新建.md', '1'), ('c/新建.md', '2')], 'overwrite')
+    assert _notes(project) == {('周报', '第三版'), ('新建', '2')}
+
+
+def test_duplicate_mode_always_creates(client, project, auth_headers, mirror):
+    _add_note(project, '周报', '第一版')
+    resp = _import(client, project, auth_headers, [('周报.md', '第一版'), ('a/周报.md', '第一版')], 'duplicate')
+    assert [item['status'] for item in resp.get_json()['data']] == ['created', 'created']
+    assert len(Note.query.filter_by(project_id=project.id, title='周报').all()) == 3
+
+
+def test_overwrite_loads_existing_notes_with_one_query_per_chunk(project, mirror):
+    project_id = project.id
+    titles = [_add_note(project, '笔记{}'.format(i), '旧内容').title for i in range(5)]
+    db.session.remove()
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        data = [{'project_id': project_id, 'type': 'note', 'title': title, 'content': '新内容'} for title in titles]
+        result = Note.importNotes(project_id, data, 'overwrite', chunk_size=2)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert [item['status'] for item in result['imported']] == ['updated'] * 5
+    selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+    # 标题查询之后每批一次 IN 查询（连同内容），不再逐篇查询笔记和内容
+    assert len(selects) == 1 + 3
+    assert all(' IN (' in s and 'JOIN note_content' in s for s in selects[1:])
+    assert {note.content_hash for note in Note.query.all()} == {hash_content('新内容')}
+
+
+def test_put_with_same_content_is_a_no_op(client, project, auth_headers, mirror):
+    note = _add_note(project, '周报', '第一版')
+    updated_at = note.updated_at
+    resp = client.put('/api/note/singleNote/{}'.format(note.id), json={'content': '第一版'}, headers=auth_headers)
+    assert resp.get_json()['message'] == '笔记未修改'
+    db.session.expire_all()
+    assert db.session.get(Note, note.id).updated_at == updated_at
+    assert mirror == []
+
+
+def test_content_hash_follows_content(client, project, auth_headers, mirror):
+    note = _add_note(project, '周报', '第一版')
+    assert note.content_hash == hash_content('第一版')
+    resp = client.put('/api/note/singleNote/{}'.format(note.id), json={'content': '第二版'}, headers=auth_headers)
+    assert resp.get_json()['data']['content_hash'] == hash_content('第二版')
+    db.session.expire_all()
+    assert db.session.get(Note, note.id).content_hash == hash_content('第二版')
+    assert mirror[-1][1] == '第二版'
+
+
+def test_decode_failure_halfway_rolls_back_whole_import(app, client, project, auth_headers, mirror, monkeypatch):
+    # 批次较小，失败前已有多批笔记 flush 到数据库
+    monkeypatch.setitem(app.config, 'NOTE_IMPORT_CHUNK_SIZE', 2)
+    existing = _add_note(project, '周报', '第一版')
+    files = [('周报.md', '第二版')] + [('笔记{}.md'.format(i), '正文{}'.format(i)) for i in range(5)]
+    files.append(('损坏.md', b'\xff\xfe\x00'))
+    files += [('笔记{}.md'.format(i), '正文{}'.format(i)) for i in range(5, 8)]
+    resp = _import(client, project, auth_headers, files, 'overwrite')
+    assert resp.status_code == 500
+    assert '编码错误' in resp.get_json()['message']
+    assert _notes(project) == {('周报', '第一版')}
+    assert db.session.get(Note, existing.id).content_hash == hash_content('第一版')
+    assert mirror == []
@@ -0,0 +1,52 @@
+import re
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.extension import db
+from app.models import Note
+
+# 读取内容的语句：查询 note_content 表（note_content_hash 等列别名不算）
+CONTENT_PATTERN = re.compile(r'\bnote_content\b')
+
+
+@pytest.fixture
+def project_id(project):
+    # 更新时间早于增量同步的时间上界；清空会话，列表接口的查询都从数据库读取
+    project_id = project.id
+    updated_at = datetime.now() - timedelta(hours=1)
+    for i in range(5):
+        Note(project_id=project_id, type='note', title='笔记{}'.format(i), content='正文' * 1000, updated_at=updated_at).addNote()
+    db.session.remove()
+    return project_id
+
+
+@pytest.fixture
+def statements(app):
+    captured = []
+    listener = lambda conn, cursor, statement, *args: captured.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield captured
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+def _list_requests(client, headers, project_id):
+    project_headers = dict(headers, **{'X-Project-Id': str(project_id)})
+    yield client.get('/api/note/projectNote', query_string={'projectId': project_id}, headers=headers)
+    yield client.post('/api/note/projectNote', json={'page_no': 1, 'page_size': 3}, headers=project_headers)
+    yield client.post('/api/note/projectNote', json={'cursor': '', 'page_size': 3, 'with_total': True}, headers=project_headers)
+    yield client.get('/api/note/allNote', headers=headers)
+    yield client.post('/api/note/allNote', json={'page_no': 1, 'page_size': 3}, headers=headers)
+    yield client.post('/api/note/allNote', json={'cursor': '', 'page_size': 3}, headers=headers)
+    yield client.get('/api/note/changes', headers=headers)
+
+
+def test_list_queries_never_read_note_content(client, auth_headers, project_id, statements):
+    for resp in _list_requests(client, auth_headers, project_id):
+        assert resp.status_code == 200, resp.get_json()
+        body = resp.get_json()
+        data = body.get('data') or body['page_data']['data']
+        rows = data['notes'] if isinstance(data, dict) else data
+        assert rows and all('content' not in row for row in rows)
+    note_queries = [s for s in statements if re.search(r'\bFROM note\b', s)]
+    assert note_queries
+    assert not [s for s in statements if CONTENT_PATTERN.search(s)]
@@ -0,0 +1,65 @@
+import pytest
+from app.extension import db, note_file_writer
+from app.models import Note
+from app.utils import hash_content
+
+
+@pytest.fixture
+def note(project, monkeypatch):
+    monkeypatch.setattr(note_file_writer, 'write', lambda path, content: None)
+    note = Note(project_id=project.id, type='note', title='周报', content='今天天气不错')
+    note.addNote()
+    return note
+
+
+def _patch(client, headers, note, ops, base_hash=None):
+    return client.patch('/api/note/singleNote/{}'.format(note.id), headers=headers,
+                        json={'base_hash': base_hash or hash_content('今天天气不错'), 'ops': ops})
+
+
+def _content(note):
+    db.session.expire_all()
+    return db.session.get(Note, note.id).content
+
+
+def test_patch_applies_ops(client, auth_headers, note):
+    resp = _patch(client, auth_headers, note, [{'offset': 2, 'delete': 2, 'insert': '心情'}, {'offset': 6, 'insert': '！'}])
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert _content(note) == '今天心情不错！'
+    assert body['data']['content_hash'] == hash_content('今天心情不错！')
+
+
+def test_patch_with_stale_hash_returns_409(client, auth_headers, note):
+    assert _patch(client, auth_headers, note, [{'offset': 0, 'insert': '1'}]).status_code == 200
+    # 同一秒内基于旧版本的第二次修改也能识别（更新时间只精确到秒）
+    resp = _patch(client, auth_headers, note, [{'offset': 0, 'insert': '2'}])
+    assert resp.status_code == 409
+    assert resp.get_json()['data']['content_hash'] == hash_content('1今天天气不错')
+    assert _content(note) == '1今天天气不错'
+
+
+def test_patch_requires_base_hash(client, auth_headers, note):
+    resp = client.patch('/api/note/singleNote/{}'.format(note.id), headers=auth_headers,
+                        json={'base_updated_at': '2026-01-01 00:00:00', 'ops': [{'offset': 0, 'insert': '1'}]})
+    assert resp.status_code == 400
+    assert _content(note) == '今天天气不错'
+
+
+def test_patch_rejects_too_many_ops(app, client, auth_headers, note, monkeypatch):
+    monkeypatch.setitem(app.config, 'NOTE_PATCH_MAX_OPS', 2)
+    resp = _patch(client, auth_headers, note, [{'offset': i, 'insert': 'x'} for i in range(3)])
+    assert resp.status_code == 400
+    assert _content(note) == '今天天气不错'
+
+
+@pytest.mark.parametrize('ops', [
+    [{'offset': 7, 'insert': 'x'}],
+    [{'offset': 4, 'delete': 3}],
+    [{'offset': 2, 'delete': 2}, {'offset': 3, 'insert': 'x'}],
+    [{'offset': 1, 'delete': -1}],
+])
+def test_patch_rejects_invalid_ranges(client, auth_headers, note, ops):
+    resp = _patch(client, auth_headers, note, ops)
+    assert resp.status_code == 400
+    assert _content(note) == '今天天气不错'
@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy.dialects import mysql
+from app.models import Note, Project, User
+from app.utils import make_snippet
+
+
+def _add_note(project, title, content, **kwargs):
+    note = Note(project_id=project.id, type='note', title=title, content=content, **kwargs)
+    note.addNote()
+    return note
+
+
+def _search(client, headers, q, **params):
+    resp = client.get('/api/note/search', query_string=dict(params, q=q), headers=headers)
+    return resp.status_code, resp.get_json()
+
+
+def test_search_matches_title_and_content_with_highlight(client, auth_headers, project):
+    _add_note(project, '周报 <草稿>', '本周完成了检索接口')
+    _add_note(project, '会议记录', '讨论周报模板')
+    _add_note(project, '无关', '其他内容')
+    status, body = _search(client, auth_headers, '周报')
+    assert status == 200
+    items = {item['title']: item for item in body['page_data']['data']}
+    assert body['page_data']['total'] == 2
+    # 标题先转义 HTML 再高亮
+    assert items['周报 <草稿>']['title_highlight'] == '<mark>周报</mark> &lt;草稿&gt;'
+    assert items['会议记录']['snippet'] == '讨论<mark>周报</mark>模板'
+    assert 'content' not in items['会议记录']
+
+
+def test_search_requires_every_term(client, auth_headers, project):
+    _add_note(project, '周报', '检索接口')
+    _add_note(project, '周报', '导出接口')
+    status, body = _search(client, auth_headers, '周报 检索')
+    assert [item['snippet'] for item in body['page_data']['data']] == ['<mark>检索</mark>接口']
+
+
+def test_short_terms_filter_and_are_highlighted(client, auth_headers, project):
+    _add_note(project, '周报 A', '检索接口')
+    _add_note(project, '周报 B', '检索接口')
+    status, body = _search(client, auth_headers, '周报 A')
+    items = body['page_data']['data']
+    assert [item['title_highlight'] for item in items] == ['<mark>周报</mark> <mark>A</mark>']
+
+
+def test_search_excludes_recycled_and_other_users_notes(client, auth_headers, project):
+    _add_note(project, '周报', '正文', is_recycle=True)
+    other = User(username='other', email='other@example.com', password='', salt='')
+    other.addUser()
+    other_project = Project(account_id=other.id, type='note', name='别人的项目')
+    other_project.addProject()
+    _add_note(other_project, '周报', '正文')
+    status, body = _search(client, auth_headers, '周报')
+    assert body['page_data']['total'] == 0
+
+
+def test_search_filters_by_project_and_paginates(client, auth_headers, user, project):
+    second = Project(account_id=user.id, type='note', name='第二个项目')
+    second.addProject()
+    for i in range(3):
+        _add_note(project, '周报{}'.format(i), '正文')
+    _add_note(second, '周报', '正文')
+    status, body = _search(client, auth_headers, '周报', projectId=project.id, page_no=2, page_size=2)
+    page = body['page_data']
+    assert (page['total'], page['pages'], page['page_no'], len(page['data'])) == (3, 2, 2, 1)
+
+
+def test_empty_keyword_returns_400(client, auth_headers, project):
+    assert _search(client, auth_headers, ' "" ')[0] == 400
+
+
+def test_snippet_is_positioned_on_the_focus_term():
+    text = 'A' + '-' * 200 + '周报' + '-' * 200
+    snippet = make_snippet(text, ['A', '周报'], width=40, focus=['周报'])
+    assert snippet.startswith('...') and snippet.endswith('...')
+    assert '<mark>周报</mark>' in snippet
+
+
+def _compile(query):
+    return str(query.statement.compile(dialect=mysql.dialect()))
+
+
+def test_fulltext_query_also_filters_short_terms(app, user):
+    sql = _compile(Note.searchQuery(user.id, '周报 A', fulltext=True))
+    assert 'MATCH' in sql
+    # 短词不在全文索引中，用模糊匹配过滤
+    assert sql.count('LIKE') == 3
+
+
+def test_fulltext_query_without_short_terms_has_no_like(app, user):
+    sql = _compile(Note.searchQuery(user.id, '周报 检索', fulltext=True))
+    assert 'MATCH' in sql and 'LIKE' not in sql
+
+
+@pytest.mark.parametrize('keyword', ['A', 'A B'])
+def test_only_short_terms_fall_back_to_like(app, user, keyword):
+    sql = _compile(Note.searchQuery(user.id, keyword, fulltext=True))
+    assert 'MATCH' not in sql and sql.count('LIKE') == 3 * len(keyword.split())
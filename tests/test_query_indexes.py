@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import event
+from app.extension import db
+from app.models import Note, Project
+
+INDEXED_TABLES = ('note', 'project')
+
+
+def _capture_selects(func, *args, **kwargs):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        func(*args, **kwargs)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+# 返回 [(表名, 使用的索引或 None)]，note、project 表全表扫描时索引为 None
+def _explain(statement, parameters):
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == 'mysql':
+            rows = conn.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings().all()
+            return [(row['table'], row['key']) for row in rows if row['table'] in INDEXED_TABLES]
+        plans = []
+        for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters):
+            detail = row[-1]
+            words = detail.split()
+            if len(words) < 2 or words[0] not in ('SCAN', 'SEARCH') or words[1] not in INDEXED_TABLES:
+                continue
+            if 'INDEX' in words:
+                plans.append((words[1], words[words.index('INDEX') + 1]))
+            elif 'INTEGER PRIMARY KEY' in detail:
+                plans.append((words[1], 'PRIMARY'))
+            else:
+                plans.append((words[1], None))
+        return plans
+
+
+def _assert_indexed(func, *args, **kwargs):
+    statements = _capture_selects(func, *args, **kwargs)
+    assert statements
+    for statement, parameters in statements:
+        plans = _explain(statement, parameters)
+        assert plans, statement
+        for table, index in plans:
+            assert index is not None, '{} 全表扫描：{}'.format(table, statement)
+
+
+@pytest.mark.parametrize('is_recent', [False, True])
+def test_project_notes_exclude_recycled_uses_index(project, is_recent):
+    _assert_indexed(Note.getNotesByProjectIdExcludeRecycled, project.id, '标题', is_recent)
+    _assert_indexed(Note.getNotesStampByProjectIdExcludeRecycled, project.id, None, is_recent)
+
+
+@pytest.mark.parametrize('is_recent', [False, True])
+def test_user_notes_exclude_recycled_uses_index(user, project, is_recent):
+    _assert_indexed(Note.getNotesByUserIdExcludeRecycledWithPagination, user.id, is_recent, 1, 20)
+    _assert_indexed(Note.getNotesByUserIdExcludeRecycledWithCursor, user.id, is_recent, None, 20, True)
+
+
+def test_project_notes_pagination_uses_index(project):
+    _assert_indexed(Note.getNotesByProjectIdWithPagination, project.id, {'is_recycle': False}, 1, 20)
+    _assert_indexed(Note.getNotesByProjectIdWithCursor, project.id, {}, None, 20)
+
+
+@pytest.mark.parametrize('conditions', [
+    {},
+    {'is_archived': False, 'is_recycle': False},
+    {'is_favor': True},
+])
+def test_projects_by_account_pagination_uses_index(user, conditions):
+    _assert_indexed(Project.getProjectsByAccountIdWithPagination, user.id, conditions, 1, 20)
+    _assert_indexed(Project.getProjectsStampByAccountId, user.id, conditions)
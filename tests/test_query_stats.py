@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.extension import db
+
+
+def _info_sizes(conn):
+    return {key: len(value) for key, value in conn.info.items() if isinstance(value, (list, dict, set))}
+
+
+def test_failed_statements_do_not_leak_state(app):
+    # 语句出错时不触发 after_cursor_execute，统计状态不能在长期复用的连接上累积
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('SELECT 1')
+        before = _info_sizes(conn)
+        for _ in range(5):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql('SELECT * FROM missing_table')
+        assert conn.exec_driver_sql('SELECT 1').scalar() == 1
+        assert _info_sizes(conn) == before
+
+
+def test_request_query_count_is_reported(client, auth_headers):
+    response = client.get('/api/user/currentUser', headers=auth_headers)
+    assert response.status_code == 200
+    server_timing = response.headers.getlist('Server-Timing')
+    assert any(item.startswith('db;') and '1 queries' in item for item in server_timing)
+
+
+def test_statement_latency_metric_is_recorded(app):
+    from prometheus_client import REGISTRY
+    sample = lambda: REGISTRY.get_sample_value('lifocus_db_query_duration_seconds_count', {'operation': 'SELECT'}) or 0
+    before = sample()
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('SELECT 1')
+    assert sample() == before + 1
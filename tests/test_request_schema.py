@@ -0,0 +1,29 @@
+import pytest
+from werkzeug.exceptions import BadRequest
+from app.utils import RequestSchema
+
+
+def _parse(app, schema, **kwargs):
+    with app.test_request_context(**kwargs):
+        return schema.parse()
+
+
+def test_values_are_read_from_json_then_query(app):
+    schema = RequestSchema(page=dict(type=int, default=1), name=dict(type=str))
+    result = _parse(app, schema, method='POST', json={'name': 'a'}, query_string={'page': '3', 'name': 'b'})
+    assert result.page == 3
+    assert result['name'] == 'a'
+
+
+def test_missing_required_parameter_names_locations(app):
+    schema = RequestSchema(location=('json', 'args'), name=dict(required=True))
+    with pytest.raises(BadRequest) as excinfo:
+        _parse(app, schema, method='POST', json={})
+    assert excinfo.value.data['errors'] == {'name': 'Missing required parameter in the JSON body or the query string'}
+
+
+def test_conversion_error_returns_400(app):
+    schema = RequestSchema(page=dict(type=int, help='页码'))
+    with pytest.raises(BadRequest) as excinfo:
+        _parse(app, schema, query_string={'page': 'x'})
+    assert excinfo.value.data['errors']['page'].startswith('页码 ')
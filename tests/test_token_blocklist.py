@@ -0,0 +1,88 @@
+import threading
+import time
+import pytest
+from app.extension import redis_client, token_blocklist
+from app.utils import TokenBlocklist
+
+REDIS_LATENCY = 0.0005  # 模拟一次 Redis 网络往返（0.5ms）
+BENCH_REQUESTS = 200
+
+
+def _wait_for(predicate, timeout=3):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def synced_blocklist(app):
+    # 本地黑名单需要后台线程完成首次同步后才不再回退到 Redis
+    token_blocklist.is_revoked('warmup')
+    assert _wait_for(lambda: time.monotonic() - token_blocklist._last_sync < token_blocklist.sync_interval)
+    return token_blocklist
+
+
+def test_logout_revokes_token(client, auth_headers, synced_blocklist):
+    assert client.get('/api/user/currentUser', headers=auth_headers).status_code == 200
+    assert client.post('/api/auth/logout', headers=auth_headers).status_code == 200
+    assert client.get('/api/user/currentUser', headers=auth_headers).status_code == 401
+
+
+def test_revocation_is_synced_from_other_process(app, synced_blocklist):
+    # 另一个进程的黑名单实例注销 token，本进程通过发布/订阅收到
+    other = TokenBlocklist(redis_client)
+    other.init_app(app)
+    other.revoke('revoked-elsewhere', 60)
+    assert _wait_for(lambda: synced_blocklist.is_revoked('revoked-elsewhere'))
+    assert not synced_blocklist.is_revoked('not-revoked')
+
+
+def test_falls_back_to_redis_when_sync_is_stale(app):
+    blocklist = TokenBlocklist(redis_client)
+    blocklist.init_app(app)
+    blocklist._ensure_started = lambda: None  # 不启动同步线程，本地数据一直过期
+    redis_client.set('revoked-jti', '')
+    assert blocklist.is_revoked('revoked-jti')
+    assert not blocklist.is_revoked('other-jti')
+
+
+def _bench(client, headers):
+    start = time.perf_counter()
+    for _ in range(BENCH_REQUESTS):
+        assert client.get('/api/user/currentUser', headers=headers).status_code == 200
+    return (time.perf_counter() - start) / BENCH_REQUESTS
+
+
+def test_benchmark_authenticated_request_overhead(client, auth_headers, synced_blocklist, monkeypatch):
+    main_thread = threading.current_thread()
+    lookups = []
+    execute_command = redis_client.execute_command
+
+    def slow_execute_command(*args, **options):
+        if threading.current_thread() is main_thread:
+            lookups.append(args[0])
+        time.sleep(REDIS_LATENCY)
+        return execute_command(*args, **options)
+
+    monkeypatch.setattr(redis_client, 'execute_command', slow_execute_command)
+    _bench(client, auth_headers)  # 预热
+
+    lookups.clear()
+    local_latency = _bench(client, auth_headers)
+    local_lookups = len(lookups)
+
+    monkeypatch.setattr(token_blocklist, 'enabled', False)
+    lookups.clear()
+    remote_latency = _bench(client, auth_headers)
+    remote_lookups = len(lookups)
+
+    print('\n鉴权请求平均耗时（Redis 往返 {:.1f}ms）：本地黑名单 {:.3f}ms，每次查询 Redis {:.3f}ms；'
+          'Redis 命令数 {} / {}'.format(REDIS_LATENCY * 1000, local_latency * 1000, remote_latency * 1000,
+                                      local_lookups, remote_lookups))
+    # 本地黑名单：未注销 token 的检查不访问 Redis
+    assert local_lookups == 0
+    assert remote_lookups == BENCH_REQUESTS
+    assert local_latency < remote_latency
@@ -0,0 +1,98 @@
+import os
+import threading
+import pytest
+from app.utils import writeBehind
+from app.utils.writeBehind import WriteBehindWriter
+
+
+@pytest.fixture
+def writer():
+    # 合并窗口很长，后台线程不会自行提交，由测试调用 flush / _submit_pending 控制时机
+    writer = WriteBehindWriter(coalesce_window=3600, max_workers=2)
+    yield writer
+    writer.flush(timeout=5)
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_repeated_writes_to_one_note_are_coalesced(writer, tmp_path, monkeypatch):
+    applied = []
+    apply = writer._apply
+    monkeypatch.setattr(writer, '_apply', lambda path, content: (applied.append(content), apply(path, content)))
+    path = str(tmp_path / 'notes' / '周报.md')
+    for i in range(5):
+        writer.write(path, '第{}版'.format(i))
+    assert writer.flush(timeout=5)
+    assert applied == ['第4版']
+    assert _read(path) == '第4版'
+
+
+def test_write_uses_temp_file_and_atomic_replace(writer, tmp_path, monkeypatch):
+    path = str(tmp_path / '周报.md')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('旧内容')
+    replaced = []
+    replace = os.replace
+    def spy(src, dst):
+        # 替换前目标文件仍是完整的旧内容，临时文件已写完整
+        replaced.append((src, dst, _read(dst), _read(src)))
+        replace(src, dst)
+    monkeypatch.setattr(writeBehind.os, 'replace', spy)
+    writer.write(path, '新内容')
+    assert writer.flush(timeout=5)
+    (src, dst, before, written), = replaced
+    assert dst == path and os.path.dirname(src) == str(tmp_path) and src.endswith('.tmp')
+    assert (before, written) == ('旧内容', '新内容')
+    assert os.listdir(tmp_path) == ['周报.md']
+    assert _read(path) == '新内容'
+
+
+def test_delete_after_write_wins(writer, tmp_path):
+    path = str(tmp_path / '周报.md')
+    writer.write(path, '内容')
+    writer.delete(path)
+    assert writer.flush(timeout=5)
+    assert not os.path.exists(path)
+
+
+def test_delete_waits_for_inflight_write_on_same_path(writer, tmp_path, monkeypatch):
+    path = str(tmp_path / '周报.md')
+    started, release = threading.Event(), threading.Event()
+    apply = writer._apply
+    def slow_apply(path, content):
+        if content is not None:
+            started.set()
+            release.wait(5)
+        apply(path, content)
+    monkeypatch.setattr(writer, '_apply', slow_apply)
+    writer.write(path, '内容')
+    assert len(writer._submit_pending()) == 1
+    assert started.wait(5)
+    writer.delete(path)
+    # 同一路径的写入还在执行，删除留到下一轮，不会先于写入执行
+    assert writer._submit_pending() == []
+    release.set()
+    assert writer.flush(timeout=5)
+    assert not os.path.exists(path)
+
+
+def test_flush_drains_all_pending_operations(writer, tmp_path, capsys):
+    paths = [str(tmp_path / '项目{}'.format(i % 3) / '笔记{}.md'.format(i)) for i in range(20)]
+    for i, path in enumerate(paths):
+        writer.write(path, '内容{}'.format(i))
+    assert writer.flush(timeout=5)
+    assert not writer._pending and not writer._inflight
+    assert [_read(path) for path in paths] == ['内容{}'.format(i) for i in range(20)]
+    # 写入线程只记录日志，不再输出到标准输出
+    assert capsys.readouterr().out == ''
+
+
+def test_write_errors_are_logged(writer, tmp_path, caplog):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    writer.write(str(blocker / '周报.md'), '内容')
+    assert writer.flush(timeout=5)
+    assert '写入笔记文件时发生错误' in caplog.text